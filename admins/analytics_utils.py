@@ -0,0 +1,388 @@
+"""
+Aggregation helpers for the admin analytics dashboard.
+Every card and chart on the analytics page is computed from a small, fixed set of
+grouped / conditional-aggregate queries so the cost does not grow with the number
+of categories, assistance types, statuses or priorities. Case counts are read from
+the CaseDailyStats rollup rather than the case tables.
+
+The page itself only renders the KPI cards (build_admin_analytics_context); every
+chart group is served as JSON by the analytics API (see ANALYTICS_CHART_GROUPS).
+"""
+
+from datetime import timedelta
+
+from django.db.models import Count, Avg, Q, Sum
+from django.utils import timezone
+
+from admins.models import Complaint, AssistanceRequest, CaseDailyStats
+from admins.barangay_utils import BARANGAYS
+from admins.geo_utils import DEFAULT_HEATMAP_PRECISION, heatmap_cells, merge_heatmap_cells
+from admins.resolution_utils import resolution_stats, empty_resolution_stats
+from admins.staff_performance_utils import staff_leaderboard
+from admins.timeseries_utils import time_series, series_values
+from core.models import User, Feedback
+
+
+ASSISTANCE_TYPE = [
+        "Medical", "Financial", "Food/Supplies",
+        "Evacuation/Shelter", "Legal", "Livelihood",
+        "Education","Transportation","Disaster/Emergency",
+        "Others"
+    ]
+
+COMPLAINTS_CATEGORY = [
+        "Sanitation", "Safety/Security", "Infrastructure", "Utilities",
+        "Noise", "Environment", "Disaster/Emergency", "Health",
+        "Traffic/Transport", "Corruption/Abuse", "Discrimination",
+        "Service Delivery", "Others"
+    ]
+
+LEVEL_LABELS = [('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('urgent', 'Urgent')]
+
+OPEN_STATUSES = ['pending', 'in_progress', 'assigned']
+
+
+def summarize_cases(stats, now=None):
+    """
+    Compute totals, status counts, level counts and recent-window counts in one query.
+
+    Args:
+        stats: CaseDailyStats queryset already restricted to one case kind
+        now (datetime, optional): Reference time, defaults to timezone.now()
+
+    Returns:
+        dict: Aggregated counts keyed by metric name
+    """
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    last_7_start = today - timedelta(days=6)
+    prev_7_start = today - timedelta(days=13)
+
+    aggregates = {
+        'total': Sum('count'),
+        'pending': Sum('count', filter=Q(status='pending')),
+        'in_progress': Sum('count', filter=Q(status='in_progress')),
+        'assigned': Sum('count', filter=Q(status='assigned')),
+        'resolved': Sum('count', filter=Q(status='resolved')),
+        'last_7': Sum('count', filter=Q(date__gte=last_7_start)),
+        'prev_7': Sum('count', filter=Q(date__gte=prev_7_start, date__lt=last_7_start)),
+        # Day granularity: cases filed on or before the day a week ago
+        'unresolved_over_7': Sum('count', filter=Q(status__in=OPEN_STATUSES, date__lte=today - timedelta(days=7))),
+    }
+    for level, _ in LEVEL_LABELS:
+        aggregates[f'level_{level}'] = Sum('count', filter=Q(priority=level))
+
+    return {key: value or 0 for key, value in stats.aggregate(**aggregates).items()}
+
+
+def breakdown_by_label(stats, labels):
+    """
+    Count cases per configured label with a status breakdown from one GROUP BY query.
+
+    A label matches a row when it is a case-insensitive substring of the stored
+    category/type, mirroring the previous ``icontains`` filtering.
+
+    Args:
+        stats: CaseDailyStats queryset already restricted to one case kind
+        labels (list): Display labels (e.g. COMPLAINTS_CATEGORY)
+
+    Returns:
+        tuple: (counts per label, status breakdown per label)
+    """
+    rows = stats.values('category', 'status').annotate(cnt=Sum('count')).order_by()
+
+    counts = {label: 0 for label in labels}
+    details = {label: {'pending': 0, 'in_progress': 0, 'resolved': 0} for label in labels}
+    for row in rows:
+        value = (row['category'] or '').lower()
+        status = row['status']
+        for label in labels:
+            if label.lower() not in value:
+                continue
+            counts[label] += row['cnt']
+            if status == 'pending':
+                details[label]['pending'] += row['cnt']
+            elif status in ('in_progress', 'assigned'):
+                details[label]['in_progress'] += row['cnt']
+            elif status == 'resolved':
+                details[label]['resolved'] += row['cnt']
+    return counts, details
+
+
+def top_barangays(stats, limit=25):
+    """Chart rows for the cases per barangay in a CaseDailyStats queryset, sorted by count."""
+    rows = stats.exclude(barangay='').values('barangay').annotate(cnt=Sum('count')).order_by('-cnt')[:limit]
+    rows = [(row['barangay'], row['cnt']) for row in rows if row['cnt']]
+
+    total = stats.exclude(barangay='').aggregate(total=Sum('count'))['total'] or 1
+    return [
+        {'name': f'Barangay {barangay}', 'complaints': count, 'percentage': round((count / total) * 100, 1)}
+        for barangay, count in rows
+    ]
+
+
+def build_admin_analytics_context(now=None):
+    """
+    Build the template context for the analytics page shell (KPI cards and performance metrics).
+
+    Chart data is not included; the page fetches it from the analytics API.
+
+    Returns:
+        dict: Context with the keys the analytics template renders server-side
+    """
+    now = now or timezone.now()
+    complaint_summary = summarize_cases(CaseDailyStats.objects.filter(case_kind='complaint'), now)
+    assistance_summary = summarize_cases(CaseDailyStats.objects.filter(case_kind='assistance'), now)
+
+    total_complaints = complaint_summary['total']
+    resolved_complaints = complaint_summary['resolved']
+
+    resolution_rate = round((resolved_complaints / total_complaints) * 100, 1) if total_complaints > 0 else 0
+
+    month_start = timezone.localtime(now).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    user_stats = User.objects.aggregate(
+        total=Count('id'),
+        verified=Count('id', filter=Q(is_verified=True)),
+        new_this_month=Count('id', filter=Q(created_at__gte=month_start)),
+    )
+    feedback_stats = Feedback.objects.aggregate(
+        total=Count('id'),
+        average=Avg('rating'),
+        unread=Count('id', filter=Q(is_read=False)),
+    )
+    average_feedback_rating = feedback_stats['average'] or 0
+
+    # Response times are not tracked yet (no assignment timestamp on complaints)
+    avg_response_hours = 0
+    response_time_rate = 0
+
+    efficiency_factors = [
+        resolution_rate,
+        response_time_rate,
+        min(100, (resolved_complaints / max(total_complaints, 1)) * 100),
+    ]
+    system_efficiency = round(sum(efficiency_factors) / len(efficiency_factors), 1)
+    user_satisfaction = round((average_feedback_rating / 5.0) * 100, 1) if average_feedback_rating > 0 else 0
+
+    return {
+        'total_complaints': total_complaints,
+        'pending_complaints': complaint_summary['pending'],
+        'in_progress_complaints': complaint_summary['in_progress'],
+        'resolved_complaints': resolved_complaints,
+        'total_assistance': assistance_summary['total'],
+        'pending_assistance': assistance_summary['pending'],
+        'in_progress_assistance': assistance_summary['in_progress'],
+        'resolved_assistance': assistance_summary['resolved'],
+        'avg_response_hours': avg_response_hours,
+        'user_satisfaction': user_satisfaction,
+        'active_users': user_stats['verified'],
+        'total_users': user_stats['total'],
+        'new_users_this_month': user_stats['new_this_month'],
+
+        # Feedback statistics
+        'total_feedback': feedback_stats['total'],
+        'average_feedback_rating': round(average_feedback_rating, 1),
+        'unread_feedback': feedback_stats['unread'],
+
+        # Performance metrics
+        'resolution_rate': resolution_rate,
+        'response_time_rate': round(response_time_rate, 1),
+        'system_efficiency': system_efficiency,
+    }
+
+
+def empty_admin_analytics_context():
+    """Zero-valued page shell context used when the aggregation fails."""
+    return {
+        'total_complaints': 0,
+        'pending_complaints': 0,
+        'in_progress_complaints': 0,
+        'resolved_complaints': 0,
+        'total_assistance': 0,
+        'pending_assistance': 0,
+        'in_progress_assistance': 0,
+        'resolved_assistance': 0,
+        'avg_response_hours': 0,
+        'user_satisfaction': 0,
+        'active_users': 0,
+        'total_users': 0,
+        'new_users_this_month': 0,
+
+        # Feedback statistics
+        'total_feedback': 0,
+        'average_feedback_rating': 0,
+        'unread_feedback': 0,
+
+        # Performance metrics
+        'resolution_rate': 0,
+        'response_time_rate': 0,
+        'system_efficiency': 0,
+    }
+
+
+def _status_counts(summary):
+    """Collapse a summarize_cases() result into the three statuses the charts show."""
+    return {
+        'Pending': summary['pending'],
+        'In Progress': summary['in_progress'] + summary['assigned'],
+        'Resolved': summary['resolved'],
+    }
+
+
+def status_chart_data(now=None):
+    """Status overview chart: pending / in progress / resolved per case kind."""
+    return {
+        'complaints': _status_counts(summarize_cases(CaseDailyStats.objects.filter(case_kind='complaint'), now)),
+        'assistance': _status_counts(summarize_cases(CaseDailyStats.objects.filter(case_kind='assistance'), now)),
+    }
+
+
+def category_chart_data(now=None):
+    """Complaint category and assistance type charts, with the status breakdown used by the detail table."""
+    category_data, category_detail_data = breakdown_by_label(
+        CaseDailyStats.objects.filter(case_kind='complaint'), COMPLAINTS_CATEGORY,
+    )
+    assistance_data, assistance_detail_data = breakdown_by_label(
+        CaseDailyStats.objects.filter(case_kind='assistance'), ASSISTANCE_TYPE,
+    )
+    return {
+        'complaints': category_data,
+        'complaint_details': category_detail_data,
+        'assistance': assistance_data,
+        'assistance_details': assistance_detail_data,
+    }
+
+
+def barangay_chart_data(now=None):
+    """Top five barangays by number of cases."""
+    return {'barangays': top_barangays(CaseDailyStats.objects.all(), limit=5)}
+
+
+def monthly_chart_data(now=None):
+    """Monthly trend for the last six calendar months."""
+    monthly = time_series(
+        CaseDailyStats.objects.all(), 'date', 'month', periods=6,
+        group_by='case_kind', aggregate=Sum('count'), now=now,
+    )
+    return {
+        'labels': monthly['labels'],
+        'complaints': series_values(monthly, 'complaint'),
+        'assistance': series_values(monthly, 'assistance'),
+    }
+
+
+def smart_daily_chart_data(now=None):
+    """Smart insights: daily trend, week-over-week change, spike flag, stale cases and top locations."""
+    now = now or timezone.now()
+    complaint_stats = CaseDailyStats.objects.filter(case_kind='complaint')
+    assistance_stats = CaseDailyStats.objects.filter(case_kind='assistance')
+    complaint_summary = summarize_cases(complaint_stats, now)
+    assistance_summary = summarize_cases(assistance_stats, now)
+
+    daily = time_series(
+        CaseDailyStats.objects.all(), 'date', 'day', periods=30,
+        group_by='case_kind', aggregate=Sum('count'), now=now,
+    )
+
+    last_7_total = complaint_summary['last_7'] + assistance_summary['last_7']
+    prev_7_total = complaint_summary['prev_7'] + assistance_summary['prev_7']
+
+    weekly_change = None
+    if prev_7_total > 0:
+        weekly_change = round(((last_7_total - prev_7_total) / prev_7_total) * 100, 1)
+    elif last_7_total > 0:
+        weekly_change = 100.0
+
+    location_rows = CaseDailyStats.objects.values('barangay').annotate(cnt=Sum('count')).order_by('-cnt')[:5]
+    top_locations = [
+        {'location': row['barangay'] or 'Unknown', 'count': row['cnt']}
+        for row in location_rows if row['cnt']
+    ]
+
+    return {
+        'labels': daily['labels'],
+        'complaints': series_values(daily, 'complaint'),
+        'assistance': series_values(daily, 'assistance'),
+        'weekly_change': weekly_change,
+        # Spike detection (simple): spike if last 7 days > 150% of previous 7 days
+        'spike': prev_7_total > 0 and last_7_total > prev_7_total * 1.5,
+        'top_locations': top_locations,
+        'unresolved_over_7days': complaint_summary['unresolved_over_7'] + assistance_summary['unresolved_over_7'],
+    }
+
+
+def priority_resolution_chart_data(now=None):
+    """Priority / urgency distribution and resolution-time statistics per complaint priority."""
+    levels = CaseDailyStats.objects.values('case_kind', 'priority').annotate(cnt=Sum('count')).order_by()
+    counts = {(row['case_kind'], row['priority']): row['cnt'] for row in levels}
+
+    by_priority = resolution_stats(Complaint.objects.all(), group_by='priority')
+    return {
+        'priority': {label: counts.get(('complaint', key), 0) for key, label in LEVEL_LABELS},
+        'urgency': {label: counts.get(('assistance', key), 0) for key, label in LEVEL_LABELS},
+        'resolution': {
+            label: by_priority.get(key, empty_resolution_stats())
+            for key, label in LEVEL_LABELS
+        },
+    }
+
+
+def staff_chart_data(now=None):
+    """Staff leaderboard: open load, resolved and overdue cases and median resolution time."""
+    return {'staff': staff_leaderboard(limit=10, now=now)}
+
+
+# Chart groups served by the analytics API: {url name: payload builder}
+ANALYTICS_CHART_GROUPS = {
+    'status': status_chart_data,
+    'category': category_chart_data,
+    'barangay': barangay_chart_data,
+    'monthly': monthly_chart_data,
+    'smart-daily': smart_daily_chart_data,
+    'priority-resolution': priority_resolution_chart_data,
+    'staff': staff_chart_data,
+}
+
+
+def heatmap_data(case_kind='all', precision=DEFAULT_HEATMAP_PRECISION, bounds=None,
+                 date_from=None, date_to=None, category=None, status=None):
+    """
+    Heatmap cells for complaints and/or assistance requests.
+
+    Args:
+        case_kind (str): 'complaint', 'assistance' or 'all'
+        precision (int): Geohash prefix length (see geo_utils.HEATMAP_PRECISIONS)
+        bounds (tuple, optional): (south, west, north, east) viewport
+        date_from (date, optional): First local filing date to include
+        date_to (date, optional): Last local filing date to include
+        category (str, optional): Complaint category / assistance type
+        status (str, optional): Case status
+
+    Returns:
+        dict: {'precision', 'total', 'cells': [...]} with cells from merge_heatmap_cells()
+    """
+    sources = {
+        'complaint': (Complaint.objects.all(), 'category'),
+        'assistance': (AssistanceRequest.objects.all(), 'type'),
+    }
+    if case_kind != 'all':
+        sources = {case_kind: sources[case_kind]}
+
+    cell_maps = []
+    for queryset, category_field in sources.values():
+        if date_from:
+            queryset = queryset.filter(created_at__date__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(created_at__date__lte=date_to)
+        if category:
+            queryset = queryset.filter(**{category_field: category})
+        if status:
+            queryset = queryset.filter(status=status)
+        cell_maps.append(heatmap_cells(queryset, precision, bounds))
+
+    cells = merge_heatmap_cells(*cell_maps)
+    return {
+        'precision': precision,
+        'total': sum(cell['count'] for cell in cells),
+        'cells': cells,
+    }
@@ -0,0 +1,79 @@
+"""
+Barangay list and the precompiled matcher used to normalize free-text case locations.
+Cases store the resolved barangay in their indexed `barangay` column at write time,
+so analytics can group by it instead of scanning addresses.
+"""
+
+import re
+
+
+BARANGAYS = [
+        "Bacong", "Bagong Silang", "Biasong", "Gov. E. Jaro",
+        "Guintigui-an", "Lukay", "Magcasuang", "Malibago", "Naga-asan",
+        "Pagsulhugon", "Planza", "Poblacion District I", "Poblacion District II", "Poblacion District III",
+        "Poblacion District IV", "Rizal I", "Rizal II", "San Agustin", "San Isidro",
+        "San Ricardo", "Sangputan", "Taguite", "Uban", "Victory", "Villa Magsaysay"
+    ]
+
+# Stored for locations that mention no known barangay
+UNKNOWN_BARANGAY = 'Others'
+
+# Common spellings residents type, in addition to the official names
+BARANGAY_ALIASES = {
+    "Gov. E. Jaro": ["Gov E Jaro", "Governor E. Jaro", "Gobernador E. Jaro", "E. Jaro"],
+    "Guintigui-an": ["Guintiguian"],
+    "Naga-asan": ["Nagaasan"],
+    "Poblacion District I": ["Poblacion District 1", "Poblacion I", "Poblacion 1", "Pob. I", "Pob. 1", "District I", "District 1"],
+    "Poblacion District II": ["Poblacion District 2", "Poblacion II", "Poblacion 2", "Pob. II", "Pob. 2", "District II", "District 2"],
+    "Poblacion District III": ["Poblacion District 3", "Poblacion III", "Poblacion 3", "Pob. III", "Pob. 3", "District III", "District 3"],
+    "Poblacion District IV": ["Poblacion District 4", "Poblacion IV", "Poblacion 4", "Pob. IV", "Pob. 4", "District IV", "District 4"],
+    "Rizal I": ["Rizal 1", "Rizal One"],
+    "Rizal II": ["Rizal 2", "Rizal Two"],
+    "Villa Magsaysay": ["Villa Magsaysay Village", "V. Magsaysay"],
+}
+
+
+def _alias_pattern(alias):
+    """Regex for one spelling: tokens may be separated by spaces, dots or dashes."""
+    tokens = re.findall(r'[a-z0-9]+', alias.lower())
+    return r'[\s.\-]*'.join(re.escape(token) for token in tokens)
+
+
+def _compile_matcher():
+    """
+    Build a single alternation with one named group per barangay.
+
+    Spellings are tried longest-first and bounded on both sides, so "Rizal I" never
+    matches inside "Rizal II".
+    """
+    groups = []
+    for index, barangay in enumerate(BARANGAYS):
+        spellings = [barangay] + BARANGAY_ALIASES.get(barangay, [])
+        patterns = sorted({_alias_pattern(spelling) for spelling in spellings}, key=len, reverse=True)
+        groups.append(f"(?P<b{index}>{'|'.join(patterns)})")
+    return re.compile(r'(?<![a-z0-9])(?:' + '|'.join(groups) + r')(?![a-z0-9])', re.IGNORECASE)
+
+
+BARANGAY_PATTERN = _compile_matcher()
+
+
+def resolve_barangay(*texts):
+    """
+    Resolve the barangay mentioned in the first of ``texts`` that names one.
+
+    Args:
+        *texts (str): Candidate location strings, most specific first (None/blank are skipped)
+
+    Returns:
+        str: Official barangay name, UNKNOWN_BARANGAY when text is present but no
+             barangay is mentioned, or '' when every text is blank
+    """
+    has_text = False
+    for text in texts:
+        if not text or not text.strip():
+            continue
+        has_text = True
+        match = BARANGAY_PATTERN.search(text)
+        if match:
+            return BARANGAYS[int(match.lastgroup[1:])]
+    return UNKNOWN_BARANGAY if has_text else ''
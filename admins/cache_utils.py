@@ -0,0 +1,94 @@
+"""
+Versioned caching for analytics and dashboard contexts.
+Cache keys embed a "case data version" counter that the signals in signals.py bump
+whenever a Complaint, AssistanceRequest, User or Feedback row changes, so cached
+contexts stay valid until the underlying data actually changes.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+CASE_DATA_VERSION_KEY = 'analytics:case_data_version'
+
+# How long a recomputation may hold the rebuild lock before others give up waiting
+REBUILD_LOCK_TIMEOUT = 30
+REBUILD_POLL_INTERVAL = 0.05
+
+
+def get_case_data_version():
+    """Return the current case data version, initialising it on first use."""
+    version = cache.get(CASE_DATA_VERSION_KEY)
+    if version is None:
+        cache.add(CASE_DATA_VERSION_KEY, 1, timeout=None)
+        version = cache.get(CASE_DATA_VERSION_KEY, 1)
+    return version
+
+
+def bump_case_data_version():
+    """Invalidate every versioned analytics entry by moving to a new version."""
+    try:
+        return cache.incr(CASE_DATA_VERSION_KEY)
+    except ValueError:
+        # Key missing (first write or evicted): start a fresh version sequence
+        cache.add(CASE_DATA_VERSION_KEY, 1, timeout=None)
+        return cache.incr(CASE_DATA_VERSION_KEY)
+
+
+def cached_context(name, builder, *key_parts, timeout=None):
+    """
+    Return ``builder()`` from cache for the current case data version.
+
+    Only one caller rebuilds a missing entry (guarded by a cache.add lock). Other callers
+    get the previous version's value while the rebuild runs, or wait for the rebuild
+    when there is no previous value yet.
+
+    Args:
+        name (str): Cache namespace, e.g. 'admin_analytics'
+        builder (callable): Zero-argument function returning a picklable dict
+        *key_parts: Extra key components (e.g. the staff id for per-staff dashboards)
+        timeout (int, optional): Entry lifetime in seconds, defaults to ANALYTICS_CACHE_TIMEOUT
+
+    Returns:
+        dict: Cached or freshly built context
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'ANALYTICS_CACHE_TIMEOUT', 600)
+
+    suffix = ':'.join(str(part) for part in key_parts)
+    base_key = f'analytics:{name}:{suffix}'
+    stale_key = f'{base_key}:stale'
+    lock_key = f'{base_key}:lock'
+
+    version = get_case_data_version()
+    key = f'{base_key}:v{version}'
+
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    if cache.add(lock_key, version, timeout=REBUILD_LOCK_TIMEOUT):
+        try:
+            value = builder()
+            cache.set_many({key: value, stale_key: value}, timeout=timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    # Someone else is rebuilding: serve the previous value if we have one
+    stale = cache.get(stale_key)
+    if stale is not None:
+        return stale
+
+    deadline = time.monotonic() + REBUILD_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(REBUILD_POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if cache.get(lock_key) is None:
+            break
+
+    return builder()
@@ -0,0 +1,174 @@
+"""
+Maintenance and query helpers for the CaseDailyStats rollup table.
+The rollup is updated incrementally from model signals (see signals.py) and can be
+rebuilt from scratch with the `rebuild_case_stats` management command.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from admins.models import Complaint, AssistanceRequest, CaseDailyStats
+
+
+KEY_FIELDS = ('date', 'case_kind', 'category', 'status', 'priority', 'barangay', 'assigned_to_id')
+
+# Model fields each case kind contributes to the rollup key
+CASE_SOURCES = {
+    'complaint': {
+        'model': Complaint,
+        'category': 'category',
+        'priority': 'priority',
+    },
+    'assistance': {
+        'model': AssistanceRequest,
+        'category': 'type',
+        'priority': 'urgency',
+    },
+}
+
+
+def case_kind_for(instance):
+    """Return 'complaint' or 'assistance' for a case instance."""
+    return 'complaint' if isinstance(instance, Complaint) else 'assistance'
+
+
+def build_key(case_kind, values):
+    """
+    Build the rollup key for a case from a dict of its raw field values.
+
+    Args:
+        case_kind (str): 'complaint' or 'assistance'
+        values (dict): Must contain created_at, status, barangay, assigned_to_id and
+            the kind-specific category/priority fields
+
+    Returns:
+        tuple: Values for KEY_FIELDS, or None when the case has no creation date yet
+    """
+    source = CASE_SOURCES[case_kind]
+    created_at = values.get('created_at')
+    if not created_at:
+        return None
+    return (
+        timezone.localdate(created_at),
+        case_kind,
+        values.get(source['category']) or '',
+        values.get('status') or '',
+        values.get(source['priority']) or '',
+        values.get('barangay') or '',
+        values.get('assigned_to_id'),
+    )
+
+
+def key_for_instance(instance):
+    """Rollup key for an in-memory Complaint/AssistanceRequest instance."""
+    case_kind = case_kind_for(instance)
+    source = CASE_SOURCES[case_kind]
+    values = {
+        'created_at': instance.created_at,
+        'status': instance.status,
+        'barangay': instance.barangay,
+        'assigned_to_id': instance.assigned_to_id,
+        source['category']: getattr(instance, source['category']),
+        source['priority']: getattr(instance, source['priority']),
+    }
+    return build_key(case_kind, values)
+
+
+def key_from_database(instance):
+    """Rollup key for the currently stored version of a case, or None if it is not saved yet."""
+    if not instance.pk:
+        return None
+    case_kind = case_kind_for(instance)
+    source = CASE_SOURCES[case_kind]
+    values = type(instance).objects.filter(pk=instance.pk).values(
+        'created_at', 'status', 'barangay', 'assigned_to_id',
+        source['category'], source['priority'],
+    ).first()
+    if not values:
+        return None
+    return build_key(case_kind, values)
+
+
+def apply_delta(key, delta):
+    """
+    Add ``delta`` to the rollup row for ``key``, creating it when missing.
+
+    The update is applied with an F() expression so concurrent writers do not lose
+    increments; the unique key constraints make a racing insert fail, in which case
+    the row the other writer created is updated instead.
+    """
+    if key is None or delta == 0:
+        return
+    lookup = dict(zip(KEY_FIELDS, key))
+    if CaseDailyStats.objects.filter(**lookup).update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            CaseDailyStats.objects.create(count=delta, **lookup)
+    except IntegrityError:
+        # Another writer created the row first
+        CaseDailyStats.objects.filter(**lookup).update(count=F('count') + delta)
+
+
+def move_case(old_key, new_key):
+    """Move one case from ``old_key`` to ``new_key`` in the rollup."""
+    if old_key == new_key:
+        return
+    apply_delta(old_key, -1)
+    apply_delta(new_key, 1)
+
+
+def rebuild_case_daily_stats():
+    """
+    Rebuild the whole rollup table from the case tables.
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    counts = {}
+    for case_kind, source in CASE_SOURCES.items():
+        grouped = source['model'].objects.annotate(
+            day=TruncDate('created_at'),
+        ).values(
+            'day', 'status', 'barangay', 'assigned_to_id',
+            source['category'], source['priority'],
+        ).annotate(cnt=Count('id')).order_by()
+
+        for item in grouped:
+            # TruncDate already resolved the local day; reuse it instead of created_at
+            key = (
+                item['day'], case_kind,
+                item[source['category']] or '', item['status'] or '', item[source['priority']] or '',
+                item['barangay'] or '', item['assigned_to_id'],
+            )
+            # NULL and '' collapse into one key, which the unique constraint enforces
+            counts[key] = counts.get(key, 0) + item['cnt']
+
+    rows = [CaseDailyStats(count=count, **dict(zip(KEY_FIELDS, key))) for key, count in counts.items()]
+
+    with transaction.atomic():
+        CaseDailyStats.objects.all().delete()
+        CaseDailyStats.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def case_stats(case_kind=None, **filters):
+    """
+    Rollup queryset, optionally restricted to one case kind and extra field filters.
+
+    Usage:
+        case_stats('complaint', assigned_to=staff).aggregate(total=Sum('count'))
+    """
+    queryset = CaseDailyStats.objects.all()
+    if case_kind:
+        queryset = queryset.filter(case_kind=case_kind)
+    if filters:
+        queryset = queryset.filter(**filters)
+    return queryset
+
+
+def sum_counts(queryset):
+    """Total case count represented by a rollup queryset."""
+    return queryset.aggregate(total=Sum('count'))['total'] or 0
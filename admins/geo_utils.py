@@ -0,0 +1,175 @@
+"""
+Geohash cell keys and grid aggregation for the case heatmap.
+Cases store the geohash of their coordinates in an indexed column at write time; the
+heatmap groups on a prefix of it (shorter prefix = coarser cell), so the browser only
+receives one row per occupied cell instead of every point.
+"""
+
+from django.db.models import Avg, Count
+from django.db.models.functions import Substr
+
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Stored precision: 8 characters is roughly a 38m x 19m cell
+GEOHASH_PRECISION = 8
+
+# Prefix lengths the heatmap accepts, from ~156km (3) down to the stored precision
+HEATMAP_PRECISIONS = range(3, GEOHASH_PRECISION + 1)
+DEFAULT_HEATMAP_PRECISION = 6
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """
+    Geohash of a coordinate pair.
+
+    Args:
+        latitude (float|Decimal): -90..90
+        longitude (float|Decimal): -180..180
+        precision (int): Number of characters
+
+    Returns:
+        str: Geohash, or '' when either coordinate is missing
+    """
+    if latitude is None or longitude is None:
+        return ''
+    latitude, longitude = float(latitude), float(longitude)
+
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        coordinate, bounds = (longitude, lng_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if coordinate >= middle:
+            value = (value << 1) | 1
+            bounds[0] = middle
+        else:
+            value <<= 1
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits = 0
+            value = 0
+    return ''.join(chars)
+
+
+def geohash_bounds(geohash):
+    """
+    Bounding box of a geohash cell.
+
+    Returns:
+        tuple: (south, west, north, east)
+    """
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            bounds = lng_range if even else lat_range
+            middle = (bounds[0] + bounds[1]) / 2
+            if (value >> shift) & 1:
+                bounds[0] = middle
+            else:
+                bounds[1] = middle
+            even = not even
+    return lat_range[0], lng_range[0], lat_range[1], lng_range[1]
+
+
+def common_geohash_prefix(bounds, precision):
+    """
+    Longest geohash prefix (at most ``precision`` long) shared by every point in ``bounds``.
+
+    Used as an index-friendly pre-filter for viewport queries; '' when the box
+    straddles a top-level cell boundary.
+    """
+    south, west, north, east = bounds
+    first = encode_geohash(south, west, precision)
+    last = encode_geohash(north, east, precision)
+    prefix = []
+    for a, b in zip(first, last):
+        if a != b:
+            break
+        prefix.append(a)
+    return ''.join(prefix)
+
+
+def heatmap_cells(queryset, precision=DEFAULT_HEATMAP_PRECISION, bounds=None):
+    """
+    Case counts per geohash cell from one GROUP BY query.
+
+    Args:
+        queryset: Complaint or AssistanceRequest queryset (already filtered by date, category, status)
+        precision (int): Geohash prefix length, one of HEATMAP_PRECISIONS
+        bounds (tuple, optional): (south, west, north, east) viewport to restrict to
+
+    Returns:
+        dict: {cell: {'count', 'latitude', 'longitude'}} where latitude/longitude is the
+              mean position of the cases in the cell
+    """
+    if precision not in HEATMAP_PRECISIONS:
+        raise ValueError(f"Unsupported heatmap precision: {precision}")
+
+    queryset = queryset.exclude(geohash='')
+    if bounds is not None:
+        south, west, north, east = bounds
+        prefix = common_geohash_prefix(bounds, precision)
+        if prefix:
+            queryset = queryset.filter(geohash__startswith=prefix)
+        queryset = queryset.filter(
+            latitude__gte=south, latitude__lte=north,
+            longitude__gte=west, longitude__lte=east,
+        )
+
+    rows = queryset.annotate(cell=Substr('geohash', 1, precision)).values('cell').annotate(
+        count=Count('pk'),
+        mean_latitude=Avg('latitude'),
+        mean_longitude=Avg('longitude'),
+    ).order_by()
+
+    return {
+        row['cell']: {
+            'count': row['count'],
+            'latitude': float(row['mean_latitude']),
+            'longitude': float(row['mean_longitude']),
+        }
+        for row in rows
+    }
+
+
+def merge_heatmap_cells(*cell_maps):
+    """
+    Combine heatmap_cells() results (e.g. complaints and assistance), weighting
+    cell positions by count.
+
+    Returns:
+        list: [{'cell', 'count', 'latitude', 'longitude', 'bounds'}] sorted by count
+    """
+    merged = {}
+    for cells in cell_maps:
+        for cell, data in cells.items():
+            entry = merged.setdefault(cell, {'count': 0, 'latitude': 0.0, 'longitude': 0.0})
+            total = entry['count'] + data['count']
+            entry['latitude'] = (entry['latitude'] * entry['count'] + data['latitude'] * data['count']) / total
+            entry['longitude'] = (entry['longitude'] * entry['count'] + data['longitude'] * data['count']) / total
+            entry['count'] = total
+
+    return sorted(
+        (
+            {
+                'cell': cell,
+                'count': data['count'],
+                'latitude': round(data['latitude'], 6),
+                'longitude': round(data['longitude'], 6),
+                'bounds': [round(edge, 6) for edge in geohash_bounds(cell)],
+            }
+            for cell, data in merged.items()
+        ),
+        key=lambda item: (-item['count'], item['cell']),
+    )
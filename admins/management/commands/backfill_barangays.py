@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+
+from admins.barangay_utils import resolve_barangay
+from admins.case_stats_utils import rebuild_case_daily_stats
+from admins.models import Complaint, AssistanceRequest
+
+
+class Command(BaseCommand):
+    help = 'Resolve the barangay column for existing complaints and assistance requests, then rebuild case stats.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows written per bulk update')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        complaints = self.backfill(
+            Complaint.objects.only('id', 'location', 'address', 'location_description', 'barangay'),
+            lambda c: resolve_barangay(c.location, c.address, c.location_description),
+            batch_size,
+        )
+        assistance = self.backfill(
+            AssistanceRequest.objects.only('id', 'address', 'barangay'),
+            lambda a: resolve_barangay(a.address),
+            batch_size,
+        )
+        rows = rebuild_case_daily_stats()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Updated {complaints} complaints and {assistance} assistance requests; '
+            f'rebuilt case daily stats ({rows} rows).'
+        ))
+
+    def backfill(self, queryset, resolve, batch_size):
+        """Bulk update rows whose stored barangay differs from the resolved one."""
+        model = queryset.model
+        pending = []
+        updated = 0
+        for case in queryset.order_by('pk').iterator(chunk_size=batch_size):
+            barangay = resolve(case)
+            if case.barangay != barangay:
+                case.barangay = barangay
+                pending.append(case)
+            if len(pending) >= batch_size:
+                model.objects.bulk_update(pending, ['barangay'])
+                updated += len(pending)
+                pending = []
+        if pending:
+            model.objects.bulk_update(pending, ['barangay'])
+            updated += len(pending)
+        return updated
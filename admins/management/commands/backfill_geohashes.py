@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from admins.geo_utils import encode_geohash
+from admins.models import Complaint, AssistanceRequest
+
+
+class Command(BaseCommand):
+    help = 'Compute the heatmap geohash column for existing complaints and assistance requests.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows written per bulk update')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        complaints = self.backfill(Complaint.objects.only('id', 'latitude', 'longitude', 'geohash'), batch_size)
+        assistance = self.backfill(AssistanceRequest.objects.only('id', 'latitude', 'longitude', 'geohash'), batch_size)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Updated {complaints} complaints and {assistance} assistance requests.'
+        ))
+
+    def backfill(self, queryset, batch_size):
+        """Bulk update rows whose stored geohash differs from their coordinates."""
+        model = queryset.model
+        pending = []
+        updated = 0
+        for case in queryset.order_by('pk').iterator(chunk_size=batch_size):
+            geohash = encode_geohash(case.latitude, case.longitude)
+            if case.geohash != geohash:
+                case.geohash = geohash
+                pending.append(case)
+            if len(pending) >= batch_size:
+                model.objects.bulk_update(pending, ['geohash'])
+                updated += len(pending)
+                pending = []
+        if pending:
+            model.objects.bulk_update(pending, ['geohash'])
+            updated += len(pending)
+        return updated
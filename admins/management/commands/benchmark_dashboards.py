@@ -0,0 +1,145 @@
+import json
+import time
+import tracemalloc
+from datetime import datetime
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from admins.analytics_utils import ANALYTICS_CHART_GROUPS
+from admins.models import Complaint, AssistanceRequest, Notification, UserActivity
+from admins.views import admin_analytics, admin_dashboard, admin_resident, admin_user_activity
+from core.models import User, Admin
+from core.principal_utils import RequestPrincipal
+from resident.models import ForumPost
+from resident.views.community_forum import community_forum
+from staffs.views import staff_dashboard
+
+
+def analytics_api(request):
+    """Every chart group the analytics page requests after the shell renders."""
+    response = None
+    for group in ANALYTICS_CHART_GROUPS:
+        response = admin_analytics.admin_analytics_data(request, group)
+        if response.status_code != 200:
+            return response
+    return response
+
+
+# name: (view, session role)
+SCENARIOS = {
+    'admin_analytics': (admin_analytics.admin_analytics, 'admin'),
+    'admin_analytics_api': (analytics_api, 'admin'),
+    'admin_dashboard': (admin_dashboard.admin_dashboard, 'admin'),
+    'staff_dashboard': (staff_dashboard.staff_dashboard, 'staff'),
+    'admin_resident': (admin_resident.admin_resident, 'admin'),
+    'admin_user_activity': (admin_user_activity.admin_user_activity, 'admin'),
+    'community_forum': (community_forum, 'resident'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Measure query count, wall time and peak memory of the main dashboards and write a JSON report.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='benchmark_report.json', help='Path of the JSON report')
+        parser.add_argument('--repeat', type=int, default=3, help='Warm runs per scenario (best time is reported)')
+        parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                            help='Only run these scenarios (repeatable)')
+
+    def handle(self, *args, **options):
+        self.factory = RequestFactory()
+        self.sessions = self.build_sessions()
+
+        results = {}
+        for name in options['scenario'] or SCENARIOS:
+            view, role = SCENARIOS[name]
+            try:
+                results[name] = self.run_scenario(view, role, max(options['repeat'], 1))
+            except Exception as e:
+                # e.g. the community forum template while its URLs are disabled
+                results[name] = {'error': f'{type(e).__name__}: {e}'}
+                self.stdout.write(self.style.WARNING(f"{name:22} failed: {results[name]['error']}"))
+                continue
+            self.stdout.write(
+                f"{name:22} {results[name]['status']:>3}  {results[name]['queries']:>4} queries  "
+                f"cold {results[name]['cold_ms']:>9.1f} ms  warm {results[name]['warm_ms']:>9.1f} ms  "
+                f"peak {results[name]['peak_kb']:>9.1f} KiB"
+            )
+
+        report = {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'database': connection.vendor,
+            'row_counts': {
+                'residents': User.objects.count(),
+                'staff': Admin.objects.count(),
+                'complaints': Complaint.objects.count(),
+                'assistance_requests': AssistanceRequest.objects.count(),
+                'notifications': Notification.objects.count(),
+                'user_activities': UserActivity.objects.count(),
+                'forum_posts': ForumPost.objects.count(),
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def build_sessions(self):
+        """Session data for each role, using the first matching account in the database."""
+        admin = Admin.objects.filter(role='admin').first() or Admin.objects.first()
+        staff = Admin.objects.filter(role='staff').first()
+        resident = User.objects.first()
+        if not (admin and staff and resident):
+            raise CommandError('Need at least one admin/staff account and one resident; run generate_synthetic_data first.')
+        return {
+            'admin': {'admin_id': admin.id, 'admin_role': 'admin'},
+            'staff': {'staff_id': staff.id, 'admin_role': 'staff'},
+            'resident': {'resident_id': resident.id, 'role': 'resident'},
+        }
+
+    def make_request(self, role):
+        request = self.factory.get('/')
+        request.user = AnonymousUser()
+        request.session = SessionStore()
+        request.session.update(self.sessions[role])
+        request.principal = RequestPrincipal(request.session)
+        return request
+
+    def run_scenario(self, view, role, repeat):
+        """
+        A cold run (empty cache) for time and queries, a second cold run under
+        tracemalloc for peak memory, then ``repeat`` warm runs.
+        """
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = view(self.make_request(role))
+            cold = time.perf_counter() - started
+
+        cache.clear()
+        tracemalloc.start()
+        view(self.make_request(role))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        warm_times = []
+        with CaptureQueriesContext(connection) as warm_queries:
+            for _ in range(repeat):
+                started = time.perf_counter()
+                view(self.make_request(role))
+                warm_times.append(time.perf_counter() - started)
+
+        return {
+            'status': response.status_code,
+            'queries': len(queries.captured_queries),
+            'warm_queries': len(warm_queries.captured_queries) // repeat,
+            'cold_ms': round(cold * 1000, 1),
+            'warm_ms': round(min(warm_times) * 1000, 1),
+            'peak_kb': round(peak / 1024, 1),
+        }
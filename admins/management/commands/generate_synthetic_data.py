@@ -0,0 +1,303 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from admins.analytics_utils import ASSISTANCE_TYPE, BARANGAYS, COMPLAINTS_CATEGORY
+from admins.cache_utils import bump_case_data_version
+from admins.case_stats_utils import rebuild_case_daily_stats
+from admins.geo_utils import encode_geohash
+from admins.notification_counter_utils import rebuild_notification_counters
+from admins.routing_utils import invalidate_routing_table
+from admins.models import Complaint, AssistanceRequest, Notification, UserActivity
+from admins.user_activity_utils import ACTIVITY_TYPES
+from core.models import User, Admin
+from resident.models import ForumPost, PostComment, PostReaction
+
+
+# Every generated account uses this e-mail domain, so runs can be told apart and cleared
+SYNTHETIC_EMAIL_DOMAIN = 'synthetic.invalid'
+
+# Approximate town centre; barangays are scattered around it
+TOWN_CENTER = (11.4200, 124.8400)
+
+FIRST_NAMES = ['Juan', 'Maria', 'Jose', 'Ana', 'Pedro', 'Rosa', 'Carlo', 'Liza', 'Mark', 'Grace', 'Paolo', 'Joy']
+LAST_NAMES = ['Dela Cruz', 'Santos', 'Reyes', 'Garcia', 'Mendoza', 'Lim', 'Bautista', 'Villanueva', 'Ramos', 'Cruz']
+
+STATUS_WEIGHTS = {
+    'complaint': [('pending', 30), ('assigned', 15), ('in_progress', 20), ('resolved', 30), ('closed', 5)],
+    'assistance': [('pending', 30), ('approved', 10), ('in_progress', 20), ('completed', 30), ('rejected', 10)],
+}
+LEVEL_WEIGHTS = [('low', 40), ('medium', 35), ('high', 18), ('urgent', 7)]
+
+
+@contextmanager
+def preserve_timestamps(*models):
+    """Let bulk_create keep the generated created_at values instead of auto_now_add's 'now'."""
+    fields = [model._meta.get_field('created_at') for model in models]
+    previous = [field.auto_now_add for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in zip(fields, previous):
+            field.auto_now_add = value
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic residents, cases, notifications, activities and forum posts for load testing.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--residents', type=int, default=1000, help='Resident accounts to create')
+        parser.add_argument('--staff', type=int, default=20, help='Staff accounts to create')
+        parser.add_argument('--cases', type=int, default=10000, help='Complaints plus assistance requests to create')
+        parser.add_argument('--notifications', type=int, default=20000, help='Notifications to create')
+        parser.add_argument('--activities', type=int, default=20000, help='User activity rows to create')
+        parser.add_argument('--posts', type=int, default=1000, help='Forum posts to create (with comments and reactions)')
+        parser.add_argument('--days', type=int, default=365, help='Spread records over this many past days')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible data')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows written per bulk insert')
+        parser.add_argument('--clear', action='store_true', help='Delete previously generated data first')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.days = max(options['days'], 1)
+        self.locations = self.barangay_locations()
+
+        if options['clear']:
+            self.clear()
+
+        with preserve_timestamps(User, Admin, Complaint, AssistanceRequest, Notification, UserActivity):
+            residents = self.create_residents(options['residents'])
+            staff = self.create_staff(options['staff'])
+            complaints, assistance = self.create_cases(options['cases'], residents, staff)
+            self.create_notifications(options['notifications'], residents, staff, complaints, assistance)
+            self.create_activities(options['activities'], residents, staff, complaints, assistance)
+            self.create_forum(options['posts'], residents)
+
+        rows = rebuild_case_daily_stats()
+        rebuild_notification_counters()
+        invalidate_routing_table()
+        bump_case_data_version()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {len(residents)} residents, {len(staff)} staff, {len(complaints)} complaints, '
+            f'{len(assistance)} assistance requests; rebuilt case daily stats ({rows} rows).'
+        ))
+
+    # --- helpers -----------------------------------------------------------------
+
+    def barangay_locations(self):
+        """A fixed pseudo-random centre point per barangay around the town centre."""
+        placement = random.Random(len(BARANGAYS))
+        return {
+            barangay: (
+                TOWN_CENTER[0] + placement.uniform(-0.06, 0.06),
+                TOWN_CENTER[1] + placement.uniform(-0.06, 0.06),
+            )
+            for barangay in BARANGAYS
+        }
+
+    def weighted(self, choices):
+        values, weights = zip(*choices)
+        return self.rng.choices(values, weights=weights)[0]
+
+    def past_datetime(self):
+        # Skew towards recent dates so the dashboards' recent windows are populated
+        age = self.days * (self.rng.random() ** 2)
+        return self.now - timedelta(days=age)
+
+    def bulk_create(self, model, objects):
+        created = []
+        for start in range(0, len(objects), self.batch_size):
+            created.extend(model.objects.bulk_create(objects[start:start + self.batch_size]))
+        return created
+
+    def clear(self):
+        residents = User.objects.filter(email__endswith=f'@{SYNTHETIC_EMAIL_DOMAIN}')
+        staff = Admin.objects.filter(email__endswith=f'@{SYNTHETIC_EMAIL_DOMAIN}')
+        user_type = ContentType.objects.get_for_model(User)
+        staff_type = ContentType.objects.get_for_model(Admin)
+        Notification.objects.filter(recipient_content_type=user_type, recipient_object_id__in=residents.values('id')).delete()
+        Notification.objects.filter(recipient_content_type=staff_type, recipient_object_id__in=staff.values('id')).delete()
+        UserActivity.objects.filter(user_content_type=user_type, user_object_id__in=residents.values('id')).delete()
+        UserActivity.objects.filter(user_content_type=staff_type, user_object_id__in=staff.values('id')).delete()
+        # Cases, forum posts, comments and reactions cascade from their residents
+        deleted, _ = residents.delete()
+        staff.delete()
+        self.stdout.write(f'Cleared previous synthetic data ({deleted} rows).')
+
+    # --- generators --------------------------------------------------------------
+
+    def create_residents(self, count):
+        offset = User.objects.filter(email__endswith=f'@{SYNTHETIC_EMAIL_DOMAIN}').count()
+        residents = []
+        for i in range(offset, offset + count):
+            barangay = self.rng.choice(BARANGAYS)
+            created_at = self.past_datetime()
+            residents.append(User(
+                first_name=self.rng.choice(FIRST_NAMES),
+                middle_name='',
+                last_name=self.rng.choice(LAST_NAMES),
+                email=f'resident{i}@{SYNTHETIC_EMAIL_DOMAIN}',
+                username=f'synthetic_resident_{i}',
+                phone=f'09{self.rng.randrange(10 ** 9):09d}',
+                barangay=barangay,
+                address=f'Purok {self.rng.randint(1, 7)}, {barangay}, Babatngon, Leyte',
+                password='!',
+                is_verified=self.rng.random() < 0.85,
+                created_at=created_at,
+            ))
+        return [resident.pk for resident in self.bulk_create(User, residents)]
+
+    def create_staff(self, count):
+        offset = Admin.objects.filter(email__endswith=f'@{SYNTHETIC_EMAIL_DOMAIN}').count()
+        departments = ['Health', 'Engineering', 'Peace and Order', 'Social Welfare', 'Environment']
+        staff = []
+        for i in range(offset, offset + count):
+            first_name, last_name = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            staff.append(Admin(
+                username=f'synthetic_staff_{i}',
+                email=f'staff{i}@{SYNTHETIC_EMAIL_DOMAIN}',
+                password='!',
+                role='staff',
+                department=self.rng.choice(departments),
+                position='Officer',
+                first_name=first_name,
+                last_name=last_name,
+                full_name=f'{first_name} {last_name}',
+                created_at=self.now,
+            ))
+        return [member.pk for member in self.bulk_create(Admin, staff)]
+
+    def case_fields(self, case_kind, staff):
+        barangay = self.rng.choice(BARANGAYS)
+        center = self.locations[barangay]
+        latitude = round(center[0] + self.rng.gauss(0, 0.004), 8)
+        longitude = round(center[1] + self.rng.gauss(0, 0.004), 8)
+        status = self.weighted(STATUS_WEIGHTS[case_kind])
+        created_at = self.past_datetime()
+        closed_at = None
+        if status in ('resolved', 'completed', 'closed'):
+            closed_at = min(created_at + timedelta(hours=self.rng.expovariate(1 / 96)), self.now)
+        return {
+            'title': f'Synthetic {case_kind} in {barangay}',
+            'description': 'Generated for load testing.',
+            'status': status,
+            'address': f'Purok {self.rng.randint(1, 7)}, {barangay}, Babatngon, Leyte',
+            'barangay': barangay,
+            'latitude': latitude,
+            'longitude': longitude,
+            'geohash': encode_geohash(latitude, longitude),
+            'assigned_to_id': self.rng.choice(staff) if staff and status != 'pending' else None,
+            'created_at': created_at,
+        }, closed_at
+
+    def create_cases(self, count, residents, staff):
+        if not residents:
+            return [], []
+        complaints, assistance = [], []
+        for _ in range(count):
+            if self.rng.random() < 0.7:
+                fields, closed_at = self.case_fields('complaint', staff)
+                complaints.append(Complaint(
+                    user_id=self.rng.choice(residents),
+                    category=self.rng.choice(COMPLAINTS_CATEGORY),
+                    priority=self.weighted(LEVEL_WEIGHTS),
+                    location_description=fields['address'],
+                    resolved_at=closed_at if fields['status'] == 'resolved' else None,
+                    **fields,
+                ))
+            else:
+                fields, closed_at = self.case_fields('assistance', staff)
+                assistance.append(AssistanceRequest(
+                    user_id=self.rng.choice(residents),
+                    type=self.rng.choice(ASSISTANCE_TYPE),
+                    urgency=self.weighted(LEVEL_WEIGHTS),
+                    completed_at=closed_at if fields['status'] == 'completed' else None,
+                    **fields,
+                ))
+        complaints = self.bulk_create(Complaint, complaints)
+        assistance = self.bulk_create(AssistanceRequest, assistance)
+        return [c.pk for c in complaints], [a.pk for a in assistance]
+
+    def create_notifications(self, count, residents, staff, complaints, assistance):
+        user_type = ContentType.objects.get_for_model(User)
+        staff_type = ContentType.objects.get_for_model(Admin)
+        notification_types = [key for key, _ in Notification.NOTIFICATION_TYPES]
+        notifications = []
+        for _ in range(count if residents else 0):
+            to_staff = staff and self.rng.random() < 0.4
+            complaint_id = self.rng.choice(complaints) if complaints and self.rng.random() < 0.6 else None
+            assistance_id = self.rng.choice(assistance) if assistance and not complaint_id and self.rng.random() < 0.5 else None
+            notifications.append(Notification(
+                recipient_content_type=staff_type if to_staff else user_type,
+                recipient_object_id=self.rng.choice(staff if to_staff else residents),
+                title='Synthetic notification',
+                message='Generated for load testing.',
+                notification_type=self.rng.choice(notification_types),
+                related_complaint_id=complaint_id,
+                related_assistance_id=assistance_id,
+                is_read=self.rng.random() < 0.6,
+                created_at=self.past_datetime(),
+            ))
+        self.bulk_create(Notification, notifications)
+
+    def create_activities(self, count, residents, staff, complaints, assistance):
+        user_type = ContentType.objects.get_for_model(User)
+        staff_type = ContentType.objects.get_for_model(Admin)
+        activity_types = [key for key, _ in ACTIVITY_TYPES]
+        activities = []
+        for _ in range(count if residents else 0):
+            by_staff = staff and self.rng.random() < 0.5
+            activity_type = self.rng.choice(activity_types)
+            activities.append(UserActivity(
+                user_content_type=staff_type if by_staff else user_type,
+                user_object_id=self.rng.choice(staff if by_staff else residents),
+                activity_type=activity_type,
+                activity_category='complaint' if activity_type.startswith('complaint') else 'system',
+                description=f'Synthetic {activity_type}',
+                user_name='Synthetic User',
+                user_type='staff' if by_staff else 'resident',
+                related_complaint_id=self.rng.choice(complaints) if complaints and activity_type.startswith('complaint') else None,
+                related_assistance_id=self.rng.choice(assistance) if assistance and activity_type.startswith('assistance') else None,
+                ip_address=f'10.0.{self.rng.randint(0, 255)}.{self.rng.randint(1, 254)}',
+                is_successful=self.rng.random() < 0.97,
+                created_at=self.past_datetime(),
+            ))
+        self.bulk_create(UserActivity, activities)
+
+    def create_forum(self, count, residents):
+        if not residents:
+            return
+        categories = [key for key, _ in ForumPost.CATEGORY_CHOICES]
+        posts = self.bulk_create(ForumPost, [
+            ForumPost(
+                author_id=self.rng.choice(residents),
+                title='Synthetic forum post',
+                content='Generated for load testing.',
+                category=self.rng.choice(categories),
+                created_at=self.past_datetime(),
+            )
+            for _ in range(count)
+        ])
+
+        comments, reactions = [], []
+        for post in posts:
+            for _ in range(self.rng.randint(0, 5)):
+                comments.append(PostComment(
+                    post_id=post.pk, author_id=self.rng.choice(residents), content='Synthetic comment',
+                ))
+            for user_id in self.rng.sample(residents, min(len(residents), self.rng.randint(0, 10))):
+                reactions.append(PostReaction(
+                    post_id=post.pk, user_id=user_id,
+                    reaction_type=self.rng.choice(['like', 'love', 'support']),
+                ))
+        self.bulk_create(PostComment, comments)
+        self.bulk_create(PostReaction, reactions)
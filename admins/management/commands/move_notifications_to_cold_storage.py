@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from admins.notification_archive_utils import move_to_cold_storage
+
+
+class Command(BaseCommand):
+    help = 'Move archived (and optionally old) notifications out of the hot table into archived_notifications.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, help='Also move notifications older than this many days')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would be moved')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1 or (options['older_than_days'] or 0) < 0:
+            raise CommandError('--chunk-size must be >= 1 and --older-than-days >= 0.')
+        started = time.monotonic()
+
+        def progress(moved, total):
+            self.stdout.write(f'  {moved}/{total} moved ({moved * 100 // total}%)')
+
+        result = move_to_cold_storage(
+            older_than_days=options['older_than_days'],
+            chunk_size=options['chunk_size'],
+            dry_run=options['dry_run'],
+            progress=progress,
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f"Dry run: {result['matched']} notifications would be moved to cold storage.")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Moved {result['moved']} notifications to cold storage "
+            f"in {result['chunks']} chunks ({time.monotonic() - started:.1f}s)."
+        ))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from admins.notification_utils import purge_notifications
+
+
+class Command(BaseCommand):
+    help = 'Permanently delete old notifications in small chunks (counters are kept exact).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=365, help='Delete notifications older than this many days')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows deleted per transaction')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between chunks')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would be deleted')
+
+    def handle(self, *args, **options):
+        if options['days'] < 0 or options['chunk_size'] < 1:
+            raise CommandError('--days must be >= 0 and --chunk-size >= 1.')
+        started = time.monotonic()
+
+        def progress(deleted, total):
+            self.stdout.write(f'  {deleted}/{total} deleted ({deleted * 100 // total}%)')
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        result = purge_notifications(
+            days=options['days'],
+            chunk_size=options['chunk_size'],
+            dry_run=options['dry_run'],
+            progress=progress,
+        )
+
+        cutoff = result['cutoff'].strftime('%Y-%m-%d %H:%M')
+        if options['dry_run']:
+            self.stdout.write(f"Dry run: {result['matched']} notifications created before {cutoff} would be deleted.")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {result['deleted']} notifications created before {cutoff} "
+            f"in {result['chunks']} chunks ({time.monotonic() - started:.1f}s)."
+        ))
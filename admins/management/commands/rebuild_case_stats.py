@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from admins.case_stats_utils import rebuild_case_daily_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the CaseDailyStats rollup table from the complaints and assistance requests tables.'
+
+    def handle(self, *args, **options):
+        rows = rebuild_case_daily_stats()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt case daily stats: {rows} rollup rows written.'))
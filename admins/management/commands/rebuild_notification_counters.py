@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from admins.notification_counter_utils import rebuild_notification_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-recipient NotificationCounter rows from the notifications table.'
+
+    def handle(self, *args, **options):
+        rows = rebuild_notification_counters()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt notification counters: {rows} recipients.'))
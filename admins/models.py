@@ -1,10 +1,13 @@
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import F
 from django.utils import timezone
 from core.models import User, Admin
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
 from core.models import User, Admin
 from admins.user_activity_utils import ACTIVITY_TYPES, ACTIVITY_CATEGORIES
+from admins.barangay_utils import resolve_barangay
+from admins.geo_utils import encode_geohash
 
 
 # Create your models here.
@@ -36,6 +39,8 @@ class Complaint(models.Model):
     address = models.TextField(blank=True, null=True)
     latitude = models.DecimalField(max_digits=10, decimal_places=8, blank=True, null=True)
     longitude = models.DecimalField(max_digits=11, decimal_places=8, blank=True, null=True)
+    barangay = models.CharField(max_length=100, blank=True, default='', db_index=True, help_text="Resolved from the location fields on save")
+    geohash = models.CharField(max_length=12, blank=True, default='', db_index=True, help_text="Heatmap cell key computed from latitude/longitude on save")
     assigned_to = models.ForeignKey(Admin, null=True, blank=True, on_delete=models.SET_NULL)
     assigned_by = models.ForeignKey(Admin, null=True, blank=True, on_delete=models.SET_NULL, related_name='assigned_complaints')
     admin_remarks = models.TextField(blank=True, null=True)
@@ -49,6 +54,17 @@ class Complaint(models.Model):
         verbose_name = 'Complaint'
         verbose_name_plural = 'Complaints'
 
+    def save(self, *args, **kwargs):
+        # Normalize the free-text location into a barangay once, at write time
+        self.barangay = resolve_barangay(self.location, self.address, self.location_description)
+        self.geohash = encode_geohash(self.latitude, self.longitude)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'location', 'address', 'location_description'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'barangay'}
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'geohash'}
+        super().save(*args, **kwargs)
+
 
 # Assistance Requests Table
 class AssistanceRequest(models.Model):
@@ -77,6 +93,8 @@ class AssistanceRequest(models.Model):
     address = models.TextField(blank=True, null=True)
     latitude = models.DecimalField(max_digits=10, decimal_places=8, blank=True, null=True)
     longitude = models.DecimalField(max_digits=11, decimal_places=8, blank=True, null=True)
+    barangay = models.CharField(max_length=100, blank=True, default='', db_index=True, help_text="Resolved from the address on save")
+    geohash = models.CharField(max_length=12, blank=True, default='', db_index=True, help_text="Heatmap cell key computed from latitude/longitude on save")
     assigned_to = models.ForeignKey(Admin, null=True, blank=True, on_delete=models.SET_NULL)
     assigned_by = models.ForeignKey(Admin, null=True, blank=True, on_delete=models.SET_NULL, related_name='assigned_assistances')
     assigned_date = models.DateTimeField(null=True, blank=True)
@@ -93,6 +111,17 @@ class AssistanceRequest(models.Model):
         verbose_name = 'Assistance Request'
         verbose_name_plural = 'Assistance Requests'
 
+    def save(self, *args, **kwargs):
+        # Normalize the free-text address into a barangay once, at write time
+        self.barangay = resolve_barangay(self.address)
+        self.geohash = encode_geohash(self.latitude, self.longitude)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'address' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'barangay'}
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'geohash'}
+        super().save(*args, **kwargs)
+
 
 # Complaint Attachments Table
 class ComplaintAttachment(models.Model):
@@ -206,6 +235,12 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     is_archived = models.BooleanField(default=False)
     archived_at = models.DateTimeField(null=True, blank=True)
+
+    # Number of events merged into this row by digest coalescing (see create_or_coalesce)
+    digest_count = models.PositiveIntegerField(default=1)
+
+    # Rows in the hot table; ArchivedNotification sets this to True
+    is_cold = False
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -217,13 +252,33 @@ class Notification(models.Model):
         verbose_name_plural = 'Notifications'
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['recipient_content_type', 'recipient_object_id', 'is_read']),
+            # Inbox access paths: recipient (or every recipient of a type, for the admin
+            # inbox) + read/archived filter, newest first; the trailing (created_at, id)
+            # also serves keyset pagination (see pagination_utils)
+            models.Index(
+                fields=['recipient_content_type', 'recipient_object_id', 'is_archived', '-created_at', '-id'],
+                name='notif_inbox_archived_idx',
+            ),
+            models.Index(
+                fields=['recipient_content_type', 'recipient_object_id', 'is_read', '-created_at', '-id'],
+                name='notif_inbox_read_idx',
+            ),
+            models.Index(fields=['recipient_content_type', '-created_at', '-id'], name='notif_type_inbox_idx'),
+            models.Index(
+                fields=['recipient_content_type', 'is_read', '-created_at', '-id'],
+                name='notif_type_read_idx',
+            ),
             models.Index(fields=['sender_content_type', 'sender_object_id']),
             models.Index(fields=['notification_type']),
             models.Index(fields=['priority']),
             models.Index(fields=['created_at']),
         ]
     
+    def save(self, *args, **kwargs):
+        # The counter updates in the signal handlers commit or roll back with this row
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         recipient_name = getattr(self.recipient, 'get_full_name', lambda: getattr(self.recipient, 'username', str(self.recipient)))()
         return f"{self.notification_type} - {self.title} (To: {recipient_name})"
@@ -327,32 +382,163 @@ class Notification(models.Model):
         )
     
     @classmethod
-    def notify_admins(cls, sender=None, title='', message='', notification_type='other', 
-                     action_type='created', priority='normal', related_complaint=None, 
-                     related_assistance=None):
+    def create_or_coalesce(cls, recipient, window, sender=None, title='', message='',
+                           notification_type='other', action_type='created', priority='normal',
+                           related_complaint=None, related_assistance=None):
         """
-        Helper method to notify all active admins
+        Like create_notification(), but fold repeated events into one digest row.
+
+        An unread, unarchived notification of the same recipient, notification_type and
+        related case whose latest event (updated_at) falls within the last ``window`` is
+        updated in place instead: digest_count goes up by one, title/message/sender/action
+        take the latest values, the priority is raised if needed and updated_at moves to
+        now, so the window slides with each merged event. created_at keeps the first
+        event's time, so the (created_at, id) keyset pagination stays stable while a
+        digest grows. The row stays unread, so the unread counter needs no adjustment.
+
+        Args:
+            recipient: Admin or User object
+            window (timedelta): Coalescing window; falsy to always insert
+            Remaining arguments as in create_notification()
+
+        Returns:
+            Notification: The created or updated notification
         """
-        
-        active_admins = Admin.objects.filter(is_active=True)
-        notifications = []
-        
-        for admin in active_admins:
-            notification = cls.create_notification(
-                recipient=admin,
-                sender=sender,
+        if not window:
+            return cls.create_notification(
+                recipient, sender=sender, title=title, message=message,
+                notification_type=notification_type, action_type=action_type, priority=priority,
+                related_complaint=related_complaint, related_assistance=related_assistance,
+            )
+
+        from admins.notification_stream_utils import publish_notifications
+
+        recipient_ct = ContentType.objects.get_for_model(recipient)
+        sender_ct = ContentType.objects.get_for_model(sender) if sender else None
+        now = timezone.now()
+
+        with transaction.atomic():
+            existing = cls.objects.select_for_update().filter(
+                recipient_content_type=recipient_ct,
+                recipient_object_id=recipient.id,
+                is_read=False,
+                is_archived=False,
+                notification_type=notification_type,
+                related_complaint=related_complaint,
+                related_assistance=related_assistance,
+                updated_at__gte=now - window,
+            ).order_by('-updated_at', '-id').first()
+
+            if existing is None:
+                return cls.create_notification(
+                    recipient, sender=sender, title=title, message=message,
+                    notification_type=notification_type, action_type=action_type, priority=priority,
+                    related_complaint=related_complaint, related_assistance=related_assistance,
+                )
+
+            ranks = [level for level, _ in cls.PRIORITY_LEVELS]
+            if ranks.index(priority) < ranks.index(existing.priority):
+                priority = existing.priority
+
+            # queryset.update() so the counter signals (nothing to adjust) are skipped
+            cls.objects.filter(pk=existing.pk).update(
+                digest_count=F('digest_count') + 1,
+                sender_content_type=sender_ct,
+                sender_object_id=sender.id if sender else None,
+                title=title,
+                message=message,
+                action_type=action_type,
+                priority=priority,
+                updated_at=now,
+            )
+            existing.refresh_from_db()
+            publish_notifications([existing])
+        return existing
+
+    @classmethod
+    def bulk_notify(cls, recipients, sender=None, title='', message='', notification_type='other',
+                    action_type='created', priority='normal', related_complaint=None,
+                    related_assistance=None):
+        """
+        Send the same notification to many recipients with a single bulk INSERT.
+
+        Content types come from ContentType's cache, rows are written with bulk_create and
+        notifications_fanned_out (admins.signals) is sent once in the same transaction, so
+        the query count does not grow with the number of recipients. Databases that cannot
+        return primary keys from a bulk INSERT fall back to one save() per recipient.
+
+        Args:
+            recipients: Queryset (only ids are fetched) or iterable of Admin/User objects
+            Remaining arguments as in create_notification()
+
+        Returns:
+            list: Created Notification objects
+        """
+        from django.db.models.query import QuerySet
+        from admins.signals import notifications_fanned_out
+
+        if isinstance(recipients, QuerySet):
+            recipient_ct = ContentType.objects.get_for_model(recipients.model)
+            targets = [(recipient_ct, pk) for pk in recipients.values_list('pk', flat=True)]
+        else:
+            targets = [(ContentType.objects.get_for_model(recipient), recipient.pk) for recipient in recipients]
+
+        if not targets:
+            return []
+
+        sender_ct = ContentType.objects.get_for_model(sender) if sender else None
+        rows = [
+            cls(
+                recipient_content_type=recipient_ct,
+                recipient_object_id=recipient_id,
+                sender_content_type=sender_ct,
+                sender_object_id=sender.id if sender else None,
                 title=title,
                 message=message,
                 notification_type=notification_type,
                 action_type=action_type,
                 priority=priority,
                 related_complaint=related_complaint,
-                related_assistance=related_assistance
+                related_assistance=related_assistance,
             )
-            notifications.append(notification)
-        
+            for recipient_ct, recipient_id in targets
+        ]
+
+        with transaction.atomic():
+            if not connection.features.can_return_rows_from_bulk_insert:
+                # e.g. MySQL: bulk_create leaves pk unset, which the counter and stream
+                # receivers need, so save row by row and let post_save handle each one
+                for row in rows:
+                    row.save()
+                return rows
+
+            notifications = cls.objects.bulk_create(rows)
+            notifications_fanned_out.send(sender=cls, notifications=notifications)
+
         return notifications
 
+    @classmethod
+    def notify_admins(cls, sender=None, title='', message='', notification_type='other', 
+                     action_type='created', priority='normal', related_complaint=None, 
+                     related_assistance=None, recipients=None):
+        """
+        Helper method to notify all active admins (or ``recipients``) in one bulk insert
+        """
+        if recipients is None:
+            recipients = Admin.objects.filter(is_active=True)
+
+        return cls.bulk_notify(
+            recipients,
+            sender=sender,
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            action_type=action_type,
+            priority=priority,
+            related_complaint=related_complaint,
+            related_assistance=related_assistance,
+        )
+
 
 # User Activity Tracking
 class UserActivity(models.Model):
@@ -438,3 +624,168 @@ class UserActivity(models.Model):
 
     
 
+
+
+# Daily Case Statistics Rollup
+class CaseDailyStats(models.Model):
+    """
+    Pre-aggregated case counts per day used by the dashboards.
+    One row per (date, case kind, category/type, status, priority/urgency, barangay, assigned staff).
+
+    Kept up to date incrementally by the signals in signals.py; rebuild with
+    `python manage.py rebuild_case_stats`.
+    """
+
+    CASE_KINDS = [
+        ('complaint', 'Complaint'),
+        ('assistance', 'Assistance Request'),
+    ]
+
+    date = models.DateField(help_text="Local (Asia/Manila) date the cases were filed")
+    case_kind = models.CharField(max_length=20, choices=CASE_KINDS)
+    category = models.CharField(max_length=50, help_text="Complaint category or assistance type")
+    status = models.CharField(max_length=20)
+    priority = models.CharField(max_length=20, help_text="Complaint priority or assistance urgency")
+    barangay = models.CharField(max_length=100, blank=True, default='')
+    assigned_to = models.ForeignKey(
+        Admin, null=True, blank=True, on_delete=models.SET_NULL, related_name='case_daily_stats'
+    )
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'case_daily_stats'
+        verbose_name = 'Case Daily Stats'
+        verbose_name_plural = 'Case Daily Stats'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'case_kind', 'category', 'status', 'priority', 'barangay', 'assigned_to'],
+                name='unique_case_daily_stats_key',
+            ),
+            # NULLs are distinct in the key above, so unassigned rows need their own
+            models.UniqueConstraint(
+                fields=['date', 'case_kind', 'category', 'status', 'priority', 'barangay'],
+                condition=models.Q(assigned_to__isnull=True),
+                name='unique_case_daily_stats_unassigned_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['case_kind', 'date']),
+            models.Index(fields=['assigned_to', 'case_kind', 'date']),
+            models.Index(fields=['case_kind', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.case_kind} {self.category} ({self.status}): {self.count}"
+
+
+# Per-recipient Notification Counters
+class NotificationCounter(models.Model):
+    """
+    Denormalized notification counts per recipient, so the navigation badges are a
+    single unique-key read instead of a COUNT(*) over notifications.
+
+    Kept exact by notification_counter_utils (notification signals and the bulk
+    helpers) inside the same transaction as the notification write; rebuild with
+    `python manage.py rebuild_notification_counters`.
+    """
+
+    recipient_content_type = models.ForeignKey(
+        ContentType, on_delete=models.CASCADE, related_name='notification_counters'
+    )
+    recipient_object_id = models.PositiveIntegerField()
+    unread = models.IntegerField(default=0, help_text="Unread and not archived (what the badges show)")
+    archived = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'notification_counters'
+        verbose_name = 'Notification Counter'
+        verbose_name_plural = 'Notification Counters'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipient_content_type', 'recipient_object_id'],
+                name='unique_notification_counter_recipient',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient_content_type_id}:{self.recipient_object_id} unread={self.unread} archived={self.archived}"
+
+
+# Cold storage for archived/old notifications
+class ArchivedNotification(models.Model):
+    """
+    Append-only copy of notifications moved out of the hot `notifications` table.
+
+    Rows are written by notification_archive_utils.move_to_cold_storage() (the
+    `move_notifications_to_cold_storage` command) and only read by the "Archive history"
+    inbox filter, so the hot table and its indexes only carry live notifications.
+    Field names match Notification so the inbox row templates render either model.
+    """
+
+    original_id = models.PositiveIntegerField(help_text="Primary key the row had in notifications")
+
+    recipient_content_type = models.ForeignKey(
+        ContentType, on_delete=models.CASCADE, related_name='archived_notification_recipients'
+    )
+    recipient_object_id = models.PositiveIntegerField()
+    recipient = GenericForeignKey('recipient_content_type', 'recipient_object_id')
+
+    sender_content_type = models.ForeignKey(
+        ContentType, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_notification_senders'
+    )
+    sender_object_id = models.PositiveIntegerField(null=True, blank=True)
+    sender = GenericForeignKey('sender_content_type', 'sender_object_id')
+
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    notification_type = models.CharField(max_length=30, choices=Notification.NOTIFICATION_TYPES, default='other')
+    action_type = models.CharField(max_length=20, choices=Notification.ACTION_TYPES, default='created')
+    priority = models.CharField(max_length=10, choices=Notification.PRIORITY_LEVELS, default='normal')
+
+    related_complaint = models.ForeignKey(
+        Complaint, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_notifications'
+    )
+    related_assistance = models.ForeignKey(
+        AssistanceRequest, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_notifications'
+    )
+
+    is_read = models.BooleanField(default=False)
+    archived_at = models.DateTimeField(null=True, blank=True)
+    digest_count = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(help_text="When the original notification was created")
+    moved_at = models.DateTimeField(auto_now_add=True)
+
+    # Everything in cold storage counts as archived and is read-only
+    is_archived = True
+    is_cold = True
+
+    class Meta:
+        db_table = 'archived_notifications'
+        verbose_name = 'Archived Notification'
+        verbose_name_plural = 'Archived Notifications'
+        indexes = [
+            models.Index(
+                fields=['recipient_content_type', 'recipient_object_id', '-created_at', '-id'],
+                name='archived_notif_inbox_idx',
+            ),
+            models.Index(fields=['recipient_content_type', '-created_at', '-id'], name='archived_notif_type_idx'),
+            models.Index(fields=['original_id']),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk:
+            raise ValueError("Archived notifications are append-only")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.notification_type} - {self.title} (archived #{self.original_id})"
+
+    def get_case_type(self):
+        """Get the type of related case"""
+        if self.related_complaint:
+            return 'complaint'
+        elif self.related_assistance:
+            return 'assistance'
+        return None
+
@@ -0,0 +1,73 @@
+"""
+Cold-storage tier for notifications.
+Archived notifications (and, optionally, anything older than a cut-off) are copied into
+the append-only ArchivedNotification table and removed from the hot `notifications`
+table in primary-key chunks, each chunk in one short transaction. The inbox queries and
+indexes then only cover live rows; the "Archive history" filter reads the cold table.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from admins.models import ArchivedNotification, Notification
+from admins.notification_counter_utils import delete_notifications
+
+
+# Notification columns copied as-is into ArchivedNotification
+COLD_STORAGE_FIELDS = (
+    'recipient_content_type_id', 'recipient_object_id', 'sender_content_type_id', 'sender_object_id',
+    'title', 'message', 'notification_type', 'action_type', 'priority',
+    'related_complaint_id', 'related_assistance_id', 'is_read', 'archived_at', 'digest_count', 'created_at',
+)
+
+
+def cold_storage_candidates(older_than_days=None, now=None):
+    """
+    Notifications due for cold storage: every archived one, plus (with
+    ``older_than_days``) every one created before the cut-off.
+    """
+    condition = Q(is_archived=True)
+    if older_than_days is not None:
+        condition |= Q(created_at__lt=(now or timezone.now()) - timedelta(days=older_than_days))
+    return Notification.objects.filter(condition)
+
+
+def move_to_cold_storage(older_than_days=None, chunk_size=1000, dry_run=False, progress=None):
+    """
+    Move cold_storage_candidates() into ArchivedNotification.
+
+    Args:
+        older_than_days (int, optional): Also move notifications older than this
+        chunk_size (int): Rows copied and deleted per transaction
+        dry_run (bool): Only count what would be moved
+        progress (callable, optional): Called as progress(moved, total) after each chunk
+
+    Returns:
+        dict: {'matched', 'moved', 'chunks'}
+    """
+    candidates = cold_storage_candidates(older_than_days)
+    total = candidates.count()
+    result = {'matched': total, 'moved': 0, 'chunks': 0}
+    if dry_run:
+        return result
+
+    last_pk = 0
+    while True:
+        pks = list(candidates.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:chunk_size])
+        if not pks:
+            return result
+        with transaction.atomic():
+            chunk = Notification.objects.filter(pk__in=pks)
+            ArchivedNotification.objects.bulk_create([
+                ArchivedNotification(original_id=row.pop('id'), **row)
+                for row in chunk.values('id', *COLD_STORAGE_FIELDS)
+            ])
+            # One DELETE and a bulk counter adjustment per chunk, not a query per row
+            result['moved'] += delete_notifications(chunk, chunk_size=len(pks))
+        result['chunks'] += 1
+        if progress:
+            progress(result['moved'], total)
+        last_pk = pks[-1]
@@ -0,0 +1,226 @@
+"""
+Maintenance and query helpers for the NotificationCounter table.
+Counters are adjusted with F() updates from the notification signals (see signals.py)
+and from the bulk helpers below, always inside the transaction that changes the
+notifications, and can be rebuilt from scratch with the
+`rebuild_notification_counters` management command.
+"""
+
+from collections import Counter, defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+
+from admins.models import Notification, NotificationCounter
+from admins.notification_stream_utils import publish_unread_deltas
+
+
+COUNTER_FIELDS = ('unread', 'archived')
+
+
+def counter_flags(is_read, is_archived):
+    """How much one notification with these flags contributes to each counter."""
+    return {
+        'unread': int(not is_read and not is_archived),
+        'archived': int(bool(is_archived)),
+    }
+
+
+def flags_for_instance(notification):
+    return counter_flags(notification.is_read, notification.is_archived)
+
+
+def flags_from_database(notification):
+    """Counter contribution of the stored version of a notification, or None if it is not saved yet."""
+    if not notification.pk:
+        return None
+    values = Notification.objects.filter(pk=notification.pk).values('is_read', 'is_archived').first()
+    if not values:
+        return None
+    return counter_flags(values['is_read'], values['is_archived'])
+
+
+def recipient_key(notification):
+    return notification.recipient_content_type_id, notification.recipient_object_id
+
+
+def apply_counter_delta(key, unread=0, archived=0):
+    """
+    Add the deltas to the counter row for ``key`` (content type id, object id), creating it when missing.
+
+    The update is a single-row F() expression so concurrent writers do not lose increments.
+    """
+    if not unread and not archived:
+        return
+    publish_unread_deltas({key: unread})
+    content_type_id, object_id = key
+    lookup = {'recipient_content_type_id': content_type_id, 'recipient_object_id': object_id}
+    changes = {'unread': F('unread') + unread, 'archived': F('archived') + archived}
+    with transaction.atomic():
+        if NotificationCounter.objects.filter(**lookup).update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                NotificationCounter.objects.create(unread=unread, archived=archived, **lookup)
+        except IntegrityError:
+            # Another writer created the row first
+            NotificationCounter.objects.filter(**lookup).update(**changes)
+
+
+def move_notification(key, old_flags, new_flags):
+    """Move one notification of ``key`` from ``old_flags`` to ``new_flags`` (either may be None)."""
+    old_flags = old_flags or counter_flags(True, False)
+    new_flags = new_flags or counter_flags(True, False)
+    apply_counter_delta(key, **{field: new_flags[field] - old_flags[field] for field in COUNTER_FIELDS})
+
+
+def count_notifications(notifications):
+    """Counter deltas per recipient for a list of newly created notifications."""
+    deltas = {}
+    for notification in notifications:
+        flags = flags_for_instance(notification)
+        entry = deltas.setdefault(recipient_key(notification), Counter())
+        entry.update(flags)
+    return deltas
+
+
+def apply_counter_deltas(deltas):
+    """
+    Apply {recipient key: {'unread': n, 'archived': n}} with a constant number of queries.
+
+    Recipients sharing the same content type and deltas (the usual fan-out case) are
+    handled together: missing rows are inserted with ignore_conflicts, then a single
+    F() UPDATE adjusts them all.
+    """
+    groups = defaultdict(list)
+    for (content_type_id, object_id), delta in deltas.items():
+        unread, archived = delta.get('unread', 0), delta.get('archived', 0)
+        if unread or archived:
+            groups[(content_type_id, unread, archived)].append(object_id)
+    publish_unread_deltas({key: delta.get('unread', 0) for key, delta in deltas.items()})
+
+    with transaction.atomic():
+        for (content_type_id, unread, archived), object_ids in groups.items():
+            NotificationCounter.objects.bulk_create(
+                [
+                    NotificationCounter(recipient_content_type_id=content_type_id, recipient_object_id=object_id)
+                    for object_id in object_ids
+                ],
+                ignore_conflicts=True,
+                batch_size=1000,
+            )
+            NotificationCounter.objects.filter(
+                recipient_content_type_id=content_type_id, recipient_object_id__in=object_ids,
+            ).update(unread=F('unread') + unread, archived=F('archived') + archived)
+
+
+def grouped_counter_deltas(queryset, changes=None):
+    """
+    Counter deltas per recipient for changing (or, with ``changes=None``, deleting)
+    every row of ``queryset``, from one GROUP BY query.
+    """
+    rows = queryset.values(
+        'recipient_content_type_id', 'recipient_object_id', 'is_read', 'is_archived',
+    ).annotate(cnt=Count('pk')).order_by()
+    deltas = {}
+    for row in rows:
+        old = counter_flags(row['is_read'], row['is_archived'])
+        if changes is None:
+            new = counter_flags(True, False)
+        else:
+            new = counter_flags(changes.get('is_read', row['is_read']), changes.get('is_archived', row['is_archived']))
+        entry = deltas.setdefault((row['recipient_content_type_id'], row['recipient_object_id']), Counter())
+        for field in COUNTER_FIELDS:
+            entry[field] += (new[field] - old[field]) * row['cnt']
+    return deltas
+
+
+def update_notifications(queryset, **changes):
+    """
+    queryset.update() for is_read/is_archived changes that keeps the counters exact.
+
+    The affected rows are grouped by recipient and their old flags before the update,
+    and both the update and the counter adjustments run in one transaction.
+
+    Returns:
+        int: Number of notifications updated
+    """
+    with transaction.atomic():
+        deltas = grouped_counter_deltas(queryset, changes)
+        updated = queryset.update(**changes)
+        apply_counter_deltas(deltas)
+    return updated
+
+
+def delete_notifications(queryset, chunk_size=500):
+    """
+    Delete ``queryset`` with a constant number of queries, keeping the counters exact.
+
+    QuerySet.delete() loads every row to send post_delete, and the counter receiver
+    then issues one UPDATE per notification. Here the counter changes are computed
+    once with a GROUP BY, the rows are removed with one DELETE per ``chunk_size``
+    primary keys and the counters are adjusted in bulk, all in one transaction.
+    The DELETE goes through QuerySet._raw_delete() on a pk-filtered queryset, which
+    skips the per-row signals; that is safe because nothing references
+    notifications (no cascades) and the counters are the only thing the signal
+    maintains.
+
+    Returns:
+        int: Number of notifications deleted
+    """
+    with transaction.atomic():
+        deltas = grouped_counter_deltas(queryset)
+        pks = list(queryset.order_by().values_list('pk', flat=True))
+        deleted = 0
+        for start in range(0, len(pks), chunk_size):
+            chunk = Notification.objects.filter(pk__in=pks[start:start + chunk_size])
+            deleted += chunk._raw_delete(chunk.db)
+        apply_counter_deltas(deltas)
+    return deleted
+
+
+def unread_notification_count(model, object_id):
+    """
+    Badge count for one recipient from its counter row.
+
+    Args:
+        model: Recipient model class (Admin or User)
+        object_id (int): Recipient id
+
+    Returns:
+        int: Unread, non-archived notifications
+    """
+    if not object_id:
+        return 0
+    content_type = ContentType.objects.get_for_model(model)
+    unread = NotificationCounter.objects.filter(
+        recipient_content_type=content_type, recipient_object_id=object_id,
+    ).values_list('unread', flat=True).first()
+    return unread or 0
+
+
+def rebuild_notification_counters():
+    """
+    Recompute every counter from the notifications table.
+
+    Returns:
+        int: Number of counter rows written
+    """
+    grouped = Notification.objects.values('recipient_content_type_id', 'recipient_object_id').annotate(
+        unread=Count('pk', filter=Q(is_read=False, is_archived=False)),
+        archived=Count('pk', filter=Q(is_archived=True)),
+    ).order_by()
+    rows = [
+        NotificationCounter(
+            recipient_content_type_id=row['recipient_content_type_id'],
+            recipient_object_id=row['recipient_object_id'],
+            unread=row['unread'],
+            archived=row['archived'],
+        )
+        for row in grouped
+    ]
+    with transaction.atomic():
+        NotificationCounter.objects.all().delete()
+        NotificationCounter.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
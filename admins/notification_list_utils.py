@@ -0,0 +1,39 @@
+"""
+Batch loading of what notification inbox rows display.
+Notification.sender/recipient are GenericForeignKeys, so touching them row by row costs
+one query per row (plus one for the content type behind get_sender_type() and
+get_recipient_type()). load_notification_rows() resolves a whole page up front instead:
+content types come from ContentType's cache, and senders and recipients are fetched
+with one IN query per content type and attached to the rows.
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import prefetch_related_objects
+
+
+def load_notification_rows(notifications):
+    """
+    Attach content types, senders, recipients and related cases to a page of notifications.
+
+    Args:
+        notifications: Iterable of Notification or ArchivedNotification objects
+            (e.g. keyset_page()['items'])
+
+    Returns:
+        list: The same notifications, safe to render without per-row queries
+
+    Usage:
+        page = keyset_page(notifications, cursor, NOTIFICATIONS_PER_PAGE)
+        page['items'] = load_notification_rows(page['items'])
+    """
+    notifications = list(notifications)
+    for notification in notifications:
+        # Assigning the cached ContentType fills the FK cache without a query
+        notification.recipient_content_type = ContentType.objects.get_for_id(notification.recipient_content_type_id)
+        if notification.sender_content_type_id:
+            notification.sender_content_type = ContentType.objects.get_for_id(notification.sender_content_type_id)
+
+    # GenericForeignKey prefetching groups the object ids by content type (one IN query
+    # each); the case FKs are skipped when the queryset already selected them
+    prefetch_related_objects(notifications, 'sender', 'recipient', 'related_complaint', 'related_assistance')
+    return notifications
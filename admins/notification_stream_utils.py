@@ -0,0 +1,184 @@
+"""
+Publish/subscribe for real-time notification delivery (see views/notification_stream.py).
+Events are published per recipient channel after the notification write commits:
+- 'notification': a new row for the recipient
+- 'unread_delta': a change of the recipient's unread badge count
+
+Subscribers wait for events newer than the last id they saw: wait() blocks the
+calling thread, wait_async() only suspends the coroutine, which is what lets the
+ASGI stream hold many open connections without a thread each.
+
+The default InProcessBroker keeps a short ring buffer per channel in memory, so it
+only reaches clients connected to the same process. Set NOTIFICATION_BROKER to the
+dotted path of another class with the same publish()/wait()/wait_async()/
+last_event_id() interface (e.g. one backed by Redis pub/sub) to fan out across processes.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+class InProcessBroker:
+    """
+    Thread-safe in-memory event log per channel.
+
+    Each channel keeps its last ``buffer_size`` events so a reconnecting client can
+    resume from Last-Event-ID; channels idle for ``retention`` seconds are dropped.
+    """
+
+    def __init__(self, buffer_size=100, retention=300):
+        self.buffer_size = buffer_size
+        self.retention = retention
+        self._condition = threading.Condition()
+        self._channels = {}
+        self._last_id = 0
+        # channel -> {(event loop, asyncio.Event)} of suspended wait_async() calls
+        self._async_waiters = {}
+
+    def publish(self, channel, event_type, data):
+        """
+        Append an event to ``channel`` and wake its waiters.
+
+        Returns:
+            int: The event id
+        """
+        with self._condition:
+            self._last_id += 1
+            now = time.monotonic()
+            events = self._channels.setdefault(channel, deque(maxlen=self.buffer_size))
+            events.append({'id': self._last_id, 'type': event_type, 'data': data, 'at': now})
+            self._prune(now)
+            self._condition.notify_all()
+            # publish() runs in whichever thread committed, so wake coroutines through their loop
+            for loop, woken in self._async_waiters.get(channel, ()):
+                loop.call_soon_threadsafe(woken.set)
+            return self._last_id
+
+    def wait(self, channel, after_id, timeout):
+        """
+        Events of ``channel`` with an id above ``after_id``, blocking up to ``timeout``
+        seconds for the first one.
+
+        Returns:
+            list: [{'id', 'type', 'data'}], empty on timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                events = self._events_after(channel, after_id)
+                remaining = deadline - time.monotonic()
+                if events or remaining <= 0:
+                    return events
+                self._condition.wait(remaining)
+
+    async def wait_async(self, channel, after_id, timeout):
+        """wait() for coroutines: suspends instead of blocking a thread."""
+        deadline = time.monotonic() + timeout
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._condition:
+            self._async_waiters.setdefault(channel, set()).add(waiter)
+        try:
+            while True:
+                with self._condition:
+                    events = self._events_after(channel, after_id)
+                    waiter[1].clear()
+                remaining = deadline - time.monotonic()
+                if events or remaining <= 0:
+                    return events
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._condition:
+                waiters = self._async_waiters.get(channel)
+                waiters.discard(waiter)
+                if not waiters:
+                    del self._async_waiters[channel]
+
+    def last_event_id(self):
+        with self._condition:
+            return self._last_id
+
+    def _events_after(self, channel, after_id):
+        """Events of ``channel`` newer than ``after_id`` (lock held)."""
+        return [
+            {'id': event['id'], 'type': event['type'], 'data': event['data']}
+            for event in self._channels.get(channel, ())
+            if event['id'] > after_id
+        ]
+
+    def _prune(self, now):
+        stale = [
+            channel for channel, events in self._channels.items()
+            if events and now - events[-1]['at'] > self.retention
+        ]
+        for channel in stale:
+            del self._channels[channel]
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """The process-wide broker configured by NOTIFICATION_BROKER."""
+    return import_string(settings.NOTIFICATION_BROKER)()
+
+
+def channel_for(content_type_id, object_id):
+    """Channel name of one recipient (same key as NotificationCounter)."""
+    return f"notifications:{content_type_id}:{object_id}"
+
+
+def notification_event(notification):
+    """Payload of a 'notification' event."""
+    return {
+        'id': notification.pk,
+        'title': notification.title,
+        'message': notification.message[:200],
+        'notification_type': notification.notification_type,
+        'priority': notification.priority,
+        'digest_count': notification.digest_count,
+        'created_at': notification.created_at.isoformat() if notification.created_at else None,
+    }
+
+
+def publish_notifications(notifications):
+    """Publish 'notification' events for newly created rows once the transaction commits."""
+    events = [
+        (channel_for(n.recipient_content_type_id, n.recipient_object_id), notification_event(n))
+        for n in notifications
+    ]
+    if not events:
+        return
+
+    def send():
+        broker = get_broker()
+        for channel, data in events:
+            broker.publish(channel, 'notification', data)
+
+    transaction.on_commit(send)
+
+
+def publish_unread_deltas(deltas):
+    """
+    Publish 'unread_delta' events once the transaction commits.
+
+    Args:
+        deltas (dict): {(content type id, object id): unread change}
+    """
+    events = [(channel_for(*key), delta) for key, delta in deltas.items() if delta]
+    if not events:
+        return
+
+    def send():
+        broker = get_broker()
+        for channel, delta in events:
+            broker.publish(channel, 'unread_delta', {'delta': delta})
+
+    transaction.on_commit(send)
@@ -1,5 +1,10 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.utils import timezone
 from .models import Notification, Complaint, AssistanceRequest
+from .notification_counter_utils import delete_notifications, update_notifications
+from .routing_utils import case_recipient_ids
 from core.models import Admin, User
 
 
@@ -40,6 +45,70 @@ def create_notification(recipient, title, message, notification_type='other',
         return None
 
 
+def create_notifications(recipients, title, message, notification_type='other',
+                         action_type='created', priority='normal', sender=None,
+                         related_complaint=None, related_assistance=None):
+    """
+    Fan the same notification out to many recipients with one bulk insert.
+
+    Args:
+        recipients: Queryset or iterable of recipients (Admin, User, or Staff)
+        Remaining arguments as in create_notification()
+
+    Returns:
+        list: Created notification objects (empty on error)
+    """
+    try:
+        return Notification.bulk_notify(
+            recipients,
+            sender=sender,
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            action_type=action_type,
+            priority=priority,
+            related_complaint=related_complaint,
+            related_assistance=related_assistance,
+        )
+    except Exception as e:
+        print(f"Error creating notifications: {str(e)}")
+        return []
+
+
+def digest_window():
+    """Coalescing window from NOTIFICATION_DIGEST_WINDOW_MINUTES, None when digest mode is off."""
+    minutes = getattr(settings, 'NOTIFICATION_DIGEST_WINDOW_MINUTES', 0)
+    return timedelta(minutes=minutes) if minutes > 0 else None
+
+
+def create_digest_notification(recipient, title, message, notification_type='other',
+                               action_type='created', priority='normal', sender=None,
+                               related_complaint=None, related_assistance=None):
+    """
+    create_notification() in digest mode: repeats for the same recipient, type and case
+    within the digest window update the pending notification instead of adding a row.
+
+    Returns:
+        Notification: Created or updated notification object
+    """
+    try:
+        return Notification.create_or_coalesce(
+            recipient,
+            digest_window(),
+            sender=sender,
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            action_type=action_type,
+            priority=priority,
+            related_complaint=related_complaint,
+            related_assistance=related_assistance,
+        )
+    except Exception as e:
+        print(f"Error creating notification: {str(e)}")
+        return None
+
+
 # Backward compatibility functions
 def create_admin_notification(recipient, title, message, notification_type='other', 
                              action_type='created', priority='normal', sender=None, 
@@ -162,16 +231,17 @@ def notify_status_change(case, new_status, changed_by, old_status=None):
     else:
         kwargs['related_assistance'] = case
     
-    return create_notification(**kwargs)
+    return create_digest_notification(**kwargs)
 
 
 def notify_new_case_filed(case, admins_to_notify=None):
     """
-    Notify admins when a new case is filed by a resident.
+    Notify admins, and the staff whose department handles the case's category, when a
+    new case is filed by a resident (see routing_utils).
     
     Args:
         case: Complaint or AssistanceRequest object
-        admins_to_notify (list, optional): List of admins to notify, otherwise notifies all active admins
+        admins_to_notify (list, optional): List of admins to notify, otherwise the routed recipients
     
     Returns:
         list: List of created notification objects
@@ -180,8 +250,8 @@ def notify_new_case_filed(case, admins_to_notify=None):
     case_priority = getattr(case, 'priority', getattr(case, 'urgency', 'normal'))
     
     if not admins_to_notify:
-        # Notify all active admins
-        admins_to_notify = Admin.objects.filter(is_active=True)
+        # Admin accounts plus the staff routed to this category (cached recipient set)
+        admins_to_notify = Admin.objects.filter(pk__in=case_recipient_ids(case))
     
     title = f"New {case_type.title()} Filed"
     message = f"A new {case_type} has been filed by {case.user.first_name} {case.user.last_name}: {case.title}"
@@ -199,6 +269,7 @@ def notify_new_case_filed(case, admins_to_notify=None):
         priority=notification_priority,
         related_complaint=case if isinstance(case, Complaint) else None,
         related_assistance=case if isinstance(case, AssistanceRequest) else None,
+        recipients=admins_to_notify,
     )
 
 
@@ -246,7 +317,9 @@ def notify_urgent_case(case, staff_members=None):
     
     Args:
         case: Complaint or AssistanceRequest object
-        staff_members (list, optional): Specific staff to notify, otherwise notifies all active staff
+        staff_members (list, optional): Specific staff to notify, otherwise the admin-role
+            accounts plus the staff routed to the case's category (all active staff when
+            none match), the same recipients as notify_new_case_filed()
     
     Returns:
         list: List of created notification objects
@@ -259,32 +332,21 @@ def notify_urgent_case(case, staff_members=None):
         return []
     
     if not staff_members:
-        staff_members = Admin.objects.filter(is_active=True)
+        staff_members = Admin.objects.filter(pk__in=case_recipient_ids(case))
     
     title = f"URGENT: {case_type.title()} Requires Attention"
     message = f"An urgent {case_type} #{case.id} needs immediate attention: {case.title}"
     
-    notifications = []
-    for staff in staff_members:
-        kwargs = {
-            'recipient': staff,
-            'title': title,
-            'message': message,
-            'notification_type': 'urgent_case',
-            'action_type': 'escalated',
-            'priority': 'urgent',
-        }
-        
-        if isinstance(case, Complaint):
-            kwargs['related_complaint'] = case
-        else:
-            kwargs['related_assistance'] = case
-        
-        notification = create_notification(**kwargs)
-        if notification:
-            notifications.append(notification)
-    
-    return notifications
+    return create_notifications(
+        staff_members,
+        title=title,
+        message=message,
+        notification_type='urgent_case',
+        action_type='escalated',
+        priority='urgent',
+        related_complaint=case if isinstance(case, Complaint) else None,
+        related_assistance=case if isinstance(case, AssistanceRequest) else None,
+    )
 
 
 def notify_case_reassignment(case, new_staff, old_staff, reassigned_by):
@@ -380,7 +442,7 @@ def notify_case_commented(case, commenter, comment_text):
     else:
         resident_kwargs['related_assistance'] = case
     
-    resident_notification = create_notification(**resident_kwargs)
+    resident_notification = create_digest_notification(**resident_kwargs)
     if resident_notification:
         notifications.append(resident_notification)
     
@@ -404,7 +466,7 @@ def notify_case_commented(case, commenter, comment_text):
         else:
             staff_kwargs['related_assistance'] = case
         
-        staff_notification = create_notification(**staff_kwargs)
+        staff_notification = create_digest_notification(**staff_kwargs)
         if staff_notification:
             notifications.append(staff_notification)
     
@@ -440,12 +502,7 @@ def mark_all_as_read(user, notification_type=None):
         if notification_type:
             notifications = notifications.filter(notification_type=notification_type)
         
-        count = 0
-        for notification in notifications:
-            notification.mark_as_read()
-            count += 1
-        
-        return count
+        return update_notifications(notifications, is_read=True)
     except Exception as e:
         print(f"Error marking notifications as read: {str(e)}")
         return 0
@@ -503,10 +560,7 @@ def cleanup_old_notifications(days=30):
             is_archived=False
         )
         
-        count = 0
-        for notification in notifications:
-            notification.archive()
-            count += 1
+        count = update_notifications(notifications, is_archived=True, archived_at=timezone.now())
         
         return {
             'notifications_archived': count
@@ -516,3 +570,45 @@ def cleanup_old_notifications(days=30):
         return {
             'notifications_archived': 0
         }
+
+
+def purge_notifications(days=365, chunk_size=1000, dry_run=False, progress=None):
+    """
+    Permanently delete notifications older than ``days``.
+
+    Rows are removed in primary-key ranges of ``chunk_size`` rows, each in its own short
+    transaction, so SQLite's write lock is released between chunks instead of being
+    held for the whole purge.
+
+    Args:
+        days (int): Delete notifications created more than this many days ago
+        chunk_size (int): Rows per DELETE
+        dry_run (bool): Only count what would be deleted
+        progress (callable, optional): Called as progress(deleted, total) after each chunk
+
+    Returns:
+        dict: {'cutoff', 'matched', 'deleted', 'chunks'}
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    expired = Notification.objects.filter(created_at__lt=cutoff)
+    total = expired.count()
+    result = {'cutoff': cutoff, 'matched': total, 'deleted': 0, 'chunks': 0}
+    if dry_run or not total:
+        return result
+
+    last_pk = 0
+    while True:
+        # Upper bound of the next chunk, found on the primary key index
+        boundary = list(
+            expired.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[chunk_size - 1:chunk_size]
+        )
+        chunk = expired.filter(pk__gt=last_pk)
+        if boundary:
+            chunk = chunk.filter(pk__lte=boundary[0])
+        result['deleted'] += delete_notifications(chunk)
+        result['chunks'] += 1
+        if progress:
+            progress(result['deleted'], total)
+        if not boundary:
+            return result
+        last_pk = boundary[0]
@@ -0,0 +1,68 @@
+"""
+Keyset (cursor) pagination on (created_at, id) for newest-first lists such as the
+notification inboxes.
+Each page continues after the last row of the previous one with a
+(created_at, id) < cursor filter, which an index ending in (created_at, id) answers
+directly instead of scanning and discarding every skipped row like OFFSET does.
+"""
+
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+
+def encode_cursor(obj):
+    """Opaque URL-safe cursor pointing just after ``obj``."""
+    raw = f"{obj.created_at.isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Inverse of encode_cursor().
+
+    Returns:
+        tuple: (created_at, pk)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except ValueError:
+        # binascii.Error and UnicodeDecodeError are ValueErrors too
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+def keyset_page(queryset, cursor=None, page_size=10):
+    """
+    One newest-first page of ``queryset`` starting after ``cursor``.
+
+    Args:
+        queryset: Queryset of a model with created_at
+        cursor (str, optional): next_cursor of the previous page, None for the first page
+        page_size (int): Rows per page
+
+    Returns:
+        dict: {'items': [...], 'has_next': bool, 'next_cursor': str or None}
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    queryset = queryset.order_by('-created_at', '-pk')
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+
+    # One extra row tells whether another page exists without a COUNT(*)
+    items = list(queryset[:page_size + 1])
+    has_next = len(items) > page_size
+    items = items[:page_size]
+    return {
+        'items': items,
+        'has_next': has_next,
+        'next_cursor': encode_cursor(items[-1]) if has_next else None,
+    }
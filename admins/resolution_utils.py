@@ -0,0 +1,126 @@
+"""
+Resolution-time statistics computed in the database (complaints use resolved_at,
+assistance requests completed_at).
+Mean and max come from grouped aggregates over a duration expression; median and p90
+are nearest-rank percentiles picked with ROW_NUMBER() window functions, so only one
+row per group and statistic ever leaves the database.
+"""
+
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, Value, Window
+from django.db.models.functions import Ceil, RowNumber, TruncMonth
+
+from admins.models import Complaint
+
+
+# Supported groupings for resolution_stats(group_by=...), given the end timestamp field
+RESOLUTION_DIMENSIONS = {
+    'priority': lambda end_field: F('priority'),
+    'category': lambda end_field: F('category'),
+    'staff': lambda end_field: F('assigned_to_id'),
+    'month': lambda end_field: TruncMonth(end_field),
+}
+
+PERCENTILES = {
+    'median_days': 0.5,
+    'p90_days': 0.9,
+}
+
+
+def resolution_duration(end_field='resolved_at'):
+    """Expression for the time between filing and resolution."""
+    return ExpressionWrapper(F(end_field) - F('created_at'), output_field=DurationField())
+
+
+def _days(duration):
+    """Convert a timedelta to days rounded to one decimal place."""
+    if duration is None:
+        return None
+    return round(duration.total_seconds() / 86400.0, 1)
+
+
+def _percentile(queryset, fraction):
+    """
+    Nearest-rank percentile of ``duration`` per ``group`` using window functions.
+
+    Returns:
+        dict: {group: timedelta}
+    """
+    rows = queryset.annotate(
+        row_number=Window(RowNumber(), partition_by=[F('group')], order_by=[F('duration').asc(), F('pk').asc()]),
+        group_size=Window(Count('pk'), partition_by=[F('group')]),
+    ).filter(row_number=Ceil(F('group_size') * fraction)).values_list('group', 'duration')
+    return dict(rows)
+
+
+def empty_resolution_stats():
+    """Statistics for a group without resolved cases."""
+    return {'count': 0, 'mean_days': None, 'median_days': None, 'p90_days': None, 'max_days': None}
+
+
+def resolution_stats(queryset=None, group_by=None, end_field='resolved_at'):
+    """
+    Resolution-time statistics (in days) for resolved cases.
+
+    Args:
+        queryset: Complaint queryset to analyse, defaults to all complaints
+        group_by (str, optional): One of RESOLUTION_DIMENSIONS ('priority', 'category',
+            'staff', 'month'); None for a single overall result
+        end_field (str): Resolution timestamp, 'completed_at' for assistance requests
+
+    Returns:
+        dict: {'count', 'mean_days', 'median_days', 'p90_days', 'max_days'} when not grouped,
+              otherwise {group value: that dict}. Groups without resolved cases are omitted.
+
+    Usage:
+        resolution_stats(Complaint.objects.filter(status='resolved'))['mean_days']
+        resolution_stats(group_by='priority')['urgent']['p90_days']
+    """
+    if queryset is None:
+        queryset = Complaint.objects.all()
+    if group_by is not None and group_by not in RESOLUTION_DIMENSIONS:
+        raise ValueError(f"Unsupported resolution grouping: {group_by}")
+
+    group_expression = RESOLUTION_DIMENSIONS[group_by](end_field) if group_by else Value('all')
+    resolved = queryset.filter(**{
+        f'{end_field}__isnull': False,
+        f'{end_field}__gte': F('created_at'),
+    }).annotate(group=group_expression, duration=resolution_duration(end_field)).order_by()
+
+    summary = resolved.values('group').annotate(
+        count=Count('pk'),
+        mean=Avg('duration'),
+        longest=Max('duration'),
+    )
+    stats = {
+        row['group']: {
+            'count': row['count'],
+            'mean_days': _days(row['mean']),
+            'max_days': _days(row['longest']),
+        }
+        for row in summary
+    }
+
+    if stats:
+        for key, fraction in PERCENTILES.items():
+            for group, duration in _percentile(resolved, fraction).items():
+                stats[group][key] = _days(duration)
+
+    if group_by:
+        return stats
+    return stats.get('all', empty_resolution_stats())
+
+
+def average_resolution_days(queryset=None):
+    """Mean resolution time in days for resolved cases, 0 when nothing is resolved yet."""
+    if queryset is None:
+        queryset = Complaint.objects.all()
+    return resolution_stats(queryset.filter(status='resolved'))['mean_days'] or 0
+
+
+def average_resolution_by_priority(queryset=None):
+    """Mean resolution time in days for every complaint priority (None when no data)."""
+    stats = resolution_stats(queryset, group_by='priority')
+    return {
+        key: stats[key]['mean_days'] if key in stats else None
+        for key, _ in Complaint.PRIORITY_LEVELS
+    }
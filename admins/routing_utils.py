@@ -0,0 +1,111 @@
+"""
+Department-aware routing of new-case notifications.
+A routing table maps each complaint category and assistance type (the values offered on
+the filing forms, see analytics_utils.COMPLAINTS_CATEGORY/ASSISTANCE_TYPE) to keywords
+matched case-insensitively against StaffAdmin.department. Admin-role accounts receive
+every case; staff only the categories routed to their department.
+
+The recipient sets for every route are computed together from one query over the active
+accounts and cached; the signals in signals.py drop the cache whenever a StaffAdmin row
+is saved or deleted. Bulk writes that skip signals (queryset.update(), bulk_create) must
+call invalidate_routing_table() themselves.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.models import Admin
+
+
+DEFAULT_NOTIFICATION_ROUTES = {
+    'complaint': {
+        'Sanitation': ['sanitation', 'health', 'environment'],
+        'Safety/Security': ['safety', 'security', 'peace and order', 'tanod'],
+        'Infrastructure': ['infrastructure', 'engineering', 'public works'],
+        'Utilities': ['utilities', 'engineering', 'infrastructure'],
+        'Noise': ['peace and order', 'safety', 'security'],
+        'Environment': ['environment', 'sanitation'],
+        'Disaster/Emergency': ['disaster', 'drrm', 'emergency', 'safety'],
+        'Health': ['health'],
+        'Traffic/Transport': ['traffic', 'transport', 'peace and order'],
+        'Corruption/Abuse': ['legal', 'administration'],
+        'Discrimination': ['social', 'welfare', 'gender', 'legal'],
+        'Service Delivery': ['administration', 'service'],
+    },
+    'assistance': {
+        'Medical': ['health'],
+        'Financial': ['social', 'welfare', 'finance', 'treasury'],
+        'Food/Supplies': ['social', 'welfare', 'disaster', 'drrm'],
+        'Evacuation/Shelter': ['disaster', 'drrm', 'social', 'welfare'],
+        'Legal': ['legal'],
+        'Livelihood': ['livelihood', 'social', 'welfare'],
+        'Education': ['education'],
+        'Transportation': ['transport', 'traffic'],
+        'Disaster/Emergency': ['disaster', 'drrm', 'emergency'],
+    },
+}
+
+ROUTING_CACHE_KEY = 'notifications:routing_table'
+
+# Route used for unlisted categories ("Others") and for routes no staff department matches
+FALLBACK_ROUTE = '*'
+
+
+def notification_routes():
+    """The routing table: NOTIFICATION_ROUTES from settings, else the defaults above."""
+    return getattr(settings, 'NOTIFICATION_ROUTES', DEFAULT_NOTIFICATION_ROUTES)
+
+
+def build_routing_table():
+    """
+    Recipient ids for every route from one query over the active accounts.
+
+    Returns:
+        dict: {'admins': [ids], 'routes': {(case kind, category): [staff ids]},
+               FALLBACK_ROUTE: [all active staff ids]}
+    """
+    accounts = list(Admin.objects.filter(is_active=True).values_list('id', 'role', 'department'))
+    admins = [pk for pk, role, _ in accounts if role == 'admin']
+    staff = [(pk, (department or '').lower()) for pk, role, department in accounts if role != 'admin']
+
+    routes = {}
+    for case_kind, categories in notification_routes().items():
+        for category, keywords in categories.items():
+            routes[(case_kind, category.lower())] = [
+                pk for pk, department in staff
+                if any(keyword.lower() in department for keyword in keywords)
+            ]
+    return {'admins': admins, 'routes': routes, FALLBACK_ROUTE: [pk for pk, _ in staff]}
+
+
+def get_routing_table():
+    """build_routing_table(), cached until a staff account changes."""
+    table = cache.get(ROUTING_CACHE_KEY)
+    if table is None:
+        table = build_routing_table()
+        cache.set(ROUTING_CACHE_KEY, table, getattr(settings, 'NOTIFICATION_ROUTING_CACHE_TIMEOUT', 3600))
+    return table
+
+
+def invalidate_routing_table():
+    cache.delete(ROUTING_CACHE_KEY)
+
+
+def case_route(case):
+    """(case kind, lower-cased category) key of a Complaint or AssistanceRequest."""
+    from admins.models import Complaint
+
+    if isinstance(case, Complaint):
+        return 'complaint', (case.category or '').lower()
+    return 'assistance', (case.type or '').lower()
+
+
+def routed_staff_ids(case):
+    """Active staff ids in the departments routed to ``case``'s category, all staff as a fallback."""
+    table = get_routing_table()
+    return table['routes'].get(case_route(case)) or table[FALLBACK_ROUTE]
+
+
+def case_recipient_ids(case):
+    """Admin-role accounts plus the routed staff for a new case."""
+    return get_routing_table()['admins'] + routed_staff_ids(case)
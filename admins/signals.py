@@ -0,0 +1,122 @@
+"""
+Model signal handlers for the admins app.
+Registered from AdminsConfig.ready().
+"""
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from admins.models import Complaint, AssistanceRequest, Notification
+from admins import case_stats_utils, cache_utils, notification_counter_utils, notification_stream_utils, routing_utils
+from core.models import User, Admin, Feedback
+
+
+# Sent once per Notification.bulk_notify() call (bulk_create skips post_save), inside its
+# transaction after the rows are written. Arguments: sender=Notification,
+# notifications=list of created rows.
+notifications_fanned_out = Signal()
+
+
+@receiver(pre_save, sender=Complaint)
+@receiver(pre_save, sender=AssistanceRequest)
+def remember_case_stats_key(sender, instance, raw=False, **kwargs):
+    """Remember the stored rollup key so post_save can move the case between buckets."""
+    if raw:
+        return
+    instance._case_stats_old_key = case_stats_utils.key_from_database(instance)
+
+
+@receiver(post_save, sender=Complaint)
+@receiver(post_save, sender=AssistanceRequest)
+def update_case_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    """Keep CaseDailyStats in step with case inserts and updates."""
+    if raw:
+        return
+    old_key = None if created else getattr(instance, '_case_stats_old_key', None)
+    case_stats_utils.move_case(old_key, case_stats_utils.key_for_instance(instance))
+    instance._case_stats_old_key = None
+
+
+@receiver(post_delete, sender=Complaint)
+@receiver(post_delete, sender=AssistanceRequest)
+def update_case_stats_on_delete(sender, instance, **kwargs):
+    """Remove a deleted case from CaseDailyStats."""
+    case_stats_utils.apply_delta(case_stats_utils.key_for_instance(instance), -1)
+
+
+@receiver(post_save, sender=Complaint)
+@receiver(post_save, sender=AssistanceRequest)
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Feedback)
+@receiver(post_delete, sender=Complaint)
+@receiver(post_delete, sender=AssistanceRequest)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Feedback)
+def invalidate_analytics_cache(sender, raw=False, **kwargs):
+    """Move cached analytics/dashboard contexts to a new data version once the write commits."""
+    if raw:
+        return
+    transaction.on_commit(cache_utils.bump_case_data_version)
+
+
+@receiver(pre_save, sender=Notification)
+def remember_notification_flags(sender, instance, raw=False, **kwargs):
+    """Remember the stored read/archived flags so post_save can adjust the recipient's counter."""
+    if raw:
+        return
+    instance._counter_old_flags = notification_counter_utils.flags_from_database(instance)
+
+
+@receiver(post_save, sender=Notification)
+def update_counter_on_save(sender, instance, created, raw=False, **kwargs):
+    """Keep NotificationCounter exact for single notification inserts and updates."""
+    if raw:
+        return
+    old_flags = None if created else getattr(instance, '_counter_old_flags', None)
+    notification_counter_utils.move_notification(
+        notification_counter_utils.recipient_key(instance),
+        old_flags,
+        notification_counter_utils.flags_for_instance(instance),
+    )
+    instance._counter_old_flags = None
+
+
+@receiver(post_delete, sender=Notification)
+def update_counter_on_delete(sender, instance, **kwargs):
+    """Remove a deleted notification from its recipient's counter."""
+    notification_counter_utils.move_notification(
+        notification_counter_utils.recipient_key(instance),
+        notification_counter_utils.flags_for_instance(instance),
+        None,
+    )
+
+
+@receiver(notifications_fanned_out, sender=Notification)
+def update_counters_on_fan_out(sender, notifications, **kwargs):
+    """Add bulk-created notifications to their recipients' counters."""
+    notification_counter_utils.apply_counter_deltas(notification_counter_utils.count_notifications(notifications))
+
+
+@receiver(post_save, sender=Notification)
+def stream_new_notification(sender, instance, created, raw=False, **kwargs):
+    """Push a newly created notification to its recipient's open streams after commit."""
+    if created and not raw:
+        notification_stream_utils.publish_notifications([instance])
+
+
+@receiver(notifications_fanned_out, sender=Notification)
+def stream_fanned_out_notifications(sender, notifications, **kwargs):
+    notification_stream_utils.publish_notifications(notifications)
+
+
+@receiver(post_save, sender=Admin)
+@receiver(post_delete, sender=Admin)
+def invalidate_notification_routing(sender, raw=False, **kwargs):
+    """Recompute the cached notification recipient sets after a staff account changes."""
+    if raw:
+        return
+    # Again after commit, in case another request cached the old sets in between
+    routing_utils.invalidate_routing_table()
+    transaction.on_commit(routing_utils.invalidate_routing_table)
+
@@ -0,0 +1,126 @@
+"""
+Workload and performance figures per staff member across complaints and assistance.
+Counts come from one grouped query over the CaseDailyStats rollup and resolution
+times from resolution_stats(group_by='staff'), so the cost does not grow with the
+number of staff members.
+"""
+
+from datetime import timedelta
+
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from admins.models import Complaint, AssistanceRequest, CaseDailyStats
+from admins.resolution_utils import resolution_stats
+from core.models import Admin
+
+
+# Staff views also move assistance requests through 'approved' and 'completed'
+STAFF_OPEN_STATUSES = ['pending', 'in_progress', 'assigned', 'approved']
+STAFF_RESOLVED_STATUSES = ['resolved', 'completed']
+
+# Open cases filed this many days ago (or earlier) count as overdue
+OVERDUE_AFTER_DAYS = 7
+
+CASE_KINDS = ('complaint', 'assistance')
+
+
+def empty_staff_performance():
+    """Performance row for a staff member without assigned cases."""
+    row = {'open': 0, 'resolved': 0, 'overdue': 0}
+    for case_kind in CASE_KINDS:
+        row.update({
+            f'open_{case_kind}': 0,
+            f'resolved_{case_kind}': 0,
+            f'overdue_{case_kind}': 0,
+            f'{case_kind}_median_days': None,
+            f'{case_kind}_mean_days': None,
+        })
+    return row
+
+
+def staff_performance(staff_ids=None, now=None):
+    """
+    Open load, resolved count, overdue cases and resolution times per staff member.
+
+    Args:
+        staff_ids (list, optional): Restrict to these staff ids, defaults to everyone with cases
+        now (datetime, optional): Reference time for the overdue cut-off
+
+    Returns:
+        dict: {staff id: {'open', 'resolved', 'overdue', 'open_<kind>', 'resolved_<kind>',
+              'overdue_<kind>', '<kind>_median_days', '<kind>_mean_days'}} for kind in
+              CASE_KINDS. Staff without assigned cases are omitted.
+    """
+    overdue_before = timezone.localdate(now or timezone.now()) - timedelta(days=OVERDUE_AFTER_DAYS)
+
+    aggregates = {}
+    for case_kind in CASE_KINDS:
+        kind = Q(case_kind=case_kind)
+        aggregates[f'open_{case_kind}'] = Sum('count', filter=kind & Q(status__in=STAFF_OPEN_STATUSES))
+        aggregates[f'resolved_{case_kind}'] = Sum('count', filter=kind & Q(status__in=STAFF_RESOLVED_STATUSES))
+        aggregates[f'overdue_{case_kind}'] = Sum(
+            'count', filter=kind & Q(status__in=STAFF_OPEN_STATUSES, date__lte=overdue_before),
+        )
+
+    stats = CaseDailyStats.objects.filter(assigned_to__isnull=False)
+    complaints = Complaint.objects.filter(assigned_to__isnull=False)
+    assistance = AssistanceRequest.objects.filter(assigned_to__isnull=False)
+    if staff_ids is not None:
+        stats = stats.filter(assigned_to_id__in=staff_ids)
+        complaints = complaints.filter(assigned_to_id__in=staff_ids)
+        assistance = assistance.filter(assigned_to_id__in=staff_ids)
+
+    performance = {}
+    for row in stats.values('assigned_to_id').annotate(**aggregates).order_by():
+        entry = empty_staff_performance()
+        entry.update({key: row[key] or 0 for key in aggregates})
+        for total in ('open', 'resolved', 'overdue'):
+            entry[total] = sum(entry[f'{total}_{case_kind}'] for case_kind in CASE_KINDS)
+        performance[row['assigned_to_id']] = entry
+
+    if not performance:
+        return performance
+
+    resolution_times = {
+        'complaint': resolution_stats(complaints, group_by='staff'),
+        'assistance': resolution_stats(assistance, group_by='staff', end_field='completed_at'),
+    }
+    for case_kind, by_staff in resolution_times.items():
+        for staff_id, times in by_staff.items():
+            if staff_id in performance:
+                performance[staff_id][f'{case_kind}_median_days'] = times['median_days']
+                performance[staff_id][f'{case_kind}_mean_days'] = times['mean_days']
+
+    return performance
+
+
+def staff_performance_for(staff, now=None):
+    """Performance row for one staff member (zeros when nothing is assigned to them)."""
+    return staff_performance([staff.id], now).get(staff.id, empty_staff_performance())
+
+
+def staff_leaderboard(limit=None, now=None):
+    """
+    Active staff accounts ranked by resolved cases, then by smallest open load.
+
+    Returns:
+        list: Performance rows with 'staff_id', 'name' and 'department' added
+    """
+    staff_rows = list(Admin.objects.filter(role='staff', is_active=True).values(
+        'id', 'first_name', 'last_name', 'department',
+    ))
+    performance = staff_performance([staff['id'] for staff in staff_rows], now)
+
+    leaderboard = []
+    for staff in staff_rows:
+        row = performance.get(staff['id'], empty_staff_performance())
+        row.update({
+            'staff_id': staff['id'],
+            'name': f"{staff['first_name']} {staff['last_name']}",
+            'department': staff['department'],
+        })
+        leaderboard.append(row)
+
+    leaderboard.sort(key=lambda row: (-row['resolved'], row['open'], row['name']))
+    return leaderboard[:limit] if limit else leaderboard
@@ -1,3 +1,963 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import threading
+import tempfile
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import mock
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, models, transaction
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from admins import (
+    analytics_utils, case_stats_utils, cache_utils, notification_archive_utils, notification_counter_utils,
+    notification_utils, routing_utils,
+)
+from admins.notification_stream_utils import InProcessBroker, channel_for, get_broker
+from admins.barangay_utils import resolve_barangay
+from admins.geo_utils import encode_geohash, geohash_bounds
+from admins.pagination_utils import keyset_page
+from admins.resolution_utils import resolution_stats, average_resolution_by_priority
+from admins.staff_performance_utils import staff_leaderboard, staff_performance_for
+from admins.timeseries_utils import bucket_starts, time_series
+from admins.models import (
+    ArchivedNotification, Complaint, AssistanceRequest, CaseDailyStats, Notification, NotificationCounter,
+)
+from admins.signals import notifications_fanned_out
+from core.models import Admin, User
+
+
+class AdminAnalyticsAggregationTests(TestCase):
+    def setUp(self):
+        self.resident = User.objects.create(
+            first_name='Juan', middle_name='', last_name='Dela Cruz',
+            email='juan@example.com', username='juan', password='x', is_verified=True,
+        )
+        for category, status, priority in [
+            ('Sanitation', 'pending', 'low'),
+            ('Sanitation', 'resolved', 'high'),
+            ('Noise', 'assigned', 'urgent'),
+            ('Health', 'in_progress', 'medium'),
+        ]:
+            Complaint.objects.create(
+                user=self.resident, title='t', description='d', category=category,
+                status=status, priority=priority, location='Purok 1, Bacong',
+            )
+        AssistanceRequest.objects.create(
+            user=self.resident, title='t', description='d', type='Medical',
+            status='pending', urgency='high', address='Uban',
+        )
+
+    def _count_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            context = analytics_utils.build_admin_analytics_context()
+            for group, builder in analytics_utils.ANALYTICS_CHART_GROUPS.items():
+                context[group] = builder()
+        return len(ctx.captured_queries), context
+
+    def test_counts_match_data(self):
+        _, context = self._count_queries()
+        self.assertEqual(context['total_complaints'], 4)
+        self.assertEqual(context['category']['complaints']['Sanitation'], 2)
+        self.assertEqual(context['priority-resolution']['priority']['Urgent'], 1)
+        self.assertEqual(context['status']['complaints']['In Progress'], 2)
+        self.assertEqual(context['category']['assistance']['Medical'], 1)
+        self.assertEqual(context['priority-resolution']['urgency']['High'], 1)
+        self.assertEqual(context['barangay']['barangays'][0]['name'], 'Barangay Bacong')
+
+    def test_query_count_independent_of_category_count(self):
+        baseline, _ = self._count_queries()
+        many_categories = analytics_utils.COMPLAINTS_CATEGORY + [f'Extra {i}' for i in range(50)]
+        many_types = analytics_utils.ASSISTANCE_TYPE + [f'Extra {i}' for i in range(50)]
+        with mock.patch.object(analytics_utils, 'COMPLAINTS_CATEGORY', many_categories), \
+                mock.patch.object(analytics_utils, 'ASSISTANCE_TYPE', many_types):
+            expanded, context = self._count_queries()
+        self.assertEqual(baseline, expanded)
+        self.assertLessEqual(expanded, 20)
+        self.assertIn('Extra 49', context['category']['complaints'])
+
+
+class AnalyticsApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        session = self.client.session
+        session['admin_role'] = 'admin'
+        session.save()
+
+    def test_conditional_get_returns_not_modified(self):
+        url = reverse('admin_analytics_data', args=['status'])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['complaints']['Pending'], 0)
+        etag = response['ETag']
+        self.assertFalse(etag.startswith('W/'))
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_rejects_unknown_group_and_anonymous_users(self):
+        self.assertEqual(self.client.get(reverse('admin_analytics_data', args=['nope'])).status_code, 404)
+        self.client.session.flush()
+        self.client.cookies.clear()
+        self.assertEqual(self.client.get(reverse('admin_analytics_data', args=['status'])).status_code, 403)
+
+
+class CaseDailyStatsTests(TestCase):
+    def setUp(self):
+        self.resident = User.objects.create(
+            first_name='Maria', middle_name='', last_name='Santos',
+            email='maria@example.com', username='maria', password='x',
+        )
+
+    def _snapshot(self):
+        rows = CaseDailyStats.objects.values_list(*case_stats_utils.KEY_FIELDS).annotate(
+            total=models.Sum('count')
+        ).order_by()
+        return {row[:-1]: row[-1] for row in rows if row[-1]}
+
+    def test_signals_match_rebuild(self):
+        complaint = Complaint.objects.create(
+            user=self.resident, title='t', description='d', category='Noise', location='Lukay',
+        )
+        AssistanceRequest.objects.create(
+            user=self.resident, title='t', description='d', type='Medical', address='Rizal II',
+        )
+        removed = Complaint.objects.create(user=self.resident, title='t', description='d', category='Health')
+        complaint.status = 'resolved'
+        complaint.save()
+        removed.delete()
+
+        incremental = self._snapshot()
+        case_stats_utils.rebuild_case_daily_stats()
+        self.assertEqual(incremental, self._snapshot())
+        self.assertEqual(case_stats_utils.sum_counts(case_stats_utils.case_stats('complaint', status='resolved')), 1)
+        self.assertEqual(case_stats_utils.sum_counts(case_stats_utils.case_stats(barangay='Lukay')), 1)
+
+    def test_rollup_key_is_unique_and_racing_inserts_merge(self):
+        key = (timezone.localdate(), 'complaint', 'Noise', 'pending', 'low', 'Lukay', None)
+        case_stats_utils.apply_delta(key, 1)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            CaseDailyStats.objects.create(count=1, **dict(zip(case_stats_utils.KEY_FIELDS, key)))
+
+        # Another writer inserts the row between our UPDATE and INSERT
+        real_update = models.QuerySet.update
+        calls = []
+
+        def racing_update(queryset, **kwargs):
+            calls.append(kwargs)
+            return 0 if len(calls) == 1 else real_update(queryset, **kwargs)
+
+        with mock.patch.object(models.QuerySet, 'update', racing_update):
+            case_stats_utils.apply_delta(key, 2)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(list(CaseDailyStats.objects.values_list('count', flat=True)), [3])
+
+
+class BarangayResolutionTests(TestCase):
+    def test_resolves_official_names_and_aliases(self):
+        self.assertEqual(resolve_barangay('Purok 2, Brgy. Lukay, Babatngon'), 'Lukay')
+        self.assertEqual(resolve_barangay('Poblacion District II'), 'Poblacion District II')
+        self.assertEqual(resolve_barangay('near plaza, Pob. 3'), 'Poblacion District III')
+        self.assertEqual(resolve_barangay('Rizal 2 crossing'), 'Rizal II')
+        self.assertEqual(resolve_barangay('gov e jaro'), 'Gov. E. Jaro')
+
+    def test_falls_back_through_fields(self):
+        self.assertEqual(resolve_barangay(None, '', 'Victory'), 'Victory')
+        self.assertEqual(resolve_barangay('Tacloban City'), 'Others')
+        self.assertEqual(resolve_barangay(None, '  '), '')
+
+    def test_resolved_on_save(self):
+        resident = User.objects.create(
+            first_name='Ana', middle_name='', last_name='Reyes',
+            email='ana@example.com', username='ana', password='x',
+        )
+        complaint = Complaint.objects.create(
+            user=resident, title='t', description='d', category='Noise', address='Sitio 1, San Isidro',
+        )
+        self.assertEqual(Complaint.objects.get(pk=complaint.pk).barangay, 'San Isidro')
+        self.assertEqual(case_stats_utils.sum_counts(case_stats_utils.case_stats(barangay='San Isidro')), 1)
+
+
+class ResolutionStatsTests(TestCase):
+    def setUp(self):
+        resident = User.objects.create(
+            first_name='Pedro', middle_name='', last_name='Garcia',
+            email='pedro@example.com', username='pedro', password='x',
+        )
+        for days, priority in [(1, 'high'), (2, 'high'), (3, 'high'), (10, 'high'), (4, 'low')]:
+            complaint = Complaint.objects.create(
+                user=resident, title='t', description='d', category='Noise',
+                priority=priority, status='resolved',
+            )
+            Complaint.objects.filter(pk=complaint.pk).update(resolved_at=models.F('created_at') + timedelta(days=days))
+        Complaint.objects.create(user=resident, title='t', description='d', category='Noise', priority='urgent')
+
+    def test_overall_statistics(self):
+        stats = resolution_stats()
+        self.assertEqual(stats['count'], 5)
+        self.assertEqual(stats['mean_days'], 4.0)
+        self.assertEqual(stats['median_days'], 3.0)
+        self.assertEqual(stats['p90_days'], 10.0)
+        self.assertEqual(stats['max_days'], 10.0)
+
+    def test_grouped_by_priority(self):
+        stats = resolution_stats(group_by='priority')
+        self.assertEqual(stats['high']['median_days'], 2.0)
+        self.assertEqual(stats['low']['p90_days'], 4.0)
+        self.assertNotIn('urgent', stats)
+        self.assertEqual(
+            average_resolution_by_priority(),
+            {'low': 4.0, 'medium': None, 'high': 4.0, 'urgent': None},
+        )
+
+
+class HeatmapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        session = self.client.session
+        session['admin_role'] = 'admin'
+        session.save()
+        resident = User.objects.create(
+            first_name='Rosa', middle_name='', last_name='Lim',
+            email='rosa@example.com', username='rosa', password='x',
+        )
+        for latitude, longitude, category in [
+            ('11.42300000', '124.84300000', 'Noise'),
+            ('11.42310000', '124.84310000', 'Health'),
+            ('11.47000000', '124.90000000', 'Noise'),
+        ]:
+            Complaint.objects.create(
+                user=resident, title='t', description='d', category=category,
+                latitude=latitude, longitude=longitude,
+            )
+        AssistanceRequest.objects.create(
+            user=resident, title='t', description='d', type='Medical',
+            latitude='11.42320000', longitude='124.84320000',
+        )
+
+    def test_geohash_encoding(self):
+        self.assertEqual(encode_geohash(57.64911, 10.40744), 'u4pruydq')
+        self.assertEqual(encode_geohash(None, 10.0), '')
+        south, west, north, east = geohash_bounds('u4pruydq')
+        self.assertTrue(south <= 57.64911 <= north and west <= 10.40744 <= east)
+        self.assertEqual(Complaint.objects.first().geohash, encode_geohash(11.423, 124.843))
+
+    def test_cells_filtered_and_aggregated(self):
+        url = reverse('admin_analytics_heatmap')
+        data = self.client.get(url, {'precision': 6}).json()
+        self.assertEqual(data['total'], 4)
+        self.assertEqual(data['cells'][0]['count'], 3)
+
+        data = self.client.get(url, {'precision': 6, 'kind': 'complaint', 'category': 'Noise'}).json()
+        self.assertEqual(sorted(cell['count'] for cell in data['cells']), [1, 1])
+
+        data = self.client.get(url, {'precision': 8, 'bbox': '11.41,124.83,11.43,124.85'}).json()
+        self.assertEqual(data['total'], 3)
+
+        self.assertEqual(self.client.get(url, {'precision': 20}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'bbox': '1,2,3'}).status_code, 400)
+
+
+class TimeSeriesTests(TestCase):
+    def setUp(self):
+        self.resident = User.objects.create(
+            first_name='Juan', middle_name='', last_name='Dela Cruz',
+            email='juan@example.com', username='juan', password='x', is_verified=True,
+        )
+        self.now = datetime(2025, 3, 31, 12, 0, tzinfo=ZoneInfo('Asia/Manila'))
+
+    def _complaint(self, created_at, category='Noise'):
+        complaint = Complaint.objects.create(
+            user=self.resident, title='t', description='d', category=category, location='Uban',
+        )
+        Complaint.objects.filter(pk=complaint.pk).update(created_at=created_at)
+
+    def test_month_buckets_are_calendar_aligned(self):
+        starts = bucket_starts('month', 6, self.now)
+        self.assertEqual([start.month for start in starts], [10, 11, 12, 1, 2, 3])
+        self.assertTrue(all(start.day == 1 for start in starts))
+
+    def test_gap_filled_and_bucketed_in_local_time(self):
+        # 23:30 UTC on Feb 28 is already Mar 1 in Manila
+        self._complaint(datetime(2025, 2, 28, 23, 30, tzinfo=ZoneInfo('UTC')))
+        self._complaint(datetime(2025, 1, 15, 9, 0, tzinfo=ZoneInfo('Asia/Manila')), category='Health')
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = time_series(Complaint.objects.all(), 'created_at', 'month', 3, now=self.now)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(result['labels'], ['Jan 2025', 'Feb 2025', 'Mar 2025'])
+        self.assertEqual(result['values'], [1, 0, 1])
+
+        grouped = time_series(Complaint.objects.all(), 'created_at', 'month', 3, group_by='category', now=self.now)
+        self.assertEqual(grouped['series'], {'Health': [1, 0, 0], 'Noise': [0, 0, 1]})
+
+
+class StaffPerformanceTests(TestCase):
+    def setUp(self):
+        self.resident = User.objects.create(
+            first_name='Maria', middle_name='', last_name='Santos',
+            email='maria@example.com', username='maria', password='x',
+        )
+        self.staff = [
+            Admin.objects.create(
+                username=f'staff{i}', email=f'staff{i}@example.com', password='x',
+                department='Health', position='Officer', first_name='Staff', last_name=str(i),
+            )
+            for i in range(3)
+        ]
+        old = timezone.now() - timedelta(days=10)
+        for status, days in [('resolved', 2), ('resolved', 4), ('pending', None), ('in_progress', None)]:
+            complaint = Complaint.objects.create(
+                user=self.resident, title='t', description='d', category='Noise',
+                status=status, assigned_to=self.staff[0],
+            )
+            if days:
+                Complaint.objects.filter(pk=complaint.pk).update(resolved_at=models.F('created_at') + timedelta(days=days))
+        overdue = AssistanceRequest.objects.create(
+            user=self.resident, title='t', description='d', type='Medical',
+            status='approved', assigned_to=self.staff[1],
+        )
+        overdue.created_at = old
+        overdue.save()
+
+    def test_single_staff_lookup(self):
+        row = staff_performance_for(self.staff[0])
+        self.assertEqual((row['open'], row['resolved'], row['overdue']), (2, 2, 0))
+        self.assertEqual(row['complaint_median_days'], 2.0)
+        self.assertEqual(row['complaint_mean_days'], 3.0)
+        self.assertEqual(staff_performance_for(self.staff[1])['overdue_assistance'], 1)
+        self.assertEqual(staff_performance_for(self.staff[2])['open'], 0)
+
+    def test_leaderboard_query_count_independent_of_staff_count(self):
+        with CaptureQueriesContext(connection) as ctx:
+            leaderboard = staff_leaderboard()
+        self.assertEqual([row['staff_id'] for row in leaderboard], [self.staff[0].id, self.staff[2].id, self.staff[1].id])
+        for i in range(3, 10):
+            Admin.objects.create(
+                username=f'staff{i}', email=f'staff{i}@example.com', password='x',
+                department='Health', position='Officer', first_name='Staff', last_name=str(i),
+            )
+        with CaptureQueriesContext(connection) as expanded:
+            self.assertEqual(len(staff_leaderboard()), 10)
+        self.assertEqual(len(ctx.captured_queries), len(expanded.captured_queries))
+
+
+class CachedContextTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def _builder(self):
+        self.calls += 1
+        return {'calls': self.calls}
+
+    def test_reused_until_case_data_changes(self):
+        self.assertEqual(cache_utils.cached_context('test', self._builder), {'calls': 1})
+        self.assertEqual(cache_utils.cached_context('test', self._builder), {'calls': 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create(
+                first_name='Rosa', middle_name='', last_name='Cruz',
+                email='rosa@example.com', username='rosa', password='x',
+            )
+        self.assertEqual(cache_utils.cached_context('test', self._builder), {'calls': 2})
+
+    def test_serves_stale_value_while_another_request_rebuilds(self):
+        cache_utils.cached_context('test', self._builder, 7)
+        cache_utils.bump_case_data_version()
+        cache.add('analytics:test:7:lock', 1)
+
+        self.assertEqual(cache_utils.cached_context('test', self._builder, 7), {'calls': 1})
+        self.assertEqual(self.calls, 1)
+
+
+class NotificationFanOutTests(TestCase):
+    def setUp(self):
+        self.resident = User.objects.create(
+            first_name='Juan', middle_name='', last_name='Dela Cruz',
+            email='juan@example.com', username='juan', password='x',
+        )
+        self.complaint = Complaint.objects.create(
+            user=self.resident, title='Flooding', description='d', category='Flooding',
+            priority='urgent', location='Purok 1, Bacong',
+        )
+
+    def add_staff(self, start, count):
+        for i in range(start, start + count):
+            Admin.objects.create(
+                username=f'staff{i}', email=f'staff{i}@example.com', password='x',
+                department='Health', position='Officer', first_name='Staff', last_name=str(i),
+            )
+
+    def test_query_count_does_not_grow_with_staff(self):
+        self.add_staff(0, 2)
+        with CaptureQueriesContext(connection) as few:
+            notification_utils.notify_new_case_filed(self.complaint)
+        self.add_staff(2, 20)
+        with CaptureQueriesContext(connection) as many:
+            created = notification_utils.notify_urgent_case(self.complaint)
+
+        self.assertEqual(len(created), 22)
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+        self.assertEqual(Notification.objects.filter(notification_type='urgent_case').count(), 22)
+
+    def test_hook_fires_once_with_created_rows(self):
+        self.add_staff(0, 3)
+        received = []
+
+        def handler(sender, notifications, **kwargs):
+            received.append([n.pk for n in notifications])
+
+        notifications_fanned_out.connect(handler)
+        try:
+            created = Notification.notify_admins(sender=self.resident, title='t', message='m')
+        finally:
+            notifications_fanned_out.disconnect(handler)
+
+        self.assertEqual(received, [[n.pk for n in created]])
+        self.assertTrue(all(n.recipient_object_id and n.sender_object_id == self.resident.id for n in created))
+
+    def test_falls_back_to_row_saves_without_bulk_returning(self):
+        self.add_staff(0, 3)
+        received = []
+        notifications_fanned_out.connect(received.append)
+        try:
+            with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert',
+                                   new_callable=mock.PropertyMock, return_value=False):
+                created = Notification.notify_admins(sender=self.resident, title='t', message='m')
+        finally:
+            notifications_fanned_out.disconnect(received.append)
+
+        self.assertEqual(received, [])
+        self.assertTrue(all(n.pk for n in created))
+        staff_ct = ContentType.objects.get_for_model(Admin)
+        self.assertEqual(
+            sorted(NotificationCounter.objects.filter(recipient_content_type=staff_ct).values_list('unread', flat=True)),
+            [1, 1, 1],
+        )
+
+    def test_explicit_recipients_are_respected(self):
+        self.add_staff(0, 3)
+        chosen = list(Admin.objects.order_by('id')[:1])
+        created = notification_utils.notify_new_case_filed(self.complaint, admins_to_notify=chosen)
+        self.assertEqual([n.recipient_object_id for n in created], [chosen[0].id])
+
+
+class NotificationRoutingTests(TestCase):
+    def setUp(self):
+        self.resident = User.objects.create(
+            first_name='Juan', middle_name='', last_name='Dela Cruz',
+            email='juan@example.com', username='juan', password='x',
+        )
+        self.admin = Admin.objects.create(
+            username='admin0', email='admin0@example.com', password='x', role='admin',
+            department='Administration', position='Captain', first_name='Admin', last_name='Zero',
+        )
+        self.health = Admin.objects.create(
+            username='health', email='health@example.com', password='x',
+            department='Health Office', position='Nurse', first_name='Health', last_name='Staff',
+        )
+        self.engineering = Admin.objects.create(
+            username='eng', email='eng@example.com', password='x',
+            department='Engineering', position='Engineer', first_name='Eng', last_name='Staff',
+        )
+
+    def file(self, category, priority='urgent'):
+        return Complaint.objects.create(
+            user=self.resident, title='t', description='d', category=category,
+            priority=priority, location='Purok 1, Bacong',
+        )
+
+    def recipients(self, notifications):
+        return sorted(n.recipient_object_id for n in notifications)
+
+    def test_new_cases_go_to_admins_and_routed_department(self):
+        complaint = self.file('Health')
+        self.assertEqual(
+            self.recipients(notification_utils.notify_new_case_filed(complaint)),
+            sorted([self.admin.id, self.health.id]),
+        )
+        # Urgent alerts keep reaching admin-role accounts, as they did before routing
+        self.assertEqual(
+            self.recipients(notification_utils.notify_urgent_case(complaint)),
+            sorted([self.admin.id, self.health.id]),
+        )
+
+        # Unrouted categories fall back to every active staff member
+        self.assertEqual(
+            self.recipients(notification_utils.notify_urgent_case(self.file('Others'))),
+            sorted([self.admin.id, self.health.id, self.engineering.id]),
+        )
+
+    def test_recipient_sets_are_cached_until_staff_change(self):
+        complaint = self.file('Infrastructure')
+        notification_utils.notify_new_case_filed(complaint)
+        with CaptureQueriesContext(connection) as ctx:
+            routing_utils.case_recipient_ids(complaint)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        self.engineering.is_active = False
+        self.engineering.save()
+        self.assertEqual(routing_utils.routed_staff_ids(complaint), [self.health.id])
+
+
+class NotificationCounterTests(TestCase):
+    def setUp(self):
+        self.resident = User.objects.create(
+            first_name='Juan', middle_name='', last_name='Dela Cruz',
+            email='juan@example.com', username='juan', password='x',
+        )
+        self.staff = [
+            Admin.objects.create(
+                username=f'staff{i}', email=f'staff{i}@example.com', password='x',
+                department='Health', position='Officer', first_name='Staff', last_name=str(i),
+            )
+            for i in range(3)
+        ]
+
+    def counters(self):
+        return sorted(NotificationCounter.objects.values_list('recipient_object_id', 'unread', 'archived'))
+
+    def assert_matches_rebuild(self):
+        incremental = self.counters()
+        notification_counter_utils.rebuild_notification_counters()
+        self.assertEqual(incremental, self.counters())
+
+    def test_create_read_archive_delete(self):
+        first = notification_utils.create_notification(self.resident, 'a', 'm')
+        second = notification_utils.create_notification(self.resident, 'b', 'm')
+        self.assertEqual(notification_counter_utils.unread_notification_count(User, self.resident.id), 2)
+
+        first.mark_as_read()
+        second.archive()
+        self.assertEqual(self.counters(), [(self.resident.id, 0, 1)])
+        self.assert_matches_rebuild()
+
+        second.delete()
+        self.assertEqual(self.counters(), [(self.resident.id, 0, 0)])
+
+    def test_bulk_fan_out_and_mark_all_read(self):
+        Notification.notify_admins(title='t', message='m')
+        Notification.notify_admins(title='t', message='m')
+        self.assertEqual([unread for _, unread, _ in self.counters()], [2, 2, 2])
+
+        self.assertEqual(notification_utils.mark_all_as_read(self.staff[0]), 2)
+        self.assertEqual(notification_counter_utils.unread_notification_count(Admin, self.staff[0].id), 0)
+        self.assert_matches_rebuild()
+
+    def test_badge_is_a_single_query(self):
+        Notification.notify_admins(title='t', message='m')
+        session = self.client.session
+        session['staff_id'] = self.staff[1].id
+        session.save()
+        request = self.client.get('/').wsgi_request
+
+        from staffs.context_processors import staff_notifications_context
+        with CaptureQueriesContext(connection) as ctx:
+            context = staff_notifications_context(request)
+        self.assertEqual(context['staff_unread_notifications'], 1)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+
+class NotificationRetentionTests(TestCase):
+    def setUp(self):
+        self.staff = [
+            Admin.objects.create(
+                username=f'staff{i}', email=f'staff{i}@example.com', password='x',
+                department='Health', position='Officer', first_name='Staff', last_name=str(i),
+            )
+            for i in range(3)
+        ]
+        for _ in range(5):
+            Notification.notify_admins(title='t', message='m')
+        old = timezone.now() - timedelta(days=400)
+        self.old_ids = list(Notification.objects.order_by('pk').values_list('pk', flat=True)[:11])
+        Notification.objects.filter(pk__in=self.old_ids).update(created_at=old)
+
+    def test_cleanup_archives_with_one_update(self):
+        with CaptureQueriesContext(connection) as ctx:
+            result = notification_utils.cleanup_old_notifications(days=30)
+        self.assertEqual(result, {'notifications_archived': 11})
+        self.assertEqual(len([q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "notifications"')]), 1)
+        self.assertFalse(Notification.objects.filter(pk__in=self.old_ids, archived_at__isnull=True).exists())
+
+        incremental = sorted(NotificationCounter.objects.values_list('recipient_object_id', 'unread', 'archived'))
+        notification_counter_utils.rebuild_notification_counters()
+        self.assertEqual(incremental, sorted(NotificationCounter.objects.values_list('recipient_object_id', 'unread', 'archived')))
+
+    def test_purge_deletes_in_chunks(self):
+        dry_run = notification_utils.purge_notifications(days=365, dry_run=True)
+        self.assertEqual((dry_run['matched'], dry_run['deleted']), (11, 0))
+
+        out = StringIO()
+        call_command('purge_notifications', days=365, chunk_size=4, stdout=out)
+        self.assertIn('Deleted 11 notifications', out.getvalue())
+        self.assertIn('in 3 chunks', out.getvalue())
+        self.assertFalse(Notification.objects.filter(pk__in=self.old_ids).exists())
+        self.assertEqual(Notification.objects.count(), 4)
+
+        incremental = sorted(NotificationCounter.objects.values_list('recipient_object_id', 'unread', 'archived'))
+        notification_counter_utils.rebuild_notification_counters()
+        self.assertEqual(incremental, sorted(NotificationCounter.objects.values_list('recipient_object_id', 'unread', 'archived')))
+
+    def test_purge_queries_do_not_grow_with_rows(self):
+        # count + chunk boundary, then in a savepoint: GROUP BY, pk list, one DELETE and an
+        # insert + update per distinct counter delta (two here), never one query per row
+        with self.assertNumQueries(13):
+            result = notification_utils.purge_notifications(days=365, chunk_size=100)
+        self.assertEqual(result['deleted'], 11)
+
+        for _ in range(20):
+            Notification.notify_admins(title='t', message='m')
+        Notification.objects.update(created_at=timezone.now() - timedelta(days=400))
+        with self.assertNumQueries(13):
+            result = notification_utils.purge_notifications(days=365, chunk_size=100)
+        self.assertEqual(result['deleted'], 64)
+        self.assertEqual(notification_counter_utils.unread_notification_count(Admin, self.staff[0].id), 0)
+
+
+class NotificationPaginationTests(TestCase):
+    def setUp(self):
+        self.staff = Admin.objects.create(
+            username='staff0', email='staff0@example.com', password='x',
+            department='Health', position='Officer', first_name='Staff', last_name='Zero',
+        )
+        for i in range(25):
+            Notification.create_notification(recipient=self.staff, title=f'n{i}', message='m')
+        # Several rows sharing one timestamp must still be paged without gaps or repeats
+        same_time = timezone.now() - timedelta(days=1)
+        Notification.objects.filter(title__in=['n3', 'n4', 'n5', 'n6']).update(created_at=same_time)
+
+    def test_keyset_pages_cover_every_row_once(self):
+        queryset = Notification.objects.all()
+        seen, cursor = [], None
+        while True:
+            page = keyset_page(queryset, cursor, page_size=4)
+            seen.extend(n.pk for n in page['items'])
+            if not page['has_next']:
+                break
+            cursor = page['next_cursor']
+
+        expected = list(queryset.order_by('-created_at', '-pk').values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            keyset_page(Notification.objects.all(), 'not-a-cursor')
+
+    def test_load_more_endpoint(self):
+        session = self.client.session
+        session['admin_role'] = 'admin'
+        session.save()
+
+        first = self.client.get(reverse('admin_notifications_more'))
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()['html'].count('list-group-item'), 10)
+
+        second = self.client.get(reverse('admin_notifications_more'), {'cursor': first.json()['next_cursor']})
+        self.assertEqual(second.json()['html'].count('list-group-item'), 10)
+        self.assertIsNotNone(second.json()['next_cursor'])
+
+        bad = self.client.get(reverse('admin_notifications_more'), {'cursor': '%%%'})
+        self.assertEqual(bad.status_code, 400)
+        self.assertFalse(bad.json()['success'])
+
+
+class NotificationListLoaderTests(TestCase):
+    def setUp(self):
+        self.staff = []
+        for i in range(10):
+            staff = Admin.objects.create(
+                username=f'staff{i}', email=f'staff{i}@example.com', password='x',
+                department='Health', position='Officer', first_name='Staff', last_name=str(i),
+            )
+            resident = User.objects.create(
+                first_name='Res', middle_name='', last_name=str(i),
+                email=f'res{i}@example.com', username=f'res{i}', password='x',
+            )
+            complaint = Complaint.objects.create(
+                user=resident, title='Flooding', description='d', category='Flooding', location='Purok 1, Bacong',
+            )
+            Notification.create_notification(
+                recipient=staff, sender=resident, title=f'n{i}', message='m', related_complaint=complaint,
+            )
+            self.staff.append(staff)
+        session = self.client.session
+        session['admin_role'] = 'admin'
+        session.save()
+
+    def render_queries(self, limit):
+        Notification.objects.exclude(pk__in=Notification.objects.order_by('-pk').values('pk')[:limit]).delete()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('admin_notifications_more'))
+        self.assertEqual(response.json()['html'].count('From: Res'), limit)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.assertEqual(self.render_queries(10), self.render_queries(3))
+
+    def test_rows_are_attached(self):
+        from admins.notification_list_utils import load_notification_rows
+        rows = load_notification_rows(Notification.objects.order_by('pk'))
+        with CaptureQueriesContext(connection) as ctx:
+            summary = [
+                (n.get_sender_type(), n.get_recipient_type(), n.sender.last_name, n.recipient.last_name,
+                 n.get_related_case().title)
+                for n in rows
+            ]
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(summary[0], ('resident', 'admin', '0', '0', 'Flooding'))
+
+
+@override_settings(NOTIFICATION_STREAM_POLL_SECONDS=30)
+class NotificationStreamTests(TestCase):
+    def setUp(self):
+        self.resident = User.objects.create(
+            first_name='Juan', middle_name='', last_name='Dela Cruz',
+            email='juan@example.com', username='juan', password='x',
+        )
+        self.channel = channel_for(ContentType.objects.get_for_model(User).id, self.resident.id)
+        self.broker = get_broker()
+
+    def test_broker_resumes_after_event_id(self):
+        broker = InProcessBroker(buffer_size=2)
+        first = broker.publish('a', 'notification', {'n': 1})
+        broker.publish('b', 'notification', {'n': 2})
+        broker.publish('a', 'notification', {'n': 3})
+        broker.publish('a', 'notification', {'n': 4})
+
+        self.assertEqual([e['data']['n'] for e in broker.wait('a', 0, 0)], [3, 4])
+        self.assertEqual([e['data']['n'] for e in broker.wait('a', first + 2, 0)], [4])
+        self.assertEqual(broker.wait('a', broker.last_event_id(), 0), [])
+
+    def test_async_wait_is_woken_by_a_publish_from_another_thread(self):
+        broker = InProcessBroker()
+        after_id = broker.last_event_id()
+
+        async def wait():
+            asyncio.get_running_loop().call_later(0.05, threading.Thread(
+                target=broker.publish, args=('a', 'notification', {'n': 1}),
+            ).start)
+            return await broker.wait_async('a', after_id, 5)
+
+        self.assertEqual([e['data']['n'] for e in asyncio.run(wait())], [1])
+        self.assertEqual(broker._async_waiters, {})
+        self.assertEqual(asyncio.run(broker.wait_async('a', after_id + 1, 0)), [])
+
+    def test_events_are_published_on_commit(self):
+        after_id = self.broker.last_event_id()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            notification = notification_utils.create_notification(self.resident, 'Update', 'Case resolved')
+        self.assertEqual(self.broker.wait(self.channel, after_id, 0), [])
+
+        for callback in callbacks:
+            callback()
+        events = self.broker.wait(self.channel, after_id, 0)
+        self.assertEqual(
+            sorted((e['type'], e['data'].get('id', e['data'].get('delta'))) for e in events),
+            [('notification', notification.id), ('unread_delta', 1)],
+        )
+
+    def test_long_poll_endpoint(self):
+        url = reverse('resident_notification_stream')
+        self.assertEqual(self.client.get(url, {'format': 'json'}).status_code, 403)
+
+        session = self.client.session
+        session['resident_id'] = self.resident.id
+        session.save()
+        after_id = self.broker.last_event_id()
+        with self.captureOnCommitCallbacks(execute=True):
+            notification_utils.create_notification(self.resident, 'Update', 'Case resolved')
+
+        response = self.client.get(url, {'format': 'json', 'last_event_id': after_id})
+        data = response.json()
+        self.assertTrue(data['success'])
+        self.assertEqual(data['unread'], 1)
+        self.assertIn('notification', [e['type'] for e in data['events']])
+
+        stream = self.client.get(url, HTTP_LAST_EVENT_ID=str(data['last_event_id']))
+        self.assertEqual(stream['Content-Type'], 'text/event-stream')
+        body = b''.join(stream.streaming_content).decode()
+        # WSGI never blocks on the broker; the retry hint turns EventSource into polling
+        self.assertTrue(body.startswith('retry: 30000\n'))
+        self.assertIn('event: unread\ndata: {"unread": 1}', body)
+
+    def badge(self, body):
+        """The badge value notification_stream.js ends up showing for ``body``."""
+        unread = None
+        for frame in body.split('\n\n'):
+            fields = dict(line.split(': ', 1) for line in frame.splitlines() if ': ' in line)
+            if fields.get('event') == 'unread':
+                unread = json.loads(fields['data'])['unread']
+            elif fields.get('event') == 'unread_delta' and unread is not None:
+                unread = max(0, unread + json.loads(fields['data'])['delta'])
+        return unread
+
+    def test_reconnect_does_not_count_replayed_deltas_twice(self):
+        session = self.client.session
+        session['resident_id'] = self.resident.id
+        session.save()
+        after_id = self.broker.last_event_id()
+        with self.captureOnCommitCallbacks(execute=True):
+            notification_utils.create_notification(self.resident, 'Update', 'Case resolved')
+
+        url = reverse('resident_notification_stream')
+        body = b''.join(self.client.get(url, HTTP_LAST_EVENT_ID=str(after_id)).streaming_content).decode()
+        self.assertEqual(self.badge(body), 1)
+        # The missed notification is still replayed (toast) before the snapshot
+        self.assertLess(body.index('event: notification'), body.index('event: unread\n'))
+
+        data = self.client.get(url, {'format': 'json', 'last_event_id': after_id}).json()
+        self.assertEqual((data['unread'], [e['type'] for e in data['events']]), (1, ['notification']))
+
+    def test_script_only_on_pages_with_live_badges(self):
+        session = self.client.session
+        session['resident_id'] = self.resident.id
+        session.save()
+        self.assertContains(self.client.get(reverse('resident_dashboard')), 'notification_stream.js')
+        self.assertNotContains(self.client.get(reverse('profile')), 'notification_stream.js')
+
+
+class NotificationDigestTests(TestCase):
+    def setUp(self):
+        self.resident = User.objects.create(
+            first_name='Juan', middle_name='', last_name='Dela Cruz',
+            email='juan@example.com', username='juan', password='x',
+        )
+        self.staff = Admin.objects.create(
+            username='staff0', email='staff0@example.com', password='x',
+            department='Health', position='Officer', first_name='Staff', last_name='Zero',
+        )
+        self.complaint = Complaint.objects.create(
+            user=self.resident, title='Flooding', description='d', category='Flooding',
+            location='Purok 1, Bacong', assigned_to=self.staff,
+        )
+
+    @override_settings(NOTIFICATION_DIGEST_WINDOW_MINUTES=15)
+    def test_repeats_within_window_update_one_row(self):
+        first = notification_utils.notify_status_change(self.complaint, 'in_progress', self.staff)
+        second = notification_utils.notify_status_change(self.complaint, 'resolved', self.staff)
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(second.digest_count, 2)
+        # created_at is the keyset pagination key; only updated_at follows the latest event
+        self.assertEqual(second.created_at, first.created_at)
+        self.assertGreater(second.updated_at, first.updated_at)
+        self.assertEqual(second.priority, 'high')
+        self.assertIn('Resolved', second.message)
+        self.assertEqual(notification_counter_utils.unread_notification_count(User, self.resident.id), 1)
+
+        # Another case, or a notification the resident already read, starts a new row
+        other = Complaint.objects.create(
+            user=self.resident, title='Noise', description='d', category='Noise', location='Purok 2, Bacong',
+        )
+        self.assertNotEqual(notification_utils.notify_status_change(other, 'in_progress', self.staff).pk, first.pk)
+        second.mark_as_read()
+        self.assertNotEqual(notification_utils.notify_status_change(self.complaint, 'closed', self.staff).pk, first.pk)
+
+    @override_settings(NOTIFICATION_DIGEST_WINDOW_MINUTES=15)
+    def test_window_expiry_and_disabled_mode(self):
+        first = notification_utils.notify_status_change(self.complaint, 'in_progress', self.staff)
+        Notification.objects.filter(pk=first.pk).update(updated_at=timezone.now() - timedelta(minutes=20))
+        self.assertNotEqual(notification_utils.notify_status_change(self.complaint, 'resolved', self.staff).pk, first.pk)
+
+        with self.settings(NOTIFICATION_DIGEST_WINDOW_MINUTES=0):
+            notification_utils.notify_case_commented(self.complaint, self.resident, 'a')
+            notification_utils.notify_case_commented(self.complaint, self.resident, 'b')
+        self.assertEqual(Notification.objects.filter(action_type='commented').count(), 4)
+
+
+class NotificationColdStorageTests(TestCase):
+    def setUp(self):
+        self.staff = Admin.objects.create(
+            username='staff0', email='staff0@example.com', password='x',
+            department='Health', position='Officer', first_name='Staff', last_name='Zero',
+        )
+        self.notifications = [
+            Notification.create_notification(recipient=self.staff, title=f'n{i}', message='m')
+            for i in range(6)
+        ]
+        for notification in self.notifications[:3]:
+            notification.archive()
+        Notification.objects.filter(pk=self.notifications[3].pk).update(created_at=timezone.now() - timedelta(days=200))
+
+    def test_move_archived_and_old_rows(self):
+        out = StringIO()
+        call_command('move_notifications_to_cold_storage', chunk_size=2, stdout=out)
+        self.assertIn('Moved 3 notifications', out.getvalue())
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertEqual(
+            sorted(ArchivedNotification.objects.values_list('original_id', flat=True)),
+            [n.pk for n in self.notifications[:3]],
+        )
+
+        call_command('move_notifications_to_cold_storage', older_than_days=90, stdout=StringIO())
+        self.assertEqual(Notification.objects.count(), 2)
+        moved = ArchivedNotification.objects.get(original_id=self.notifications[3].pk)
+        self.assertEqual((moved.title, moved.is_read), ('n3', False))
+        with self.assertRaises(ValueError):
+            moved.save()
+
+        # The moved unread notification no longer counts towards the badge
+        self.assertEqual(notification_counter_utils.unread_notification_count(Admin, self.staff.id), 2)
+        incremental = sorted(NotificationCounter.objects.values_list('recipient_object_id', 'unread', 'archived'))
+        notification_counter_utils.rebuild_notification_counters()
+        self.assertEqual(incremental, sorted(NotificationCounter.objects.values_list('recipient_object_id', 'unread', 'archived')))
+
+    def test_move_queries_do_not_grow_with_rows(self):
+        with CaptureQueriesContext(connection) as small:
+            notification_archive_utils.move_to_cold_storage()
+        for i in range(30):
+            Notification.create_notification(recipient=self.staff, title=f'x{i}', message='m').archive()
+        with CaptureQueriesContext(connection) as large:
+            self.assertEqual(notification_archive_utils.move_to_cold_storage()['moved'], 30)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+        self.assertLess(len(large.captured_queries), 20)
+
+    def test_history_filter_reads_cold_storage(self):
+        call_command('move_notifications_to_cold_storage', stdout=StringIO())
+        session = self.client.session
+        session['staff_id'] = self.staff.id
+        session['admin_role'] = 'staff'
+        session.save()
+
+        history = self.client.get(reverse('staff_notifications'), {'status': 'history'})
+        self.assertEqual(history.status_code, 200)
+        self.assertEqual([n.title for n in history.context['notifications']], ['n2', 'n1', 'n0'])
+        self.assertNotContains(history, 'onclick="archiveNotification(')
+
+        more = self.client.get(reverse('admin_notifications_more'), {'status': 'history'})
+        self.assertEqual(more.json()['html'].count('list-group-item'), 3)
+
+
+class SyntheticDataBenchmarkTests(TestCase):
+    def test_generate_then_benchmark(self):
+        call_command(
+            'generate_synthetic_data', residents=20, staff=3, cases=60, notifications=40,
+            activities=40, posts=5, seed=1, stdout=StringIO(),
+        )
+        self.assertEqual(Complaint.objects.count() + AssistanceRequest.objects.count(), 60)
+        self.assertTrue(CaseDailyStats.objects.exists())
+        self.assertFalse(Complaint.objects.filter(geohash='').exists())
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'report.json')
+            call_command('benchmark_dashboards', output=output, repeat=1, stdout=StringIO())
+            with open(output) as report_file:
+                report = json.load(report_file)
+
+        self.assertEqual(report['row_counts']['residents'], 20)
+        for name, result in report['results'].items():
+            if name == 'community_forum':
+                # Forum URLs are disabled, so its template cannot render
+                continue
+            self.assertEqual(result['status'], 200, name)
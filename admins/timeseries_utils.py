@@ -0,0 +1,112 @@
+"""
+Gap-filled time series for dashboard trend charts.
+A series is computed with a single Trunc + GROUP BY query and then aligned to a fixed
+list of local (TIME_ZONE) calendar buckets, so empty days/weeks/months show up as
+zeros and every series on a chart shares the same labels.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, DateField, DateTimeField
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+
+GRANULARITIES = ('day', 'week', 'month')
+
+DEFAULT_LABEL_FORMATS = {
+    'day': '%b %d',
+    'week': '%b %d',
+    'month': '%b %Y',
+}
+
+
+def bucket_starts(granularity, periods, now=None):
+    """
+    Start dates of the last ``periods`` buckets, oldest first, ending with the current one.
+
+    Weeks start on Monday (matching the database week truncation) and months on the
+    1st, computed on local dates so there is no 30-days-per-month drift.
+
+    Args:
+        granularity (str): 'day', 'week' or 'month'
+        periods (int): Number of buckets
+        now (datetime, optional): Reference time, defaults to timezone.now()
+
+    Returns:
+        list: datetime.date objects
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported time series granularity: {granularity}")
+
+    today = timezone.localdate(now or timezone.now())
+    if granularity == 'day':
+        return [today - timedelta(days=i) for i in range(periods - 1, -1, -1)]
+    if granularity == 'week':
+        this_week = today - timedelta(days=today.weekday())
+        return [this_week - timedelta(weeks=i) for i in range(periods - 1, -1, -1)]
+
+    starts = [today.replace(day=1)]
+    for _ in range(periods - 1):
+        starts.insert(0, (starts[0] - timedelta(days=1)).replace(day=1))
+    return starts
+
+
+def time_series(queryset, date_field, granularity='month', periods=6, group_by=None,
+                aggregate=None, now=None, label_format=None):
+    """
+    Aggregate ``queryset`` into gap-filled buckets of ``date_field``.
+
+    Args:
+        queryset: Any queryset (case tables, CaseDailyStats, ...)
+        date_field (str): DateField or DateTimeField to bucket on; datetimes are
+            truncated in the current time zone (Asia/Manila)
+        granularity (str): 'day', 'week' or 'month'
+        periods (int): Number of buckets ending with the current one
+        group_by (str, optional): Field to split the series on
+        aggregate (optional): Aggregate expression per bucket, defaults to Count('pk')
+            (use Sum('count') for the rollup table)
+        now (datetime, optional): Reference time, defaults to timezone.now()
+        label_format (str, optional): strftime format for labels, defaults per granularity
+
+    Returns:
+        dict: {'labels': [...], 'values': [...]} when not grouped, otherwise
+              {'labels': [...], 'series': {group value: [...]}}. Values are aligned with
+              the labels, oldest first, with 0 for empty buckets.
+
+    Usage:
+        time_series(case_stats(), 'date', 'day', 30, group_by='case_kind', aggregate=Sum('count'))
+    """
+    starts = bucket_starts(granularity, periods, now)
+    label_format = label_format or DEFAULT_LABEL_FORMATS[granularity]
+    labels = [start.strftime(label_format) for start in starts]
+    index = {start: position for position, start in enumerate(starts)}
+
+    lower_bound = starts[0]
+    if isinstance(queryset.model._meta.get_field(date_field), DateTimeField):
+        lower_bound = timezone.make_aware(datetime.combine(lower_bound, time.min))
+
+    fields = ['bucket'] + ([group_by] if group_by else [])
+    rows = queryset.filter(**{f'{date_field}__gte': lower_bound}).annotate(
+        bucket=Trunc(date_field, granularity, output_field=DateField()),
+    ).values(*fields).annotate(value=aggregate or Count('pk')).order_by()
+
+    if not group_by:
+        values = [0] * periods
+        for row in rows:
+            if row['bucket'] in index:
+                values[index[row['bucket']]] += row['value'] or 0
+        return {'labels': labels, 'values': values}
+
+    series = {}
+    for row in rows:
+        if row['bucket'] not in index:
+            continue
+        values = series.setdefault(row[group_by], [0] * periods)
+        values[index[row['bucket']]] += row['value'] or 0
+    return {'labels': labels, 'series': series}
+
+
+def series_values(result, group):
+    """Values of one group from a grouped time_series() result, zeros when the group had no rows."""
+    return result['series'].get(group, [0] * len(result['labels']))
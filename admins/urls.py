@@ -12,6 +12,7 @@ from .views import (
     admin_user_activity,
     admin_feedback,
     admin_sms_logs,
+    notification_stream,
     )
 
 urlpatterns = [
@@ -22,6 +23,8 @@ urlpatterns = [
     
     # Analytics
     path('analytics/', admin_analytics.admin_analytics, name='admin_analytics'),
+    path('analytics/api/v1/heatmap/', admin_analytics.admin_analytics_heatmap, name='admin_analytics_heatmap'),
+    path('analytics/api/v1/<slug:group>/', admin_analytics.admin_analytics_data, name='admin_analytics_data'),
     
     # Complaints
     path('complaints/', admin_complaints.admin_complaints, name='admin_complaints'),
@@ -42,6 +45,8 @@ urlpatterns = [
 
     # Notifications
     path('notifications/', admin_notifications.admin_notification, name='admin_notifications'),
+    path('notifications/more/', admin_notifications.admin_notifications_more, name='admin_notifications_more'),
+    path('notifications/stream/', notification_stream.notification_stream, {'kind': 'admin'}, name='admin_notification_stream'),
     path('notifications/mark-read/', admin_notifications.mark_notification_read, name='mark_notification_read'),
     path('notifications/mark-all-read/', admin_notifications.mark_all_notifications_read, name='mark_all_notifications_read'),
     path('notifications/archive/', admin_notifications.archive_notification, name='archive_notification'),
@@ -65,6 +70,7 @@ urlpatterns = [
 
     # SMS Logs
     path('sms-logs/', admin_sms_logs.admin_sms_logs, name='admin_sms_logs'),
+    path('sms-logs/gateway/', admin_sms_logs.admin_sms_gateway_status, name='admin_sms_gateway_status'),
 
     # Profile
     path('profile/', admin_profile.admin_profile, name='admin_profile'),
@@ -21,7 +21,7 @@ def accounts(request):
     admin_count = Admin.objects.filter(role='admin').count()
     
     # Log activity
-    admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+    admin_user = request.principal.admin
     if admin_user:
         log_activity(
             user=admin_user,
@@ -112,7 +112,7 @@ def add_account(request):
         full_name = f"{first_name} {last_name}"
         
         # Log activity
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -128,7 +128,7 @@ def add_account(request):
         
     except Exception as e:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -170,7 +170,7 @@ def change_account_password(request):
         admin.save()
         
         # Log activity
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -185,7 +185,7 @@ def change_account_password(request):
         sweetify.toast(request, 'Password updated successfully.', timer=2000)
     except Exception as e:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -228,7 +228,7 @@ def delete_account(request):
         admin.delete()
         
         # Log activity
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -243,7 +243,7 @@ def delete_account(request):
         sweetify.toast(request, 'Account deleted successfully.', timer=2000)
     except Exception as e:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
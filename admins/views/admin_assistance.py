@@ -96,7 +96,7 @@ def admin_assistance(request):
     urgencies = AssistanceRequest.objects.values_list('urgency', flat=True).distinct()
 
     # Log activity
-    admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+    admin_user = request.principal.admin
     if admin_user:
         filter_info = []
         if search_query:
@@ -204,7 +204,7 @@ def assistance_details(request, assistance_id):
                 })
         
         # Log activity
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_case_activity(
                 user=admin_user,
@@ -224,7 +224,7 @@ def assistance_details(request, assistance_id):
 
     except AssistanceRequest.DoesNotExist:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -241,7 +241,7 @@ def assistance_details(request, assistance_id):
 
     except Exception as e:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -321,7 +321,7 @@ def assign_assistance(request):
 
     except Exception as e:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -363,7 +363,7 @@ def update_assistance_status(request):
         assistance.save()
         
         # Log activity
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             activity_type_map = {
                 'resolved': 'assistance_resolved',
@@ -387,7 +387,7 @@ def update_assistance_status(request):
         
     except Exception as e:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
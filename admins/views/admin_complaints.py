@@ -98,7 +98,7 @@ def admin_complaints(request):
     priorities = Complaint.objects.values_list('priority', flat=True).distinct()
 
     # Log activity
-    admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+    admin_user = request.principal.admin
     if admin_user:
         filter_info = []
         if search_query:
@@ -213,7 +213,7 @@ def assign_complaint(request):
         
     except Exception as e:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -254,7 +254,7 @@ def update_complaint_status(request):
         complaint.save()
         
         # Log activity
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             activity_type_map = {
                 'resolved': 'complaint_resolved',
@@ -278,7 +278,7 @@ def update_complaint_status(request):
         
     except Exception as e:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -356,7 +356,7 @@ def complaint_details(request, complaint_id):
             pass  # No attachments or error accessing them
         
         # Log activity
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_case_activity(
                 user=admin_user,
@@ -376,7 +376,7 @@ def complaint_details(request, complaint_id):
         
     except Complaint.DoesNotExist:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -393,7 +393,7 @@ def complaint_details(request, complaint_id):
     
     except Exception as e:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
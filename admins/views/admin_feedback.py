@@ -17,7 +17,7 @@ def admin_feedback(request):
         return redirect('admin_login')
     
     try:
-        current_admin = Admin.objects.get(id=admin_id)
+        current_admin = request.principal.get('admin')
         
         # Base query
         feedbacks = Feedback.objects.all().select_related('user').order_by('-created_at')
@@ -143,7 +143,7 @@ def mark_feedback_read(request, feedback_id):
         return redirect('admin_login')
     
     try:
-        current_admin = Admin.objects.get(id=admin_id)
+        current_admin = request.principal.get('admin')
         feedback = get_object_or_404(Feedback, id=feedback_id)
         
         feedback.is_read = True
@@ -183,7 +183,7 @@ def respond_feedback(request, feedback_id):
         return redirect('admin_login')
     
     try:
-        current_admin = Admin.objects.get(id=admin_id)
+        current_admin = request.principal.get('admin')
         feedback = get_object_or_404(Feedback, id=feedback_id)
         
         response = request.POST.get('response', '').strip()
@@ -230,7 +230,7 @@ def delete_feedback(request, feedback_id):
         return redirect('admin_login')
     
     try:
-        current_admin = Admin.objects.get(id=admin_id)
+        current_admin = request.principal.get('admin')
         feedback = get_object_or_404(Feedback, id=feedback_id)
         
         feedback_info = f"{feedback.name} - {feedback.subject}"
@@ -100,7 +100,7 @@ def admin_logout(request):
     # Log logout
     if admin_id:
         try:
-            admin = Admin.objects.filter(id=admin_id).first()
+            admin = request.principal.admin
             if admin:
                 log_logout(
                     user=admin,
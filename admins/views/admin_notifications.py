@@ -1,15 +1,50 @@
 from django.shortcuts import render, redirect
-from django.core.paginator import Paginator
-from django.views.decorators.http import require_POST
+from django.template.loader import render_to_string
+from django.views.decorators.http import require_GET, require_POST
 from django.db.models import Q
 from django.http import JsonResponse
 from django.contrib.contenttypes.models import ContentType
-from admins.models import Notification
+from admins.models import ArchivedNotification, Notification
+from admins.notification_counter_utils import update_notifications
+from admins.notification_list_utils import load_notification_rows
+from admins.pagination_utils import keyset_page
 from core.models import Admin
 import sweetify, json
 from admins.user_activity_utils import log_activity
 
 
+NOTIFICATIONS_PER_PAGE = 10
+
+
+def filtered_admin_notifications(type_filter='', status_filter=''):
+    """
+    Notifications sent to admin/staff accounts, narrowed by the inbox filters.
+    The 'history' status reads the cold-storage table instead of the live one.
+    """
+    admin_ct = ContentType.objects.get_for_model(Admin)
+    model = ArchivedNotification if status_filter == 'history' else Notification
+
+    admin_notifications = model.objects.select_related(
+        'recipient_content_type', 'sender_content_type',
+        'related_complaint', 'related_assistance'
+    ).filter(
+        recipient_content_type=admin_ct
+    )
+
+    if type_filter:
+        admin_notifications = admin_notifications.filter(notification_type=type_filter)
+
+    if status_filter:
+        if status_filter == 'unread':
+            admin_notifications = admin_notifications.filter(is_read=False)
+        elif status_filter == 'read':
+            admin_notifications = admin_notifications.filter(is_read=True)
+        elif status_filter == 'archived':
+            admin_notifications = admin_notifications.filter(is_archived=True)
+
+    return admin_notifications
+
+
 def admin_notification(request):
     """
     Display notifications for admin dashboard - showing only admin notifications.
@@ -27,25 +62,7 @@ def admin_notification(request):
     # Get content type for Admin model
     admin_ct = ContentType.objects.get_for_model(Admin)
     
-    # Get only admin notifications
-    admin_notifications = Notification.objects.select_related(
-        'recipient_content_type', 'sender_content_type',
-        'related_complaint', 'related_assistance'
-    ).filter(
-        recipient_content_type=admin_ct
-    ).order_by('-created_at')
-    
-    # Apply filters
-    if type_filter:
-        admin_notifications = admin_notifications.filter(notification_type=type_filter)
-        
-    if status_filter:
-        if status_filter == 'unread':
-            admin_notifications = admin_notifications.filter(is_read=False)
-        elif status_filter == 'read':
-            admin_notifications = admin_notifications.filter(is_read=True)
-        elif status_filter == 'archived':
-            admin_notifications = admin_notifications.filter(is_archived=True)
+    admin_notifications = filtered_admin_notifications(type_filter, status_filter)
     
     # Calculate stats (only for admin notifications)
     total_notifications = Notification.objects.filter(recipient_content_type=admin_ct).count()
@@ -61,16 +78,19 @@ def admin_notification(request):
         recipient_content_type=admin_ct, priority='urgent'
     ).count()
     
-    # Pagination
-    paginator = Paginator(admin_notifications, 10)
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
+    # Keyset pagination: ?cursor= continues after the last row shown, so deep pages
+    # do not pay for an OFFSET scan
+    try:
+        page = keyset_page(admin_notifications, request.GET.get('cursor'), NOTIFICATIONS_PER_PAGE)
+    except ValueError:
+        page = keyset_page(admin_notifications, None, NOTIFICATIONS_PER_PAGE)
+    page['items'] = load_notification_rows(page['items'])
     
     # Get notification types from model choices
     notification_types = [choice[0] for choice in Notification.NOTIFICATION_TYPES]
     
     # Log activity
-    admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+    admin_user = request.principal.admin
     if admin_user:
         filter_info = []
         if type_filter:
@@ -96,8 +116,8 @@ def admin_notification(request):
         )
     
     context = {
-        'admin_notifications': page_obj,
-        'admin_page_obj': page_obj,
+        'admin_notifications': page['items'],
+        'next_cursor': page['next_cursor'],
         
         # Stats for cards
         'total_notifications': total_notifications,
@@ -116,6 +136,33 @@ def admin_notification(request):
     return render(request, 'admin_notification.html', context)
 
 
+@require_GET
+def admin_notifications_more(request):
+    """
+    JSON "load more" for the admin inbox: the rendered rows after ``cursor`` and the
+    cursor for the page after them.
+    """
+    user = request.session.get('admin_role', '')
+
+    if user != 'admin' and user != 'staff' or not user:
+        return JsonResponse({'success': False, 'error': 'Not authenticated'}, status=403)
+
+    admin_notifications = filtered_admin_notifications(
+        request.GET.get('type', '').strip(), request.GET.get('status', '').strip(),
+    )
+    try:
+        page = keyset_page(admin_notifications, request.GET.get('cursor'), NOTIFICATIONS_PER_PAGE)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid cursor'}, status=400)
+    page['items'] = load_notification_rows(page['items'])
+
+    return JsonResponse({
+        'success': True,
+        'html': render_to_string('admin_notification_rows.html', {'notifications': page['items']}, request=request),
+        'next_cursor': page['next_cursor'],
+    })
+
+
 @require_POST
 def mark_notification_read(request):
     """
@@ -135,7 +182,7 @@ def mark_notification_read(request):
         notification.mark_as_read()
         
         # Log activity
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -151,7 +198,7 @@ def mark_notification_read(request):
         
     except Exception as e:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -182,13 +229,13 @@ def mark_all_notifications_read(request):
         from django.contrib.contenttypes.models import ContentType
         admin_content_type = ContentType.objects.get_for_model(Admin)
         
-        updated_count = Notification.objects.filter(
+        updated_count = update_notifications(Notification.objects.filter(
             is_read=False,
             recipient_content_type=admin_content_type
-        ).update(is_read=True)
+        ), is_read=True)
         
         # Log activity
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -204,7 +251,7 @@ def mark_all_notifications_read(request):
         
     except Exception as e:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -239,7 +286,7 @@ def archive_notification(request):
         notification.archive()
         
         # Log activity
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -255,7 +302,7 @@ def archive_notification(request):
         
     except Exception as e:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -288,7 +335,7 @@ def notification_details(request, notification_id):
             notification.mark_as_read()
         
         # Log activity
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -312,7 +359,7 @@ def notification_details(request, notification_id):
         
     except Notification.DoesNotExist:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -328,7 +375,7 @@ def notification_details(request, notification_id):
         return redirect('admin_notifications')
     except Exception as e:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -14,7 +14,7 @@ def admin_profile(request):
         return redirect('admin_login')
     
     admin_id = request.session.get('admin_id')
-    admin = StaffAdmin.objects.get(id=admin_id)
+    admin = request.principal.get('admin')
     
     if request.method == 'POST':
         action = request.POST.get('action')
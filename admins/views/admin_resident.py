@@ -83,7 +83,7 @@ def admin_resident(request):
         end_index = min(start_index + per_page - 1, paginator.count)
 
         # Log activity
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             filter_info = []
             if query:
@@ -162,7 +162,7 @@ def approve_resident(request, resident_id):
         resident.save()
         
         # Log activity
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -178,7 +178,7 @@ def approve_resident(request, resident_id):
 
     except User.DoesNotExist:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -194,7 +194,7 @@ def approve_resident(request, resident_id):
 
     except Exception as e:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -240,7 +240,7 @@ def archive_resident(request, resident_id):
         resident.save()
         
         # Log activity
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -262,7 +262,7 @@ def archive_resident(request, resident_id):
 
     except User.DoesNotExist:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -278,7 +278,7 @@ def archive_resident(request, resident_id):
     
     except Exception as e:
         # Log failed attempt
-        admin_user = Admin.objects.filter(id=request.session.get('admin_id')).first()
+        admin_user = request.principal.admin
         if admin_user:
             log_activity(
                 user=admin_user,
@@ -1,6 +1,9 @@
+from django.db.models import Count
+from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from core.models import SMSLogs
+from core.models import SMSLogs, SMSOutbox
+from core.sms_transport_utils import gateway_state
 import sweetify
 
 
@@ -37,6 +40,19 @@ def admin_sms_logs(request):
         'successful_sms': successful_sms,
         'failed_sms': failed_sms,
         'pending_sms': pending_sms,
+        'gateway': gateway_state(),
     }
     
-    return render(request, 'admin_sms_logs.html', context)
\ No newline at end of file
+    return render(request, 'admin_sms_logs.html', context)
+
+
+def admin_sms_gateway_status(request):
+    """JSON health of the SMS gateway: circuit breaker state and outbox backlog per status"""
+    if not request.session.get('admin_id'):
+        return JsonResponse({'success': False, 'error': 'Not authenticated'}, status=403)
+
+    outbox = {status: 0 for status, _ in SMSOutbox.STATUS_CHOICES}
+    for row in SMSOutbox.objects.values('status').annotate(count=Count('pk')).order_by():
+        outbox[row['status']] = row['count']
+
+    return JsonResponse({'success': True, 'gateway': gateway_state(), 'outbox': outbox})
@@ -19,7 +19,7 @@ def admin_user_activity(request):
         return redirect('admin_login')
     
     try:
-        current_admin = Admin.objects.get(id=admin_id)
+        current_admin = request.principal.get('admin')
         
         # Base query
         activities = UserActivity.objects.all().select_related(
@@ -184,7 +184,7 @@ def export_user_activity(request):
         import csv
         from django.http import HttpResponse
         
-        current_admin = Admin.objects.get(id=admin_id)
+        current_admin = request.principal.get('admin')
         
         # Create the HttpResponse object with CSV header
         response = HttpResponse(content_type='text/csv')
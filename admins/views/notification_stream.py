@@ -0,0 +1,140 @@
+import json
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from django.contrib.contenttypes.models import ContentType
+from admins.notification_counter_utils import unread_notification_count
+from admins.notification_stream_utils import channel_for, get_broker
+from core.principal_utils import PRINCIPAL_MODELS
+
+
+def format_event(event_type, data, event_id=None):
+    """One text/event-stream frame."""
+    frame = f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+    if event_id is not None:
+        frame = f"id: {event_id}\n" + frame
+    return frame
+
+
+def last_seen_event_id(request, default):
+    """
+    Where to resume: the Last-Event-ID header sent by a reconnecting EventSource,
+    the ``last_event_id`` query parameter (long-poll clients), or ``default`` ("now")
+    for a new client.
+    """
+    value = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def replayable(events, snapshot_id):
+    """
+    Missed events worth sending along with an unread snapshot taken at ``snapshot_id``.
+    unread_delta events up to that id are already part of the snapshot; clients add
+    deltas to it, so replaying them would count the same change twice.
+    """
+    return [event for event in events if event['type'] == 'notification' or event['id'] > snapshot_id]
+
+
+def resume_frames(events, snapshot_id, unread):
+    """
+    Frames for a (re)connecting client: the notifications it missed, the unread
+    snapshot carrying ``snapshot_id`` as its event id, then anything newer.
+    """
+    events = replayable(events, snapshot_id)
+    frames = [format_event(e['type'], e['data'], e['id']) for e in events if e['id'] <= snapshot_id]
+    frames.append(format_event('unread', {'unread': unread}, snapshot_id))
+    frames.extend(format_event(e['type'], e['data'], e['id']) for e in events if e['id'] > snapshot_id)
+    return frames
+
+
+def stream_recipient(request, kind):
+    """
+    Channel and unread count of the logged-in ``kind`` account, or None when nobody
+    of that kind is logged in. Synchronous (session and database access).
+    """
+    object_id = request.principal.session_id(kind)
+    if kind == 'admin' and request.session.get('admin_role') not in ('admin', 'staff'):
+        object_id = None
+    if not object_id:
+        return None
+
+    content_type = ContentType.objects.get_for_model(PRINCIPAL_MODELS[kind])
+    return channel_for(content_type.id, object_id), unread_notification_count(PRINCIPAL_MODELS[kind], object_id)
+
+
+@require_GET
+async def notification_stream(request, kind):
+    """
+    New notifications and unread-count changes for the logged-in ``kind`` account.
+
+    Live delivery needs ASGI (babantngon/asgi.py under uvicorn/daphne): the view is
+    async and waits on the broker without holding a thread, so every open tab costs
+    a coroutine, not a worker.
+
+    - Under ASGI: a long-lived text/event-stream with periodic heartbeats.
+    - Under WSGI: nothing blocks. The response carries the current unread count and
+      any pending events, then closes with a ``retry:`` hint of
+      NOTIFICATION_STREAM_POLL_SECONDS, so EventSource falls back to plain polling.
+    - ``?format=json``: {'success', 'unread', 'events', 'last_event_id'}; a long poll
+      of up to NOTIFICATION_STREAM_TIMEOUT seconds under ASGI, immediate under WSGI.
+    """
+    broker = get_broker()
+    # Taken before the count is read: every event up to here is committed, so counted
+    snapshot_id = broker.last_event_id()
+    recipient = await sync_to_async(stream_recipient)(request, kind)
+    if recipient is None:
+        return JsonResponse({'success': False, 'error': 'Not authenticated'}, status=403)
+
+    channel, unread = recipient
+    after_id = last_seen_event_id(request, snapshot_id)
+    live = isinstance(request, ASGIRequest)
+
+    if request.GET.get('format') == 'json':
+        events = await broker.wait_async(channel, after_id, settings.NOTIFICATION_STREAM_TIMEOUT if live else 0)
+        events = replayable(events, snapshot_id)
+        return JsonResponse({
+            'success': True,
+            'unread': unread,
+            'events': events,
+            'last_event_id': max([snapshot_id] + [event['id'] for event in events]),
+        })
+
+    if live:
+        stream = asgi_event_stream(broker, channel, after_id, snapshot_id, unread)
+    else:
+        stream = wsgi_event_stream(broker, channel, after_id, snapshot_id, unread)
+
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def wsgi_event_stream(broker, channel, after_id, snapshot_id, unread):
+    yield f"retry: {settings.NOTIFICATION_STREAM_POLL_SECONDS * 1000}\n"
+    yield from resume_frames(broker.wait(channel, after_id, 0), snapshot_id, unread)
+
+
+async def asgi_event_stream(broker, channel, after_id, snapshot_id, unread):
+    heartbeat = settings.NOTIFICATION_STREAM_HEARTBEAT
+    yield f"retry: {settings.NOTIFICATION_STREAM_RETRY_MS}\n"
+    missed = await broker.wait_async(channel, after_id, 0)
+    for frame in resume_frames(missed, snapshot_id, unread):
+        yield frame
+    after_id = max([snapshot_id] + [event['id'] for event in missed])
+    while True:
+        events = await broker.wait_async(channel, after_id, heartbeat)
+        for event in events:
+            after_id = event['id']
+            yield format_event(event['type'], event['data'], event['id'])
+        if not events:
+            # Comment frame: keeps proxies from closing an idle connection
+            yield ": keep-alive\n\n"
@@ -0,0 +1,40 @@
+// "Load more" for the cursor-paginated notification inboxes.
+// The button links to ?cursor=... so it works without JavaScript; with it, the next rows
+// are fetched from the JSON endpoint in data-url ({html, next_cursor}) and appended.
+document.addEventListener('DOMContentLoaded', function () {
+    const button = document.getElementById('loadMoreNotifications');
+    if (!button) {
+        return;
+    }
+    const list = document.getElementById(button.dataset.list);
+    const params = new URLSearchParams(window.location.search);
+
+    button.addEventListener('click', function (event) {
+        event.preventDefault();
+        if (button.classList.contains('disabled')) {
+            return;
+        }
+        button.classList.add('disabled');
+        params.set('cursor', button.dataset.cursor);
+
+        fetch(`${button.dataset.url}?${params.toString()}`, {
+            headers: { 'X-Requested-With': 'XMLHttpRequest' },
+        })
+            .then(response => response.ok ? response.json() : Promise.reject(response.status))
+            .then(data => {
+                list.insertAdjacentHTML('beforeend', data.html);
+                if (data.next_cursor) {
+                    button.dataset.cursor = data.next_cursor;
+                    params.set('cursor', data.next_cursor);
+                    button.href = `?${params.toString()}`;
+                    button.classList.remove('disabled');
+                } else {
+                    button.closest('.card-footer').remove();
+                }
+            })
+            .catch(() => {
+                // Fall back to a normal page load of the next page
+                window.location.href = button.href;
+            });
+    });
+});
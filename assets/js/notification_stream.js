@@ -0,0 +1,53 @@
+// Live notification badge and toasts over Server-Sent Events.
+// The stream URL comes from this script tag's data-stream-url. Events:
+//   unread       {unread}   current badge count, sent on every (re)connect
+//   unread_delta {delta}    change of the badge count
+//   notification {title, message, priority, ...}   a new notification
+// EventSource resends Last-Event-ID when it reconnects, so nothing is missed
+// between WSGI polls (the server's retry hint sets the polling interval there).
+(function () {
+    const script = document.currentScript;
+    if (!script || !window.EventSource) {
+        return;
+    }
+    const url = script.dataset.streamUrl;
+    let unread = null;
+
+    function renderBadges() {
+        document.querySelectorAll('[data-unread-badge]').forEach(function (badge) {
+            badge.textContent = unread;
+            badge.style.display = unread > 0 ? '' : 'none';
+        });
+    }
+
+    const source = new EventSource(url);
+
+    source.addEventListener('unread', function (event) {
+        unread = JSON.parse(event.data).unread;
+        renderBadges();
+    });
+
+    source.addEventListener('unread_delta', function (event) {
+        if (unread === null) {
+            return;
+        }
+        unread = Math.max(0, unread + JSON.parse(event.data).delta);
+        renderBadges();
+    });
+
+    source.addEventListener('notification', function (event) {
+        const notification = JSON.parse(event.data);
+        if (window.Swal) {
+            Swal.fire({
+                toast: true,
+                position: 'top-end',
+                icon: notification.priority === 'urgent' || notification.priority === 'high' ? 'warning' : 'info',
+                title: notification.title,
+                text: notification.message,
+                showConfirmButton: false,
+                timer: 5000,
+                timerProgressBar: true,
+            });
+        }
+    });
+})();
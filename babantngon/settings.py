@@ -66,6 +66,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.PrincipalMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -84,6 +85,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'resident.context_processors.get_current_user',
+                'resident.context_processors.resident_notifications',
                 'admins.context_processors.admin_notifications',
                 'staffs.context_processors.staff_notifications_context',
             ],
@@ -113,6 +115,79 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Use a shared backend (e.g. database or redis) when running more than one worker process
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='babatngon-cms'),
+    }
+}
+
+# Seconds a cached analytics/dashboard context lives (entries are also versioned by data changes)
+ANALYTICS_CACHE_TIMEOUT = config('ANALYTICS_CACHE_TIMEOUT', default=600, cast=int)
+
+# Seconds a logged-in account's profile stays cached (also dropped when the account is saved)
+PRINCIPAL_CACHE_TIMEOUT = config('PRINCIPAL_CACHE_TIMEOUT', default=300, cast=int)
+
+
+# Real-time notifications (admins/notification_stream_utils.py)
+# The in-process broker only reaches clients served by the same process; point this
+# at a shared implementation when running several workers
+NOTIFICATION_BROKER = config('NOTIFICATION_BROKER', default='admins.notification_stream_utils.InProcessBroker')
+
+# Live streaming needs ASGI (babantngon/asgi.py); under WSGI the stream endpoint never
+# blocks and the browser polls it every NOTIFICATION_STREAM_POLL_SECONDS instead
+NOTIFICATION_STREAM_POLL_SECONDS = config('NOTIFICATION_STREAM_POLL_SECONDS', default=30, cast=int)
+
+# Seconds one ?format=json long poll waits for events under ASGI
+NOTIFICATION_STREAM_TIMEOUT = config('NOTIFICATION_STREAM_TIMEOUT', default=25, cast=int)
+
+# Seconds between keep-alive comments on an idle ASGI stream
+NOTIFICATION_STREAM_HEARTBEAT = config('NOTIFICATION_STREAM_HEARTBEAT', default=15, cast=int)
+
+# Milliseconds EventSource waits before reconnecting
+NOTIFICATION_STREAM_RETRY_MS = config('NOTIFICATION_STREAM_RETRY_MS', default=1000, cast=int)
+
+# Digest mode: repeated status/comment notifications for the same recipient and case
+# within this many minutes update one row instead of inserting new ones (0, the default, disables)
+NOTIFICATION_DIGEST_WINDOW_MINUTES = config('NOTIFICATION_DIGEST_WINDOW_MINUTES', default=0, cast=int)
+
+
+# SMS outbox (core/sms_outbox_utils.py, drained by `manage.py run_sms_worker`)
+# Delivery attempts before a message is dead-lettered
+SMS_OUTBOX_MAX_ATTEMPTS = config('SMS_OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+
+# Retry backoff: base * 2 ** (attempt - 1) seconds, capped at the maximum
+SMS_OUTBOX_RETRY_BASE_SECONDS = config('SMS_OUTBOX_RETRY_BASE_SECONDS', default=30, cast=int)
+SMS_OUTBOX_RETRY_MAX_SECONDS = config('SMS_OUTBOX_RETRY_MAX_SECONDS', default=3600, cast=int)
+
+# Semaphore HTTP transport (core/sms_transport_utils.py): pooled keep-alive session,
+# per-request retries of connection errors / 429 / 5xx with exponential backoff (seconds)
+SMS_HTTP_TIMEOUT = config('SMS_HTTP_TIMEOUT', default=10, cast=int)
+SMS_HTTP_POOL_SIZE = config('SMS_HTTP_POOL_SIZE', default=10, cast=int)
+SMS_HTTP_RETRY_ATTEMPTS = config('SMS_HTTP_RETRY_ATTEMPTS', default=3, cast=int)
+SMS_HTTP_RETRY_BACKOFF = config('SMS_HTTP_RETRY_BACKOFF', default=0.5, cast=float)
+SMS_HTTP_RETRY_BACKOFF_MAX = config('SMS_HTTP_RETRY_BACKOFF_MAX', default=4, cast=float)
+
+# Circuit breaker: stop calling Semaphore after this many consecutive failed requests,
+# and let one trial request through after the reset period
+SMS_CIRCUIT_FAILURE_THRESHOLD = config('SMS_CIRCUIT_FAILURE_THRESHOLD', default=5, cast=int)
+SMS_CIRCUIT_RESET_SECONDS = config('SMS_CIRCUIT_RESET_SECONDS', default=60, cast=int)
+
+# SMS throttling (core/sms_throttle_utils.py). Identical messages to the same number
+# within the window are suppressed (0 disables); token buckets hold up to CAPACITY
+# messages and refill PER_MINUTE per minute, per recipient and for the whole site, and
+# messages over a bucket wait for it to refill. Applied by run_sms_worker at send time
+SMS_DUPLICATE_WINDOW_SECONDS = config('SMS_DUPLICATE_WINDOW_SECONDS', default=600, cast=int)
+SMS_THROTTLE_RECIPIENT_CAPACITY = config('SMS_THROTTLE_RECIPIENT_CAPACITY', default=5, cast=int)
+SMS_THROTTLE_RECIPIENT_PER_MINUTE = config('SMS_THROTTLE_RECIPIENT_PER_MINUTE', default=1, cast=float)
+SMS_THROTTLE_GLOBAL_CAPACITY = config('SMS_THROTTLE_GLOBAL_CAPACITY', default=100, cast=int)
+SMS_THROTTLE_GLOBAL_PER_MINUTE = config('SMS_THROTTLE_GLOBAL_PER_MINUTE', default=60, cast=float)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -221,6 +296,16 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'core.sms_transport_utils': {
+            'handlers': ['console', 'sms_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'core.sms_outbox_utils': {
+            'handlers': ['console', 'sms_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
         'resident.views.resident_complaints': {
             'handlers': ['console', 'file'],
             'level': 'INFO',
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from core.sms_outbox_utils import DEFERRAL_REASONS, drain_outbox
+from core.sms_transport_utils import gateway_state
+from core.sms_util import is_sms_configured
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued SMS from the outbox with bounded concurrency, retries and dead-lettering.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain what is due now and exit')
+        parser.add_argument('--batch-size', type=int, default=50, help='Messages claimed per batch')
+        parser.add_argument('--concurrency', type=int, default=4, help='Simultaneous Semaphore requests')
+        parser.add_argument('--lease', type=int, default=120,
+                            help='Seconds a claimed batch stays locked before another worker may retry it')
+        parser.add_argument('--poll-interval', type=float, default=5, help='Seconds to sleep when nothing is due')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['concurrency'] < 1 or options['lease'] < 1:
+            raise CommandError('--batch-size, --concurrency and --lease must be >= 1.')
+        if not is_sms_configured():
+            raise CommandError('Semaphore SMS is not configured (SEMAPHORE_API_KEY); queued messages are left untouched.')
+
+        while True:
+            totals = drain_outbox(
+                batch_size=options['batch_size'],
+                concurrency=options['concurrency'],
+                lease_seconds=options['lease'],
+            )
+            if options['once'] or any(totals.values()):
+                self.stdout.write(
+                    f"Sent {totals['sent']}, rescheduled {totals['retry']}, dead-lettered {totals['dead']}, "
+                    f"deferred {totals['deferred']}, suppressed {totals['suppressed']}."
+                )
+            for reason, count in totals['deferred_reasons'].items():
+                warning = f"{DEFERRAL_REASONS[reason]}; {count} deferred"
+                if reason == 'circuit_open':
+                    warning += f", retrying in {gateway_state()['retry_after']:.0f}s"
+                self.stdout.write(self.style.WARNING(warning + '.'))
+            if options['once']:
+                return
+            close_old_connections()
+            time.sleep(options['poll_interval'])
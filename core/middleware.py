@@ -0,0 +1,16 @@
+from core.principal_utils import RequestPrincipal
+
+
+class PrincipalMiddleware:
+    """
+    Attach ``request.principal`` (see core/principal_utils.py) so views and context
+    processors share one lookup of the logged-in account instead of re-querying it
+    from the session id. Must come after SessionMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.principal = RequestPrincipal(request.session)
+        return self.get_response(request)
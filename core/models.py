@@ -163,7 +163,8 @@ class Feedback(models.Model):
 
 
 class SMSLogs(models.Model):
-    """Log of SMS messages sent via Semaphore"""
+    """Append-only log of SMS messages sent via Semaphore (written by core.sms_util)"""
+    message_id = models.CharField(max_length=50, unique=True, null=True, blank=True, help_text="Semaphore message id")
     recipient = models.CharField(max_length=20, help_text="Recipient phone number")
     message = models.TextField(help_text="Content of the SMS message")
     sender_name = models.CharField(max_length=50, blank=True, null=True, help_text="Sender name used")
@@ -177,11 +178,61 @@ class SMSLogs(models.Model):
         verbose_name = 'SMS Log'
         verbose_name_plural = 'SMS Logs'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', '-created_at']),
+            models.Index(fields=['-created_at']),
+        ]
     
     def __str__(self):
         return f"SMS to {self.recipient} - {self.status} at {self.created_at}"
 
 
+class SMSOutbox(models.Model):
+    """
+    Durable queue of outgoing SMS.
+
+    Views enqueue rows (core.sms_outbox_utils.enqueue_sms) in the same transaction as
+    the case they are about; the `run_sms_worker` command claims due rows, sends them
+    through Semaphore, retries failures with exponential backoff and dead-letters rows
+    that run out of attempts.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('suppressed', 'Suppressed duplicate'),
+        ('dead', 'Dead letter'),
+    ]
+
+    recipient = models.CharField(max_length=20, help_text="Recipient phone number")
+    message = models.TextField()
+    sender_name = models.CharField(max_length=50, blank=True, default='')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    rate_limited = models.BooleanField(default=True, help_text="Subject to the per-recipient SMS rate limit")
+    next_attempt_at = models.DateTimeField(help_text="When the row is next due for delivery")
+    locked_until = models.DateTimeField(null=True, blank=True, help_text="Lease of the worker sending it")
+    claim_token = models.CharField(max_length=32, blank=True, default='')
+    last_error = models.TextField(blank=True, default='')
+    response_data = models.JSONField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'sms_outbox'
+        verbose_name = 'SMS Outbox Message'
+        verbose_name_plural = 'SMS Outbox'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='sms_outbox_due_idx'),
+            models.Index(fields=['claim_token']),
+        ]
+
+    def __str__(self):
+        return f"SMS to {self.recipient} - {self.status} (attempt {self.attempts}/{self.max_attempts})"
+
+
 
 
 
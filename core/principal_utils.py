@@ -0,0 +1,145 @@
+"""
+The logged-in principal (resident, staff member or admin) of a request.
+PrincipalMiddleware attaches a RequestPrincipal to every request as ``request.principal``.
+It loads each account at most once per request, and only when a view asks for it.
+Templates and context processors use a slim profile dict that is cached across
+requests and dropped whenever the account is saved or deleted (see core/signals.py).
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.models import User, Admin
+
+
+# Session key holding the account id for each kind of principal
+PRINCIPAL_SESSION_KEYS = {
+    'resident': 'resident_id',
+    'staff': 'staff_id',
+    'admin': 'admin_id',
+}
+
+PRINCIPAL_MODELS = {
+    'resident': User,
+    'staff': Admin,
+    'admin': Admin,
+}
+
+
+def profile_cache_key(model, pk):
+    return f"principal:{model._meta.label_lower}:{pk}"
+
+
+def build_profile(account):
+    """
+    Slim, cacheable profile of a User or Admin account.
+
+    Returns:
+        dict: Name, contact and role fields used by the templates and context processors
+    """
+    profile = {
+        'id': account.pk,
+        'first_name': account.first_name,
+        'middle_name': account.middle_name or '',
+        'last_name': account.last_name,
+        'suffix': account.suffix or '',
+        'full_name': account.get_full_name(),
+        'email': account.email,
+    }
+    if isinstance(account, User):
+        profile.update({
+            'role': 'resident',
+            'phone': account.phone or '',
+            'address': account.address or '',
+            'barangay': account.barangay or '',
+            'profile_picture': account.profile_picture.url if account.profile_picture else '',
+        })
+    else:
+        profile.update({
+            'role': account.role,
+            'username': account.username,
+            'department': account.department,
+            'position': account.position,
+        })
+    return profile
+
+
+def invalidate_profile(model, pk):
+    """Drop the cached profile of one account."""
+    cache.delete(profile_cache_key(model, pk))
+
+
+class RequestPrincipal:
+    """
+    Lazily resolved accounts behind the session of one request.
+
+    A browser can hold resident, staff and admin sessions at the same time, so each
+    kind is resolved separately. ``instance()`` memoizes the model object for the rest
+    of the request, and ``profile()`` reads the cross-request profile cache.
+
+    Usage:
+        current_staff = request.principal.get('staff')   # raises Admin.DoesNotExist
+        user = request.principal.resident                 # User or None
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self._instances = {}
+        self._profiles = {}
+
+    def session_id(self, kind):
+        return self.session.get(PRINCIPAL_SESSION_KEYS[kind])
+
+    def instance(self, kind):
+        """Model object for ``kind`` (one query per request at most), or None."""
+        pk = self.session_id(kind)
+        if not pk:
+            return None
+        key = (kind, pk)
+        if key not in self._instances:
+            self._instances[key] = PRINCIPAL_MODELS[kind].objects.filter(pk=pk).first()
+        return self._instances[key]
+
+    def get(self, kind):
+        """
+        Like ``Model.objects.get(id=<session id>)``.
+
+        Raises:
+            DoesNotExist: If the session has no such account
+        """
+        account = self.instance(kind)
+        if account is None:
+            raise PRINCIPAL_MODELS[kind].DoesNotExist(f"No {kind} in session")
+        return account
+
+    def profile(self, kind):
+        """Cached profile dict for ``kind``, or None when not logged in as that kind."""
+        pk = self.session_id(kind)
+        if not pk:
+            return None
+        key = (kind, pk)
+        if key in self._profiles:
+            return self._profiles[key]
+
+        model = PRINCIPAL_MODELS[kind]
+        cache_key = profile_cache_key(model, pk)
+        profile = cache.get(cache_key)
+        if profile is None:
+            account = self.instance(kind)
+            if account is not None:
+                profile = build_profile(account)
+                cache.set(cache_key, profile, settings.PRINCIPAL_CACHE_TIMEOUT)
+        self._profiles[key] = profile
+        return profile
+
+    @property
+    def resident(self):
+        return self.instance('resident')
+
+    @property
+    def staff(self):
+        return self.instance('staff')
+
+    @property
+    def admin(self):
+        return self.instance('admin')
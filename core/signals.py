@@ -0,0 +1,21 @@
+"""
+Model signal handlers for the core app.
+Registered from CoreConfig.ready().
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.models import User, Admin
+from core.principal_utils import invalidate_profile
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Admin)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Admin)
+def invalidate_principal_profile(sender, instance, raw=False, **kwargs):
+    """Drop the cached principal profile whenever an account changes."""
+    if raw:
+        return
+    invalidate_profile(sender, instance.pk)
@@ -0,0 +1,319 @@
+"""
+Durable SMS delivery through the SMSOutbox table.
+Views only insert outbox rows (inside the transaction that saves the case), so a slow
+or unreachable Semaphore API never blocks a request; the `run_sms_worker` command
+claims due rows, sends them with bounded concurrency, retries failures with
+exponential backoff and dead-letters messages that run out of attempts.
+Duplicate suppression and rate limits (core.sms_throttle_utils) are applied by the
+worker at send time.
+"""
+
+import logging
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core import sms_throttle_utils, sms_util
+from core.models import SMSOutbox, StaffAdmin
+
+logger = logging.getLogger(__name__)
+
+# Why a message was put back without using an attempt (result['deferred'])
+DEFERRAL_REASONS = {
+    'circuit_open': 'SMS gateway circuit is open',
+    'global_rate_limit': 'Global SMS rate limit reached',
+    'recipient_rate_limit': 'Recipient SMS rate limit reached',
+}
+
+
+def clean_recipients(recipients):
+    """Distinct, non-blank phone numbers from a string or iterable, in order."""
+    if isinstance(recipients, str) or recipients is None:
+        recipients = [recipients]
+    cleaned = []
+    for recipient in recipients:
+        recipient = (recipient or '').strip()
+        if recipient and recipient not in cleaned:
+            cleaned.append(recipient)
+    return cleaned
+
+
+def admin_phone_numbers():
+    """Phone numbers of the active admin accounts that receive new-case SMS alerts."""
+    return list(StaffAdmin.objects.filter(is_active=True, role='admin').values_list('phone_number', flat=True))
+
+
+def enqueue_sms(recipients, message, sender_name=None, rate_limit=True):
+    """
+    Queue ``message`` for delivery to every number in ``recipients`` with one INSERT.
+
+    Call it inside the transaction that saves the case the message is about, so the
+    messages are committed (or rolled back) together with it. Nothing else is touched
+    here: duplicates and rate limits are checked by the worker when it sends.
+
+    Args:
+        recipients (str|iterable): Phone number(s); blanks and duplicates are skipped
+        message (str): Message content
+        sender_name (str, optional): Sender name, defaults to the account default
+        rate_limit (bool): Apply the per-recipient rate limit; pass False for emergency
+            alerts (identical messages are still suppressed)
+
+    Returns:
+        list: Created SMSOutbox rows
+
+    Usage:
+        with transaction.atomic():
+            complaint = Complaint.objects.create(...)
+            enqueue_sms([user.phone] + admin_phone_numbers(), message)
+    """
+    now = timezone.now()
+    return SMSOutbox.objects.bulk_create([
+        SMSOutbox(
+            recipient=recipient,
+            message=message,
+            sender_name=sender_name or '',
+            max_attempts=settings.SMS_OUTBOX_MAX_ATTEMPTS,
+            rate_limited=rate_limit,
+            next_attempt_at=now,
+        )
+        for recipient in clean_recipients(recipients)
+    ])
+
+
+def retry_delay(attempts):
+    """Backoff before the next attempt after ``attempts`` failed ones."""
+    seconds = settings.SMS_OUTBOX_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, settings.SMS_OUTBOX_RETRY_MAX_SECONDS))
+
+
+def claim_due_messages(limit, lease_seconds=120, now=None):
+    """
+    Lease up to ``limit`` due messages to the calling worker.
+
+    Due means pending with next_attempt_at in the past, or 'sending' with an expired
+    lease (the worker holding it died mid-batch). The claim is one conditional UPDATE
+    that stamps a fresh token, and only the rows carrying that token are returned, so
+    concurrent workers never pick up the same message.
+
+    Returns:
+        list: SMSOutbox rows, with ``attempts`` already counting this attempt
+    """
+    now = now or timezone.now()
+    due = SMSOutbox.objects.filter(
+        Q(status='pending', next_attempt_at__lte=now) | Q(status='sending', locked_until__lt=now)
+    )
+    ids = list(due.order_by('next_attempt_at', 'pk').values_list('pk', flat=True)[:limit])
+    if not ids:
+        return []
+
+    token = uuid.uuid4().hex
+    due.filter(pk__in=ids).update(
+        status='sending',
+        claim_token=token,
+        locked_until=now + timedelta(seconds=lease_seconds),
+        attempts=F('attempts') + 1,
+    )
+    return list(SMSOutbox.objects.filter(claim_token=token).order_by('next_attempt_at', 'pk'))
+
+
+def group_messages(messages):
+    """Claimed rows split into groups sharing a body and sender name (one bulk request each)."""
+    groups = {}
+    for message in messages:
+        groups.setdefault((message.message, message.sender_name), []).append(message)
+    return list(groups.values())
+
+
+def deliver(group):
+    """
+    Send one group of claimed rows through Semaphore with send_bulk_sms(); never raises.
+
+    Returns:
+        list: {'success', 'message', 'data'} result per row, in order
+    """
+    first = group[0]
+    try:
+        result = sms_util.send_bulk_sms(
+            [message.recipient for message in group], first.message, sender_name=first.sender_name or None,
+        )
+    except Exception as e:
+        return [{'success': False, 'message': f'Unexpected error: {e}', 'data': None}] * len(group)
+
+    sent = set(result['data']['sent'])
+    failed = result['data']['failed']
+    results = []
+    for message in group:
+        number = sms_util.normalize_phone_number(message.recipient)
+        if number in sent:
+            results.append({'success': True, 'message': 'SMS sent successfully', 'data': {'recipient': number}})
+        elif result['data'].get('deferred') and failed.get(number) == 'SMS service unavailable':
+            results.append({
+                'success': False, 'message': failed[number], 'data': None,
+                'deferred': 'circuit_open', 'retry_after': result['data']['retry_after'],
+            })
+        else:
+            results.append({'success': False, 'message': failed.get(number, result['message']), 'data': None})
+    return results
+
+
+def deliver_in_thread(group):
+    """deliver() for pool threads, which must release their own database connections."""
+    try:
+        return deliver(group)
+    finally:
+        connections.close_all()
+
+
+def record_result(message, result, now=None):
+    """
+    Store the outcome of one attempt: sent, rescheduled with backoff, or dead-lettered.
+    Messages deferred by the circuit breaker or a rate limit (result['deferred'], see
+    DEFERRAL_REASONS) are put back for ``retry_after`` seconds and suppressed
+    duplicates are closed, neither using up an attempt.
+
+    The update is conditional on the claim token, so a worker whose lease expired and
+    was re-claimed elsewhere cannot overwrite the newer attempt.
+
+    Returns:
+        str: 'sent', 'retry', 'dead', 'deferred' or 'suppressed'
+    """
+    now = now or timezone.now()
+    if result.get('suppressed'):
+        outcome = 'suppressed'
+        changes = {'status': 'suppressed', 'attempts': F('attempts') - 1, 'last_error': result.get('message', '')}
+    elif result.get('deferred'):
+        outcome = 'deferred'
+        changes = {
+            'status': 'pending',
+            'attempts': F('attempts') - 1,
+            'next_attempt_at': now + timedelta(seconds=result.get('retry_after') or 0),
+            'last_error': result.get('message', ''),
+        }
+    elif result.get('success'):
+        outcome = 'sent'
+        changes = {'status': 'sent', 'sent_at': now, 'last_error': '', 'response_data': result.get('data')}
+    elif message.attempts >= message.max_attempts:
+        outcome = 'dead'
+        changes = {'status': 'dead', 'last_error': result.get('message', ''), 'response_data': result.get('data')}
+        logger.error(f"SMS #{message.pk} to {message.recipient} dead-lettered after {message.attempts} attempts: {changes['last_error']}")
+    else:
+        outcome = 'retry'
+        changes = {
+            'status': 'pending',
+            'next_attempt_at': now + retry_delay(message.attempts),
+            'last_error': result.get('message', ''),
+            'response_data': result.get('data'),
+        }
+
+    SMSOutbox.objects.filter(pk=message.pk, claim_token=message.claim_token).update(
+        locked_until=None, claim_token='', **changes,
+    )
+    return outcome
+
+
+def new_totals():
+    return {'sent': 0, 'retry': 0, 'dead': 0, 'deferred': 0, 'suppressed': 0, 'deferred_reasons': Counter()}
+
+
+def process_batch(messages, concurrency=1):
+    """
+    Deliver claimed messages, at most ``concurrency`` network calls at a time.
+
+    Before sending, messages identical to one another row claimed within
+    SMS_DUPLICATE_WINDOW_SECONDS are suppressed, the global token bucket paces the
+    batch and rate-limited messages wait for their recipient's bucket; paced and
+    rate-limited rows are deferred until the bucket refills.
+
+    Rows with the same body and sender name (e.g. one alert to every admin) go out
+    as a single multi-recipient request. Only the Semaphore requests run in the
+    thread pool; their SMSLogs rows are buffered and inserted once per batch, and
+    results are written back from the calling thread.
+
+    Returns:
+        dict: {'sent', 'retry', 'dead', 'deferred', 'suppressed'} counts and
+              'deferred_reasons' ({DEFERRAL_REASONS key: count})
+    """
+    totals = new_totals()
+    outcomes = []  # (message, result) pairs not sent to Semaphore
+
+    unique = []
+    duplicates = []
+    for message in messages:
+        if sms_throttle_utils.claim_unique(message.recipient, message.message, message.pk):
+            unique.append(message)
+        else:
+            duplicates.append(message)
+    if duplicates:
+        logger.info(f"Suppressed {len(duplicates)} duplicate SMS: {[m.pk for m in duplicates]}")
+        sms_throttle_utils.log_suppressed(duplicates, 'duplicate')
+        outcomes.extend((message, {'suppressed': 'duplicate', 'message': 'Duplicate message'}) for message in duplicates)
+
+    bucket = sms_throttle_utils.global_bucket()
+    groups = []
+    for group in group_messages(unique):
+        granted = bucket.take(len(group))
+        paced = {
+            'success': False, 'message': DEFERRAL_REASONS['global_rate_limit'], 'data': None,
+            'deferred': 'global_rate_limit', 'retry_after': bucket.wait_time(),
+        }
+        outcomes.extend((message, paced) for message in group[granted:])
+
+        admitted = []
+        for message in group[:granted]:
+            recipient_bucket = sms_throttle_utils.recipient_bucket(message.recipient)
+            if not message.rate_limited or recipient_bucket.take():
+                admitted.append(message)
+            else:
+                outcomes.append((message, {
+                    'success': False, 'message': DEFERRAL_REASONS['recipient_rate_limit'], 'data': None,
+                    'deferred': 'recipient_rate_limit', 'retry_after': recipient_bucket.wait_time(),
+                }))
+        if admitted:
+            groups.append(admitted)
+
+    with sms_util.sms_log_buffer():
+        if concurrency > 1 and len(groups) > 1:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results = list(pool.map(deliver_in_thread, groups))
+        else:
+            results = [deliver(group) for group in groups]
+
+    for group, group_results in zip(groups, results):
+        outcomes.extend(zip(group, group_results))
+
+    for message, result in outcomes:
+        outcome = record_result(message, result)
+        totals[outcome] += 1
+        if outcome == 'deferred':
+            totals['deferred_reasons'][result['deferred']] += 1
+        elif outcome == 'dead':
+            # Never delivered, so a later identical message is not a duplicate
+            sms_throttle_utils.release_unique(message.recipient, message.message, message.pk)
+    return totals
+
+
+def drain_outbox(batch_size=50, concurrency=4, lease_seconds=120):
+    """
+    Claim and deliver batches until nothing is due, or until messages are deferred
+    because the gateway circuit breaker is open or the global rate limit is reached.
+    Messages waiting for their recipient's bucket are rescheduled without stopping.
+
+    Returns:
+        dict: Totals over all batches, as returned by process_batch()
+    """
+    totals = new_totals()
+    while True:
+        messages = claim_due_messages(batch_size, lease_seconds)
+        if not messages:
+            return totals
+        batch = process_batch(messages, concurrency)
+        for outcome, count in batch.items():
+            totals[outcome] += count
+        if batch['deferred_reasons'].keys() & {'circuit_open', 'global_rate_limit'}:
+            return totals
@@ -0,0 +1,116 @@
+"""
+SMS throttling backed by the Django cache, applied by the outbox worker at send time
+(never inside the transaction that queues a message, so a rolled-back case leaves
+no cache state behind):
+- identical (recipient, message) pairs inside the duplicate window are suppressed
+  and logged as 'suppressed' in SMSLogs
+- a per-recipient token bucket and a global one put messages back until they refill,
+  so bursts are spread out instead of dropped or hitting Semaphore at once
+"""
+
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core import sms_util
+
+# Serializes read-modify-write of buckets within a process. Several processes on a
+# shared cache can occasionally both take the last token; the limits are approximate.
+_bucket_lock = threading.Lock()
+
+
+class TokenBucket:
+    """
+    Holds up to ``capacity`` tokens and regains ``refill_per_minute`` tokens per minute.
+    State is a (tokens, timestamp) pair in the cache; a missing entry means full.
+    """
+
+    def __init__(self, key, capacity, refill_per_minute):
+        self.key = key
+        self.capacity = capacity
+        self.rate = refill_per_minute / 60
+
+    def current(self, now):
+        tokens, updated = cache.get(self.key) or (self.capacity, now)
+        return min(self.capacity, tokens + (now - updated) * self.rate)
+
+    def take(self, tokens=1, now=None):
+        """
+        Take up to ``tokens`` tokens.
+
+        Returns:
+            int: Number of tokens granted (0 when the bucket is empty)
+        """
+        now = now or time.time()
+        with _bucket_lock:
+            available = self.current(now)
+            granted = min(tokens, int(available))
+            if granted:
+                # Kept until the bucket would be full again, when absence means the same
+                timeout = int((self.capacity - available + granted) / self.rate) + 1 if self.rate else None
+                cache.set(self.key, (available - granted, now), timeout)
+        return granted
+
+    def wait_time(self, now=None):
+        """Seconds until one token is available."""
+        missing = 1 - self.current(now or time.time())
+        if missing <= 0:
+            return 0
+        return missing / self.rate if self.rate else settings.SMS_OUTBOX_RETRY_MAX_SECONDS
+
+
+def recipient_bucket(recipient):
+    return TokenBucket(
+        f'sms:bucket:recipient:{sms_util.normalize_phone_number(recipient)}',
+        settings.SMS_THROTTLE_RECIPIENT_CAPACITY,
+        settings.SMS_THROTTLE_RECIPIENT_PER_MINUTE,
+    )
+
+
+def global_bucket():
+    return TokenBucket(
+        'sms:bucket:global',
+        settings.SMS_THROTTLE_GLOBAL_CAPACITY,
+        settings.SMS_THROTTLE_GLOBAL_PER_MINUTE,
+    )
+
+
+def duplicate_key(recipient, message):
+    digest = hashlib.sha256(message.encode()).hexdigest()[:32]
+    return f'sms:sent:{sms_util.normalize_phone_number(recipient)}:{digest}'
+
+
+def claim_unique(recipient, message, owner):
+    """
+    Claim (recipient, message) for outbox row ``owner`` for the duplicate window.
+
+    Returns:
+        bool: False when another row claimed the same pair inside the window; the
+              owner's own claim passes, so its retries are not duplicates
+    """
+    window = settings.SMS_DUPLICATE_WINDOW_SECONDS
+    if window <= 0:
+        return True
+    key = duplicate_key(recipient, message)
+    return cache.add(key, owner, window) or cache.get(key) == owner
+
+
+def release_unique(recipient, message, owner):
+    """Drop ``owner``'s claim, e.g. once the row is dead-lettered and was never sent."""
+    key = duplicate_key(recipient, message)
+    if cache.get(key) == owner:
+        cache.delete(key)
+
+
+def log_suppressed(messages, reason):
+    """Record suppressed outbox rows in SMSLogs (status 'suppressed') with one INSERT."""
+    sms_util.write_sms_logs([
+        sms_util.build_sms_log(
+            {'suppressed': reason}, sms_util.normalize_phone_number(message.recipient), message.message,
+            message.sender_name or None, status='suppressed',
+        )
+        for message in messages
+    ])
@@ -0,0 +1,197 @@
+"""
+Shared HTTP transport for the Semaphore SMS gateway.
+One pooled requests.Session keeps connections alive between messages, transient
+failures (connection errors, 429/502/503/504) are retried with exponential backoff
+through tenacity, and a circuit breaker stops calling the gateway after repeated
+failures so senders fail fast (and the outbox reschedules) until it recovers.
+"""
+
+import logging
+import threading
+import time
+from functools import lru_cache
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+from tenacity import Retrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+logger = logging.getLogger(__name__)
+
+# Snapshot of the breaker, refreshed on failures and state changes so other processes
+# (e.g. the web server while run_sms_worker sends) can report it with a shared cache
+GATEWAY_STATE_CACHE_KEY = 'sms:gateway_state'
+
+TRANSIENT_STATUS_CODES = {429, 502, 503, 504}
+
+
+class SMSGatewayUnavailable(requests.exceptions.RequestException):
+    """Raised instead of calling Semaphore while the circuit breaker is open."""
+
+    def __init__(self, retry_after):
+        super().__init__(f'SMS gateway unavailable, retry in {retry_after:.0f}s')
+        self.retry_after = retry_after
+
+
+class TransientGatewayError(requests.exceptions.RequestException):
+    """A retryable HTTP status from the gateway."""
+
+    def __init__(self, response):
+        super().__init__(f'Semaphore returned HTTP {response.status_code}', response=response)
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after ``failure_threshold`` consecutive failures; open -> half-open
+    once ``reset_timeout`` seconds pass, letting one trial request through; the trial
+    closes the circuit on success and re-opens it on failure.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.counters = {'requests': 0, 'failures': 0, 'short_circuited': 0, 'opened': 0}
+        self.lock = threading.Lock()
+
+    def retry_after(self):
+        """Seconds until an open circuit lets a trial request through (0 otherwise)."""
+        if self.state != 'open':
+            return 0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def before_request(self):
+        """Admit a request or raise SMSGatewayUnavailable."""
+        with self.lock:
+            if self.state == 'open' and self.retry_after() == 0:
+                self.transition('half_open')
+            if self.state == 'open' or (self.state == 'half_open' and self.trial_in_flight):
+                self.counters['short_circuited'] += 1
+                self.publish()
+                raise SMSGatewayUnavailable(self.retry_after() or self.reset_timeout)
+            if self.state == 'half_open':
+                self.trial_in_flight = True
+            self.counters['requests'] += 1
+
+    def record_success(self):
+        with self.lock:
+            self.consecutive_failures = 0
+            self.trial_in_flight = False
+            if self.state != 'closed':
+                self.transition('closed')
+
+    def record_failure(self):
+        with self.lock:
+            self.counters['failures'] += 1
+            self.consecutive_failures += 1
+            self.trial_in_flight = False
+            if self.state == 'half_open' or self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self.counters['opened'] += 1
+                self.transition('open')
+            else:
+                self.publish()
+
+    def transition(self, state):
+        """Change state (lock held) and publish the new snapshot."""
+        if state != self.state:
+            logger.warning(f"SMS gateway circuit {self.state} -> {state}")
+        self.state = state
+        self.publish()
+
+    def publish(self):
+        cache.set(GATEWAY_STATE_CACHE_KEY, self.snapshot(), None)
+
+    def snapshot(self):
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'retry_after': round(self.retry_after(), 1),
+            'failure_threshold': self.failure_threshold,
+            'reset_timeout': self.reset_timeout,
+            **self.counters,
+        }
+
+
+class SMSTransport:
+    """Pooled, retrying, circuit-broken POSTs to the Semaphore API."""
+
+    def __init__(self, timeout=10, pool_size=10, attempts=3, backoff=0.5, backoff_max=4,
+                 failure_threshold=5, reset_timeout=60):
+        self.timeout = timeout
+        self.attempts = attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def post(self, url, data):
+        """
+        POST ``data`` to ``url`` and return the response.
+
+        Connection failures and 429/502/503/504 are retried; read timeouts are not,
+        since Semaphore may already have accepted the message.
+
+        Raises:
+            SMSGatewayUnavailable: The circuit is open
+            requests.exceptions.RequestException: The request still failed after retries
+        """
+        self.breaker.before_request()
+        retrying = Retrying(
+            stop=stop_after_attempt(self.attempts),
+            wait=wait_exponential(multiplier=self.backoff, max=self.backoff_max),
+            retry=retry_if_exception_type((
+                requests.exceptions.ConnectionError,
+                requests.exceptions.ConnectTimeout,
+                TransientGatewayError,
+            )),
+            reraise=True,
+        )
+        try:
+            response = retrying(self.attempt, url, data)
+        except TransientGatewayError as e:
+            self.breaker.record_failure()
+            return e.response
+        except requests.exceptions.RequestException:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return response
+
+    def attempt(self, url, data):
+        response = self.session.post(url, data=data, timeout=self.timeout)
+        if response.status_code >= 500 or response.status_code in TRANSIENT_STATUS_CODES:
+            raise TransientGatewayError(response)
+        return response
+
+    def state(self):
+        return self.breaker.snapshot()
+
+
+@lru_cache(maxsize=None)
+def get_transport():
+    """The process-wide transport configured from the SMS_HTTP_* / SMS_CIRCUIT_* settings."""
+    return SMSTransport(
+        timeout=settings.SMS_HTTP_TIMEOUT,
+        pool_size=settings.SMS_HTTP_POOL_SIZE,
+        attempts=settings.SMS_HTTP_RETRY_ATTEMPTS,
+        backoff=settings.SMS_HTTP_RETRY_BACKOFF,
+        backoff_max=settings.SMS_HTTP_RETRY_BACKOFF_MAX,
+        failure_threshold=settings.SMS_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=settings.SMS_CIRCUIT_RESET_SECONDS,
+    )
+
+
+def gateway_state():
+    """
+    Breaker snapshot for monitoring: the most recently published one (possibly from
+    the worker process), falling back to this process's transport.
+    """
+    return cache.get(GATEWAY_STATE_CACHE_KEY) or get_transport().state()
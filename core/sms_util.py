@@ -1,21 +1,50 @@
+from contextlib import contextmanager
 from django.conf import settings
 from core.models import SMSLogs
+from core.sms_transport_utils import SMSGatewayUnavailable, get_transport
 from decouple import config
-import requests, logging
+import requests, logging, threading
 
 logger = logging.getLogger(__name__)
 
+# Log rows collected while a sms_log_buffer() block is active
+_log_buffer = None
+_log_buffer_lock = threading.Lock()
+
 # Semaphore SMS API Configuration
 API_ENDPOINT = "https://api.semaphore.co/api/v4/messages"
 API_KEY = config('SEMAPHORE_API_KEY', default='')
 SENDER_NAME = config('SEMAPHORE_SENDER_NAME', default='BARANGAY')
 
+# Numbers Semaphore accepts in one comma-separated `number` field
+MAX_RECIPIENTS_PER_REQUEST = 1000
+
 
 def is_sms_configured():
     """Check if Semaphore SMS is properly configured"""
     return bool(API_KEY and API_KEY != 'your_semaphore_api_key_here')
 
 
+def normalize_phone_number(recipient):
+    """
+    Philippine number in +63 form (e.g. '0917 123-4567' -> '+639171234567').
+
+    Returns:
+        str: Normalized number, or '' when blank
+    """
+    recipient = (recipient or '').strip().replace(' ', '').replace('-', '')
+    if not recipient:
+        return ''
+    if recipient.startswith('0'):
+        return '+63' + recipient[1:]
+    if recipient.startswith('63') and len(recipient) == 12:
+        # Semaphore reports numbers as 639XXXXXXXXX
+        return '+' + recipient
+    if not recipient.startswith('+63'):
+        return '+63' + recipient
+    return recipient
+
+
 # SMS Message Formatting Functions
 def format_complaint_notification(complaint_id, title, status):
     """Format message for complaint status update"""
@@ -68,21 +97,76 @@ def format_otp(otp_code):
     )
 
 
-def sms_logs(response):
-    """Log SMS response details"""
-    log_entry, created = SMSLogs.objects.get_or_create(
-        recipient=response['recipient'],
-        message=response['message'],
-        sender_name=response['sender_name'],
-        status=response['status'],
-        network=response['network'],
-        response_data=response
+def build_sms_log(entry, recipient=None, message=None, sender_name=None, status='Unknown'):
+    """Unsaved SMSLogs row for one Semaphore response entry (arguments fill in missing fields)"""
+    message_id = entry.get('message_id')
+    return SMSLogs(
+        message_id=str(message_id) if message_id not in (None, '') else None,
+        recipient=str(entry.get('recipient') or recipient or '')[:20],
+        message=entry.get('message') or message or '',
+        sender_name=entry.get('sender_name') or sender_name,
+        status=entry.get('status') or status,
+        network=entry.get('network'),
+        response_data=entry,
     )
 
-    if created:
-        return True
-    else:
-        return False
+
+def write_sms_logs(rows):
+    """
+    Append log rows with one INSERT, or add them to the active sms_log_buffer().
+
+    Rows whose Semaphore message id is already logged are skipped, so replaying a
+    response never duplicates history.
+    """
+    with _log_buffer_lock:
+        if _log_buffer is not None:
+            _log_buffer.extend(rows)
+            return
+    if rows:
+        SMSLogs.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+@contextmanager
+def sms_log_buffer():
+    """
+    Collect the SMS log rows written inside the block (from any thread) and insert
+    them with a single bulk_create when it exits.
+
+    Usage:
+        with sms_log_buffer():
+            pool.map(send, batch)
+    """
+    global _log_buffer
+    with _log_buffer_lock:
+        outermost = _log_buffer is None
+        if outermost:
+            _log_buffer = []
+    try:
+        yield
+    finally:
+        if outermost:
+            with _log_buffer_lock:
+                rows, _log_buffer = _log_buffer, None
+            write_sms_logs(rows)
+
+
+def sms_logs(response, recipient=None, message=None, sender_name=None, status='Unknown'):
+    """Log SMS response details (append-only, no lookup of earlier rows)"""
+    write_sms_logs([build_sms_log(response, recipient, message, sender_name, status)])
+    return True
+
+
+def sms_bulk_logs(entries, message, sender_name=None):
+    """
+    Log one SMSLogs row per recipient of a multi-number send with a single INSERT.
+
+    Args:
+        entries (list): Per-recipient dicts from the Semaphore response
+        message (str): Message content (used when an entry omits it)
+        sender_name (str, optional): Sender name (used when an entry omits it)
+    """
+    write_sms_logs([build_sms_log(entry, message=message, sender_name=sender_name) for entry in entries])
+
 
 def format_emergency_alert(message):
     """Format emergency alert message"""
@@ -125,14 +209,8 @@ def send_sms(recipient, message, sender_name=None):
             'data': None
         }
     
-    # Clean phone number (remove spaces, dashes)
-    recipient = recipient.replace(' ', '').replace('-', '')
-    
-    # Ensure Philippine format (+63)
-    if recipient.startswith('0'):
-        recipient = '+63' + recipient[1:]
-    elif not recipient.startswith('+63'):
-        recipient = '+63' + recipient
+    # Clean phone number and ensure Philippine format (+63)
+    recipient = normalize_phone_number(recipient)
     
     # Validate message
     if not message or len(message.strip()) == 0:
@@ -156,12 +234,8 @@ def send_sms(recipient, message, sender_name=None):
         payload['sendername'] = sender_name
     
     try:
-        # Send request to Semaphore API
-        response = requests.post(
-            API_ENDPOINT,
-            data=payload,
-            timeout=10
-        )
+        # Send request to Semaphore API (pooled session with retries and a circuit breaker)
+        response = get_transport().post(API_ENDPOINT, payload)
         
         # Parse response
         response_data = response.json()
@@ -174,7 +248,11 @@ def send_sms(recipient, message, sender_name=None):
             else:
                 response_data = {}
         
-        save_log = sms_logs(response_data)
+        save_log = sms_logs(
+            response_data if isinstance(response_data, dict) else {'response': response_data},
+            recipient, message, sender_name,
+            status='Failed' if response.status_code != 200 else 'Unknown',
+        )
 
         if save_log:
             logger.info("SMS log saved successfully.")
@@ -214,6 +292,15 @@ def send_sms(recipient, message, sender_name=None):
                 'data': response_data
             }
             
+    except SMSGatewayUnavailable as e:
+        logger.warning(f"SMS to {recipient} not attempted: {str(e)}")
+        return {
+            'success': False,
+            'message': 'SMS service unavailable',
+            'data': None,
+            'deferred': True,
+            'retry_after': e.retry_after,
+        }
     except requests.exceptions.Timeout:
         logger.error("SMS send failed: Request timeout")
         return {
@@ -235,3 +322,132 @@ def send_sms(recipient, message, sender_name=None):
             'message': f'Unexpected error: {str(e)}',
             'data': None
         }
+
+
+def send_bulk_sms(recipients, message, sender_name=None, chunk_size=MAX_RECIPIENTS_PER_REQUEST):
+    """
+    Send the same message to many numbers with one Semaphore request per chunk
+
+    Numbers are normalized to +63 form and deduplicated first, then sent as
+    comma-separated lists of at most ``chunk_size`` numbers. Every recipient in the
+    responses gets its own SMSLogs row (one bulk INSERT per chunk).
+
+    Args:
+        recipients (iterable): Phone numbers; blanks and duplicates are skipped
+        message (str): Message content to send
+        sender_name (str, optional): Sender name to display. Defaults to the account default.
+        chunk_size (int): Numbers per request, at most MAX_RECIPIENTS_PER_REQUEST
+
+    Returns:
+        dict: Response with 'success' (bool, every number accepted), 'message' (str) and
+              'data' with 'sent' (list of numbers), 'failed' ({number: error}),
+              'requests' (number of API calls made) and 'deferred'/'retry_after' (set
+              when the gateway circuit breaker is open and numbers were not attempted)
+
+    Example:
+        >>> result = send_bulk_sms(resident_numbers, format_general_notification('Advisory', text))
+        >>> print(f"{len(result['data']['sent'])} sent, {len(result['data']['failed'])} failed")
+    """
+    numbers = list(dict.fromkeys(filter(None, (normalize_phone_number(r) for r in recipients or []))))
+    data = {'sent': [], 'failed': {}, 'requests': 0, 'deferred': False, 'retry_after': 0}
+
+    if not is_sms_configured():
+        logger.warning("Semaphore SMS is not configured. Skipping bulk SMS send.")
+        data['failed'] = dict.fromkeys(numbers, 'SMS service not configured')
+        return {'success': False, 'message': 'SMS service not configured', 'data': data}
+
+    if not numbers:
+        logger.error("Bulk SMS send failed: No recipients provided")
+        return {'success': False, 'message': 'Recipient phone number is required', 'data': data}
+
+    if not message or len(message.strip()) == 0:
+        logger.error("Bulk SMS send failed: Empty message")
+        data['failed'] = dict.fromkeys(numbers, 'Message content is required')
+        return {'success': False, 'message': 'Message content is required', 'data': data}
+
+    chunk_size = max(1, min(chunk_size, MAX_RECIPIENTS_PER_REQUEST))
+    for start in range(0, len(numbers), chunk_size):
+        chunk = numbers[start:start + chunk_size]
+        try:
+            sent, failed = send_sms_chunk(chunk, message, sender_name)
+        except SMSGatewayUnavailable as e:
+            # Circuit open: the remaining chunks are not attempted
+            logger.warning(f"Bulk SMS to {len(numbers) - start} recipients not attempted: {str(e)}")
+            data['failed'].update(dict.fromkeys(numbers[start:], 'SMS service unavailable'))
+            data['deferred'] = True
+            data['retry_after'] = e.retry_after
+            break
+        data['requests'] += 1
+        data['sent'].extend(sent)
+        data['failed'].update(failed)
+
+    if data['failed']:
+        logger.error(f"Bulk SMS: {len(data['sent'])} sent, {len(data['failed'])} failed in {data['requests']} requests")
+    else:
+        logger.info(f"Bulk SMS sent to {len(data['sent'])} recipients in {data['requests']} requests")
+
+    return {
+        'success': not data['failed'],
+        'message': f"SMS sent to {len(data['sent'])} of {len(numbers)} recipients",
+        'data': data,
+    }
+
+
+def send_sms_chunk(numbers, message, sender_name=None):
+    """
+    One Semaphore request for up to MAX_RECIPIENTS_PER_REQUEST normalized numbers.
+
+    Returns:
+        tuple: (list of numbers accepted, {number: error} for the rest)
+
+    Raises:
+        SMSGatewayUnavailable: The circuit breaker is open; nothing was sent
+    """
+    payload = {
+        'apikey': API_KEY,
+        'number': ','.join(numbers),
+        'message': message
+    }
+    if sender_name:
+        payload['sendername'] = sender_name
+
+    try:
+        response = get_transport().post(API_ENDPOINT, payload)
+        response_data = response.json()
+    except SMSGatewayUnavailable:
+        raise
+    except requests.exceptions.Timeout:
+        logger.error(f"Bulk SMS chunk of {len(numbers)} failed: Request timeout")
+        return [], dict.fromkeys(numbers, 'SMS service timeout')
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Bulk SMS chunk of {len(numbers)} failed: {str(e)}")
+        return [], dict.fromkeys(numbers, f'Network error: {str(e)}')
+    except Exception as e:
+        logger.error(f"Unexpected error sending bulk SMS chunk: {str(e)}")
+        return [], dict.fromkeys(numbers, f'Unexpected error: {str(e)}')
+
+    if response.status_code != 200 or not isinstance(response_data, list):
+        if isinstance(response_data, dict) and 'senderName' in response_data:
+            error_msg = f"Invalid Sender Name: {response_data['senderName']}"
+        elif isinstance(response_data, dict):
+            error_msg = response_data.get('message', str(response_data))
+        else:
+            error_msg = str(response_data)
+        logger.error(f"Bulk SMS chunk failed (HTTP {response.status_code}): {error_msg}")
+        return [], dict.fromkeys(numbers, f'Failed to send SMS: {error_msg}')
+
+    entries = [entry for entry in response_data if isinstance(entry, dict)]
+    sms_bulk_logs(entries, message, sender_name)
+
+    # Semaphore returns one entry per number; anything it did not report back was not accepted
+    statuses = {normalize_phone_number(str(entry.get('recipient', ''))): entry.get('status') for entry in entries}
+    sent, failed = [], {}
+    for number in numbers:
+        status = statuses.get(number)
+        if status is None:
+            failed[number] = 'Recipient missing from API response'
+        elif str(status).lower() in ('failed', 'refunded'):
+            failed[number] = f'Semaphore status: {status}'
+        else:
+            sent.append(number)
+    return sent, failed
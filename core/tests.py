@@ -1,3 +1,491 @@
-from django.test import TestCase
+import itertools
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from admins.models import AssistanceRequest, Complaint
+from core import sms_outbox_utils, sms_throttle_utils, sms_transport_utils, sms_util
+from core.models import User, Admin, SMSLogs, SMSOutbox
+from core.principal_utils import RequestPrincipal
+from resident.context_processors import get_current_user
+
+
+class RequestPrincipalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.resident = User.objects.create(
+            first_name='Juan', middle_name='', last_name='Dela Cruz',
+            email='juan@example.com', username='juan', password='x',
+        )
+        self.staff = Admin.objects.create(
+            username='staff0', email='staff0@example.com', password='x',
+            department='Health', position='Officer', first_name='Staff', last_name='Zero',
+        )
+        self.session = SessionStore()
+        self.session.update({'resident_id': self.resident.id, 'staff_id': self.staff.id})
+
+    def test_instance_is_loaded_once_per_request(self):
+        principal = RequestPrincipal(self.session)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(principal.resident, self.resident)
+            self.assertIs(principal.get('resident'), principal.resident)
+            self.assertEqual(principal.staff, self.staff)
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+        self.assertIsNone(principal.admin)
+        with self.assertRaises(Admin.DoesNotExist):
+            principal.get('admin')
+
+    def test_profile_is_cached_across_requests_until_saved(self):
+        self.assertEqual(RequestPrincipal(self.session).profile('resident')['full_name'], 'Juan Dela Cruz')
+
+        with CaptureQueriesContext(connection) as ctx:
+            profile = RequestPrincipal(self.session).profile('resident')
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(profile['role'], 'resident')
+
+        self.resident.first_name = 'Jose'
+        self.resident.save()
+        self.assertEqual(RequestPrincipal(self.session).profile('resident')['first_name'], 'Jose')
+
+    def test_middleware_attaches_principal(self):
+        session = self.client.session
+        session['resident_id'] = self.resident.id
+        session.save()
+        request = self.client.get('/').wsgi_request
+        self.assertEqual(request.principal.resident, self.resident)
+
+    def test_template_user_is_the_resident_instance(self):
+        self.resident.profile_picture = 'uploads/profile_pictures/juan.jpg'
+        self.resident.save()
+        request = mock.Mock(principal=RequestPrincipal(self.session))
+        context = get_current_user(request)
+        self.assertTrue(context['user'].profile_picture.url.endswith('uploads/profile_pictures/juan.jpg'))
+        self.assertEqual(context['user'].get_full_name(), self.resident.get_full_name())
+        self.assertEqual(context['resident_profile']['full_name'], 'Juan Dela Cruz')
+
+
+@override_settings(SMS_OUTBOX_MAX_ATTEMPTS=3, SMS_OUTBOX_RETRY_BASE_SECONDS=30, SMS_OUTBOX_RETRY_MAX_SECONDS=3600)
+class SMSOutboxTests(TestCase):
+    SENT = {'success': True, 'message': 'SMS sent successfully', 'data': {'message_id': 1}}
+
+    def bulk_send(self, error=None):
+        """Patch send_bulk_sms to accept every number, or fail them all with ``error``."""
+        def send_bulk_sms(recipients, message, sender_name=None):
+            numbers = [sms_util.normalize_phone_number(recipient) for recipient in recipients]
+            return {
+                'success': not error,
+                'message': error or 'SMS sent',
+                'data': {'sent': [] if error else numbers, 'failed': dict.fromkeys(numbers, error) if error else {}, 'requests': 1},
+            }
+        return mock.patch('core.sms_util.send_bulk_sms', side_effect=send_bulk_sms)
+
+    def setUp(self):
+        cache.clear()
+        self.resident = User.objects.create(
+            first_name='Juan', middle_name='', last_name='Dela Cruz', phone='09170000001',
+            email='juan@example.com', username='juan', password='x',
+        )
+        self.admin = Admin.objects.create(
+            username='admin0', email='admin0@example.com', password='x', role='admin',
+            phone_number='09170000002', department='Office', position='Captain',
+            first_name='Admin', last_name='Zero',
+        )
+
+    def test_enqueue_skips_blank_and_duplicate_numbers(self):
+        rows = sms_outbox_utils.enqueue_sms(['09171111111', '', None, '09171111111 ', '09172222222'], 'Hello')
+        self.assertEqual([row.recipient for row in rows], ['09171111111', '09172222222'])
+        self.assertTrue(all(row.status == 'pending' and row.max_attempts == 3 for row in rows))
+
+    def test_filing_a_complaint_queues_sms_without_sending(self):
+        session = self.client.session
+        session['resident_id'] = self.resident.id
+        session.save()
+
+        with mock.patch('core.sms_util.send_bulk_sms') as send_bulk_sms:
+            response = self.client.post(reverse('file_emergency_complaint'), {
+                'title': 'Flood', 'description': 'Water rising', 'location': 'Purok 1',
+                'address': 'Babatngon', 'latitude': '11.42', 'longitude': '124.84',
+            })
+
+        self.assertEqual(response.status_code, 302)
+        send_bulk_sms.assert_not_called()
+        complaint = Complaint.objects.get()
+        queued = SMSOutbox.objects.filter(status='pending')
+        self.assertEqual(sorted(queued.values_list('recipient', flat=True)), ['09170000001', '09170000002'])
+        self.assertIn(f'#{complaint.id}', queued.first().message)
+
+    def test_enqueue_failure_does_not_roll_back_the_complaint(self):
+        session = self.client.session
+        session['resident_id'] = self.resident.id
+        session.save()
+
+        with mock.patch('resident.views.resident_complaints.enqueue_sms', side_effect=RuntimeError('outbox down')):
+            with self.assertLogs('resident.views.resident_complaints', 'ERROR'):
+                response = self.client.post(reverse('file_emergency_complaint'), {
+                    'title': 'Flood', 'description': 'Water rising', 'location': 'Purok 1',
+                    'address': 'Babatngon', 'latitude': '11.42', 'longitude': '124.84',
+                })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Complaint.objects.filter(title='Flood').exists())
+        self.assertFalse(SMSOutbox.objects.exists())
+
+    def test_resolved_sms_is_only_queued_if_the_status_change_commits(self):
+        staff = Admin.objects.create(
+            username='staff0', email='staff0@example.com', password='x', role='staff',
+            department='Health', position='Officer', first_name='Staff', last_name='Zero',
+        )
+        complaint = Complaint.objects.create(
+            user=self.resident, title='Flood', description='d', category='Flooding', assigned_to=staff,
+        )
+        session = self.client.session
+        session['staff_id'] = staff.id
+        session.save()
+        url = reverse('staff_update_case_status', args=['complaint', complaint.id])
+
+        with mock.patch.object(Complaint, 'save', side_effect=RuntimeError('database is locked')):
+            self.client.post(url, {'status': 'resolved'})
+        self.assertFalse(SMSOutbox.objects.exists())
+
+        self.client.post(url, {'status': 'resolved'})
+        complaint.refresh_from_db()
+        self.assertEqual(complaint.status, 'resolved')
+        self.assertEqual(list(SMSOutbox.objects.values_list('recipient', flat=True)), ['09170000001'])
+
+    def test_follow_up_survives_an_enqueue_failure(self):
+        assistance = AssistanceRequest.objects.create(
+            user=self.resident, title='Medicine', description='d', type='medical', address='Purok 1',
+        )
+        session = self.client.session
+        session['resident_id'] = self.resident.id
+        session.save()
+
+        with mock.patch('resident.views.resident_assistance.generate_priority', return_value='high'), \
+                mock.patch('resident.views.resident_assistance.enqueue_sms', side_effect=RuntimeError('outbox down')), \
+                self.assertLogs('resident.views.resident_assistance', 'ERROR'):
+            response = self.client.post(
+                reverse('follow_up_assistance', args=[assistance.id]), {'message': 'Any update?'},
+                HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+            )
+
+        self.assertTrue(response.json()['success'])
+        assistance.refresh_from_db()
+        self.assertEqual(assistance.urgency, 'high')
+
+    def test_worker_sends_due_messages(self):
+        sms_outbox_utils.enqueue_sms(['09171111111', '09172222222'], 'Hello')
+        with self.bulk_send() as send_bulk_sms:
+            totals = sms_outbox_utils.drain_outbox(batch_size=1, concurrency=1)
+
+        self.assertEqual(totals, {'sent': 2, 'retry': 0, 'dead': 0, 'deferred': 0, 'suppressed': 0, 'deferred_reasons': {}})
+        self.assertEqual(send_bulk_sms.call_count, 2)
+        self.assertFalse(SMSOutbox.objects.exclude(status='sent').exists())
+        self.assertTrue(all(row.sent_at and row.attempts == 1 for row in SMSOutbox.objects.all()))
+
+    def test_identical_messages_go_out_in_one_request(self):
+        sms_outbox_utils.enqueue_sms(['09171111111', '09172222222'], 'Alert')
+        sms_outbox_utils.enqueue_sms('09173333333', 'Other')
+        with self.bulk_send() as send_bulk_sms:
+            totals = sms_outbox_utils.drain_outbox(concurrency=1)
+
+        self.assertEqual(totals['sent'], 3)
+        self.assertEqual(
+            sorted((call.args[1], len(call.args[0])) for call in send_bulk_sms.call_args_list),
+            [('Alert', 2), ('Other', 1)],
+        )
+
+    def test_failures_back_off_then_dead_letter(self):
+        message, = sms_outbox_utils.enqueue_sms('09171111111', 'Hello')
+
+        with self.bulk_send('SMS service timeout'):
+            self.assertEqual(sms_outbox_utils.drain_outbox(concurrency=1)['retry'], 1)
+            message.refresh_from_db()
+            self.assertEqual((message.status, message.attempts, message.last_error), ('pending', 1, 'SMS service timeout'))
+            self.assertGreater(message.next_attempt_at, timezone.now() + timedelta(seconds=25))
+
+            # Not due yet: nothing is claimed
+            self.assertEqual(sms_outbox_utils.claim_due_messages(10), [])
+
+            for attempt in (2, 3):
+                SMSOutbox.objects.filter(pk=message.pk).update(next_attempt_at=timezone.now())
+                sms_outbox_utils.drain_outbox(concurrency=1)
+
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ('dead', 3))
+        self.assertEqual(sms_outbox_utils.claim_due_messages(10), [])
+
+    def test_expired_lease_is_reclaimed_and_stale_results_are_ignored(self):
+        sms_outbox_utils.enqueue_sms('09171111111', 'Hello')
+        stale, = sms_outbox_utils.claim_due_messages(10, lease_seconds=60)
+        self.assertEqual(sms_outbox_utils.claim_due_messages(10), [])
+
+        later = timezone.now() + timedelta(seconds=61)
+        fresh, = sms_outbox_utils.claim_due_messages(10, now=later)
+        self.assertNotEqual(fresh.claim_token, stale.claim_token)
+        self.assertEqual(fresh.attempts, 2)
+
+        sms_outbox_utils.record_result(stale, self.SENT)
+        self.assertEqual(SMSOutbox.objects.get().status, 'sending')
+        sms_outbox_utils.record_result(fresh, self.SENT)
+        self.assertEqual(SMSOutbox.objects.get().status, 'sent')
+
+    def test_worker_command(self):
+        sms_outbox_utils.enqueue_sms('09171111111', 'Hello')
+        with mock.patch('core.management.commands.run_sms_worker.is_sms_configured', return_value=False):
+            with self.assertRaises(CommandError):
+                call_command('run_sms_worker', '--once')
+
+        with mock.patch('core.management.commands.run_sms_worker.is_sms_configured', return_value=True), \
+                self.bulk_send():
+            call_command('run_sms_worker', '--once', '--concurrency', '1', stdout=mock.MagicMock())
+        self.assertEqual(SMSOutbox.objects.get().status, 'sent')
+
+
+class FakeSemaphoreResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+
+    def json(self):
+        return self.payload
+
+
+@override_settings(SMS_HTTP_RETRY_BACKOFF=0, SMS_CIRCUIT_FAILURE_THRESHOLD=2)
+@mock.patch('core.sms_util.API_KEY', 'test-key')
+class BulkSMSTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        sms_transport_utils.get_transport.cache_clear()
+        self.message_ids = itertools.count(1)
+
+    def semaphore(self, data, timeout=10):
+        """Echo one queued entry per number, like the messages endpoint."""
+        return FakeSemaphoreResponse([
+            {'message_id': next(self.message_ids), 'recipient': number.lstrip('+'), 'message': data['message'],
+             'sender_name': 'BARANGAY', 'network': 'Globe', 'status': 'Pending'}
+            for number in data['number'].split(',')
+        ])
+
+    def test_numbers_are_normalized_deduplicated_and_chunked(self):
+        with mock.patch('requests.Session.post', side_effect=lambda url, data, timeout: self.semaphore(data)) as post:
+            with CaptureQueriesContext(connection) as ctx:
+                result = sms_util.send_bulk_sms(
+                    ['0917 111-1111', '+639171111111', '', '9172222222', '639173333333'], 'Advisory', chunk_size=2,
+                )
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['data']['requests'], 2)
+        self.assertEqual([call.kwargs['data']['number'] for call in post.call_args_list],
+                         ['+639171111111,+639172222222', '+639173333333'])
+        self.assertEqual(sorted(result['data']['sent']), ['+639171111111', '+639172222222', '+639173333333'])
+        # One bulk INSERT of per-recipient logs per chunk
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertEqual(SMSLogs.objects.count(), 3)
+
+    def test_failed_chunk_reports_every_number(self):
+        with mock.patch('requests.Session.post', side_effect=sms_util.requests.exceptions.Timeout):
+            result = sms_util.send_bulk_sms(['09171111111', '09172222222'], 'Advisory')
+
+        self.assertFalse(result['success'])
+        self.assertEqual(result['data']['failed'], {
+            '+639171111111': 'SMS service timeout', '+639172222222': 'SMS service timeout',
+        })
+        self.assertFalse(SMSLogs.objects.exists())
+
+    def test_transient_errors_are_retried_on_one_pooled_session(self):
+        responses = [FakeSemaphoreResponse({'message': 'Bad gateway'}, 502), sms_util.requests.exceptions.ConnectionError()]
+
+        def post(url, data, timeout):
+            if responses:
+                response = responses.pop(0)
+                if isinstance(response, Exception):
+                    raise response
+                return response
+            return self.semaphore(data)
+
+        with mock.patch('requests.Session.post', side_effect=post) as session_post:
+            self.assertTrue(sms_util.send_sms('09171111111', 'Hello')['success'])
+            self.assertTrue(sms_util.send_sms('09172222222', 'Hello')['success'])
+
+        self.assertEqual(session_post.call_count, 4)
+        self.assertEqual(sms_transport_utils.gateway_state()['state'], 'closed')
+
+    def test_circuit_opens_fails_fast_and_recovers(self):
+        with mock.patch('requests.Session.post', side_effect=sms_util.requests.exceptions.ConnectionError) as session_post:
+            sms_util.send_sms('09171111111', 'Hello')
+            sms_util.send_sms('09171111111', 'Hello')
+            calls = session_post.call_count
+            result = sms_util.send_sms('09171111111', 'Hello')
+            bulk = sms_util.send_bulk_sms(['09171111111', '09172222222'], 'Hello')
+
+        self.assertEqual(session_post.call_count, calls)
+        self.assertTrue(result['deferred'])
+        self.assertTrue(bulk['data']['deferred'])
+        self.assertEqual(len(bulk['data']['failed']), 2)
+        state = sms_transport_utils.gateway_state()
+        self.assertEqual((state['state'], state['short_circuited']), ('open', 2))
+
+        # After the reset period one trial request goes through and closes the circuit
+        sms_transport_utils.get_transport().breaker.opened_at -= 61
+        with mock.patch('requests.Session.post', side_effect=lambda url, data, timeout: self.semaphore(data)):
+            self.assertTrue(sms_util.send_sms('09171111111', 'Hello')['success'])
+        self.assertEqual(sms_transport_utils.gateway_state()['state'], 'closed')
+
+    def test_outbox_defers_without_using_attempts_while_circuit_is_open(self):
+        message, = sms_outbox_utils.enqueue_sms('09171111111', 'Hello')
+        breaker = sms_transport_utils.get_transport().breaker
+        breaker.record_failure()
+        breaker.record_failure()
+
+        with mock.patch('requests.Session.post') as session_post:
+            totals = sms_outbox_utils.drain_outbox(concurrency=1)
+
+        session_post.assert_not_called()
+        self.assertEqual(totals['deferred'], 1)
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ('pending', 0))
+        self.assertGreater(message.next_attempt_at, timezone.now() + timedelta(seconds=50))
+
+    def test_gateway_status_endpoint(self):
+        self.assertEqual(self.client.get(reverse('admin_sms_gateway_status')).status_code, 403)
+        admin = Admin.objects.create(
+            username='admin0', email='admin0@example.com', password='x', role='admin',
+            department='Office', position='Captain', first_name='Admin', last_name='Zero',
+        )
+        sms_outbox_utils.enqueue_sms('09171111111', 'Hello')
+        session = self.client.session
+        session.update({'admin_id': admin.id, 'admin_role': 'admin'})
+        session.save()
+
+        payload = self.client.get(reverse('admin_sms_gateway_status')).json()
+        self.assertEqual(payload['gateway']['state'], 'closed')
+        self.assertEqual(payload['outbox'], {'pending': 1, 'sending': 0, 'sent': 0, 'suppressed': 0, 'dead': 0})
+
+
+class SMSLogWriterTests(TestCase):
+    def entry(self, message_id, recipient='639171111111'):
+        return {'message_id': message_id, 'recipient': recipient, 'message': 'Hello',
+                'sender_name': 'BARANGAY', 'network': 'Globe', 'status': 'Pending'}
+
+    def test_logging_is_a_single_insert_and_idempotent_on_message_id(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(sms_util.sms_logs(self.entry(101)))
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertTrue(ctx.captured_queries[0]['sql'].startswith('INSERT'))
+
+        sms_util.sms_logs(self.entry(101))
+        sms_util.sms_logs({'message': 'Failed to send'}, '+639172222222', 'Hello', status='Failed')
+        sms_util.sms_logs({'message': 'Failed to send'}, '+639172222222', 'Hello', status='Failed')
+
+        self.assertEqual(SMSLogs.objects.filter(message_id='101').count(), 1)
+        self.assertEqual(SMSLogs.objects.filter(message_id__isnull=True, status='Failed').count(), 2)
+
+    def test_buffer_flushes_once_at_the_end(self):
+        with CaptureQueriesContext(connection) as ctx:
+            with sms_util.sms_log_buffer():
+                sms_util.sms_logs(self.entry(1))
+                with sms_util.sms_log_buffer():
+                    sms_util.sms_bulk_logs([self.entry(2), self.entry(3, '639172222222')], 'Hello')
+                self.assertFalse(SMSLogs.objects.exists())
+
+        self.assertEqual(SMSLogs.objects.count(), 3)
+        self.assertEqual(sum(query['sql'].startswith('INSERT') for query in ctx.captured_queries), 1)
+
+
+@override_settings(
+    SMS_DUPLICATE_WINDOW_SECONDS=600,
+    SMS_THROTTLE_RECIPIENT_CAPACITY=2, SMS_THROTTLE_RECIPIENT_PER_MINUTE=1,
+    SMS_THROTTLE_GLOBAL_CAPACITY=100, SMS_THROTTLE_GLOBAL_PER_MINUTE=60,
+)
+class SMSThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def send(self):
+        def send_bulk_sms(recipients, message, sender_name=None):
+            numbers = [sms_util.normalize_phone_number(recipient) for recipient in recipients]
+            return {'success': True, 'message': 'SMS sent', 'data': {'sent': numbers, 'failed': {}, 'requests': 1}}
+        return mock.patch('core.sms_util.send_bulk_sms', side_effect=send_bulk_sms)
+
+    def test_identical_messages_are_suppressed_and_logged_at_send_time(self):
+        sms_outbox_utils.enqueue_sms(['09171111111', '09172222222'], 'Follow-up #1')
+        # Same text, number written differently
+        sms_outbox_utils.enqueue_sms(['+639171111111', '09173333333'], 'Follow-up #1')
+        self.assertEqual(SMSOutbox.objects.count(), 4)
+
+        with self.send():
+            totals = sms_outbox_utils.drain_outbox(concurrency=1)
+
+        self.assertEqual((totals['sent'], totals['suppressed']), (3, 1))
+        duplicate = SMSOutbox.objects.get(status='suppressed')
+        self.assertEqual((duplicate.recipient, duplicate.attempts), ('+639171111111', 0))
+        log = SMSLogs.objects.get(status='suppressed')
+        self.assertEqual((log.recipient, log.response_data), ('+639171111111', {'suppressed': 'duplicate'}))
+
+    def test_rolled_back_filing_leaves_no_throttle_state(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            sms_outbox_utils.enqueue_sms('09171111111', 'Complaint #1 received')
+            raise RuntimeError('filing failed')
+
+        # The retried filing's message is neither a duplicate nor rate-limited
+        sms_outbox_utils.enqueue_sms('09171111111', 'Complaint #1 received')
+        with self.send():
+            self.assertEqual(sms_outbox_utils.drain_outbox(concurrency=1)['sent'], 1)
+
+    def test_recipient_bucket_defers_bursts_unless_disabled(self):
+        for i in range(3):
+            sms_outbox_utils.enqueue_sms('09171111111', f'Follow-up {i}')
+        sms_outbox_utils.enqueue_sms('09171111111', 'Emergency', rate_limit=False)
+
+        with self.send():
+            totals = sms_outbox_utils.drain_outbox(concurrency=1)
+
+        # Over the limit means later, not never; emergencies bypass the bucket
+        self.assertEqual((totals['sent'], totals['deferred']), (3, 1))
+        self.assertEqual(totals['deferred_reasons'], {'recipient_rate_limit': 1})
+        waiting = SMSOutbox.objects.get(status='pending')
+        self.assertEqual((waiting.message, waiting.attempts), ('Follow-up 2', 0))
+        self.assertGreater(waiting.next_attempt_at, timezone.now() + timedelta(seconds=50))
+
+    def test_worker_logs_the_deferral_reason(self):
+        for i in range(3):
+            sms_outbox_utils.enqueue_sms('09172222222', f'Update {i}')
+
+        out = StringIO()
+        with self.send(), mock.patch('core.management.commands.run_sms_worker.is_sms_configured', return_value=True):
+            call_command('run_sms_worker', '--once', '--concurrency', '1', stdout=out)
+        self.assertIn('Recipient SMS rate limit reached; 1 deferred.', out.getvalue())
+        self.assertNotIn('circuit', out.getvalue())
+
+    def test_bucket_refills_over_time(self):
+        bucket = sms_throttle_utils.TokenBucket('sms:bucket:test', capacity=2, refill_per_minute=60)
+        self.assertEqual(bucket.take(3, now=1000), 2)
+        self.assertEqual(bucket.take(now=1000.5), 0)
+        self.assertAlmostEqual(bucket.wait_time(now=1000.5), 0.5)
+        self.assertEqual(bucket.take(now=1001), 1)
+
+    @override_settings(SMS_THROTTLE_GLOBAL_CAPACITY=1, SMS_THROTTLE_GLOBAL_PER_MINUTE=6)
+    def test_global_bucket_paces_the_worker(self):
+        sms_outbox_utils.enqueue_sms(['09171111111', '09172222222'], 'Advisory')
+        with mock.patch('core.sms_util.send_bulk_sms', return_value={
+            'success': True, 'message': 'SMS sent', 'data': {'sent': ['+639171111111'], 'failed': {}, 'requests': 1},
+        }) as send_bulk_sms:
+            totals = sms_outbox_utils.drain_outbox(concurrency=1)
+
+        self.assertEqual((totals['sent'], totals['deferred']), (1, 1))
+        self.assertEqual(totals['deferred_reasons'], {'global_rate_limit': 1})
+        self.assertEqual(send_bulk_sms.call_args.args[0], ['09171111111'])
+        paced = SMSOutbox.objects.get(status='pending')
+        self.assertEqual(paced.attempts, 0)
+        self.assertGreater(paced.next_attempt_at, timezone.now() + timedelta(seconds=5))
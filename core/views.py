@@ -5,7 +5,8 @@ from django.shortcuts import redirect
 from django.db import IntegrityError
 from django.db.models import Avg, Count
 from .models import User, Feedback
-from admins.models import Complaint, AssistanceRequest
+from admins.case_stats_utils import case_stats, sum_counts
+from admins.cache_utils import cached_context
 import sweetify
 from admins.user_activity_utils import log_activity, log_login_attempt
 
@@ -205,14 +206,10 @@ def login(request):
 
 def index(request):
     # Calculate real statistics from database
-    issues_resolved = Complaint.objects.filter(status='resolved').count() + \
-                     AssistanceRequest.objects.filter(status='resolved').count()
-    active_citizens = User.objects.filter(is_verified=True, is_archived=False).count()
-    
-    context = {
-        'issues_resolved': issues_resolved,
-        'active_citizens': active_citizens,
-    }
+    context = cached_context('homepage_stats', lambda: {
+        'issues_resolved': sum_counts(case_stats(status='resolved')),
+        'active_citizens': User.objects.filter(is_verified=True, is_archived=False).count(),
+    })
     
     return render(request, 'index.html', context)
 
@@ -342,18 +339,12 @@ def feedback(request):
     
     # GET request - display form with statistics
     # Calculate statistics for display
-    total_feedback = Feedback.objects.count()
-    average_rating = Feedback.objects.aggregate(Avg('rating'))['rating__avg'] or 0
-    active_users = User.objects.filter(is_verified=True, is_archived=False).count()
-    resolved_cases = Complaint.objects.filter(status='resolved').count() + \
-                    AssistanceRequest.objects.filter(status='resolved').count()
-    
-    context = {
-        'total_feedback': total_feedback,
-        'average_rating': average_rating,
-        'active_users': active_users,
-        'resolved_cases': resolved_cases,
-    }
+    context = cached_context('feedback_stats', lambda: {
+        'total_feedback': Feedback.objects.count(),
+        'average_rating': Feedback.objects.aggregate(Avg('rating'))['rating__avg'] or 0,
+        'active_users': User.objects.filter(is_verified=True, is_archived=False).count(),
+        'resolved_cases': sum_counts(case_stats(status='resolved')),
+    })
     
     return render(request, 'feedback.html', context)
 
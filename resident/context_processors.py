@@ -1,13 +1,17 @@
+from django.utils.functional import SimpleLazyObject
+
+
 def get_current_user(request):
-    from core.models import User
-    
-    user_id = request.session.get('id')
-    if user_id:
-        try:
-            user = User.objects.get(id=user_id)
-            return {'user': user}
-        except User.DoesNotExist:
-            pass
+    # `user` is the resident's User instance (templates read user.profile_picture.url and
+    # user.get_full_name), loaded lazily through request.principal so pages that never
+    # touch it skip the query; the cached profile dict is `resident_profile`
+    principal = getattr(request, 'principal', None)
+    profile = principal.profile('resident') if principal else None
+    if profile:
+        return {
+            'user': SimpleLazyObject(lambda: principal.resident),
+            'resident_profile': profile,
+        }
     
     # Fallback to session data if user not found in database
     user_info = {
@@ -35,3 +39,12 @@ def get_admin_info(request):
     }
     return {'admin': admin_info}
 
+
+def resident_notifications(request):
+    """Unread notification count for the resident navigation badge."""
+    from admins.notification_counter_utils import unread_notification_count
+    from core.models import User
+
+    return {
+        'resident_unread_notifications': unread_notification_count(User, request.session.get('resident_id')),
+    }
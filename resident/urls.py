@@ -9,6 +9,7 @@ from resident.views import (
     resident_help_center,
     resident_sms,
 )
+from admins.views import notification_stream
 # Nc8Kfh6y94Vn5?+
 urlpatterns = [
     # Resident Dashboard
@@ -44,6 +45,8 @@ urlpatterns = [
 
     # Notifications
     path('notifications/', resident_notifications.notifications, name='notifications'),
+    path('notifications/more/', resident_notifications.resident_notifications_more, name='resident_notifications_more'),
+    path('notifications/stream/', notification_stream.notification_stream, {'kind': 'resident'}, name='resident_notification_stream'),
     path('notifications/details/<int:notification_id>/', resident_notifications.resident_notification_details, name='resident_notification_details'),
     path('notifications/mark-as-read/<int:notification_id>/', resident_notifications.resident_mark_notification_read, name='mark_notification_as_read'),
     path('notifications/archive/<int:notification_id>/', resident_notifications.resident_archive_notification, name='mark_notification_as_archived'),
@@ -18,7 +18,7 @@ def community_forum(request):
         return redirect('homepage')
     
     user_id = request.session.get('resident_id')
-    user = User.objects.filter(id=user_id).first()
+    user = request.principal.resident
     
     # Get filter parameters
     category = request.GET.get('category', '')
@@ -71,7 +71,7 @@ def create_post(request):
     
     if request.method == 'POST':
         user_id = request.session.get('resident_id')
-        user = User.objects.filter(id=user_id).first()
+        user = request.principal.resident
         
         title = request.POST.get('title', '').strip()
         content = request.POST.get('content', '').strip()
@@ -116,7 +116,7 @@ def toggle_reaction(request, post_id):
     
     if request.method == 'POST':
         user_id = request.session.get('resident_id')
-        user = User.objects.filter(id=user_id).first()
+        user = request.principal.resident
         post = get_object_or_404(ForumPost, id=post_id, is_active=True)
         reaction_type = request.POST.get('reaction_type', 'like')
         
@@ -168,7 +168,7 @@ def add_comment(request, post_id):
     
     if request.method == 'POST':
         user_id = request.session.get('resident_id')
-        user = User.objects.filter(id=user_id).first()
+        user = request.principal.resident
         post = get_object_or_404(ForumPost, id=post_id, is_active=True)
         content = request.POST.get('content', '').strip()
         
@@ -207,7 +207,7 @@ def delete_post(request, post_id):
         return JsonResponse({'success': False, 'message': 'You must be logged in.'})
     
     user_id = request.session.get('resident_id')
-    user = User.objects.filter(id=user_id).first()
+    user = request.principal.resident
     post = get_object_or_404(ForumPost, id=post_id, author=user)
     
     try:
@@ -234,7 +234,7 @@ def edit_post(request, post_id):
         return JsonResponse({'success': False, 'message': 'You must be logged in.'})
     
     user_id = request.session.get('resident_id')
-    user = User.objects.filter(id=user_id).first()
+    user = request.principal.resident
     post = get_object_or_404(ForumPost, id=post_id, author=user, is_active=True)
     
     if request.method == 'POST':
@@ -302,7 +302,7 @@ def delete_comment(request, comment_id):
         return JsonResponse({'success': False, 'message': 'You must be logged in.'})
     
     user_id = request.session.get('resident_id')
-    user = User.objects.filter(id=user_id).first()
+    user = request.principal.resident
     comment = get_object_or_404(PostComment, id=comment_id, author=user)
     
     try:
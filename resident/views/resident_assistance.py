@@ -1,3 +1,4 @@
+from django.db import transaction
 from django.shortcuts import redirect, get_object_or_404, render
 from core.models import User
 from django.http import JsonResponse
@@ -6,10 +7,13 @@ from admins.models import AssistanceRequest, AssistanceAttachment
 from admins.notification_utils import notify_new_case_filed
 from resident.automate_priority import generate_priority, prompt_details
 from admins.user_activity_utils import log_case_activity, log_activity
-from core.sms_util import send_sms, format_emergency_alert, format_assistance_notification, follow_up_request
-from core.models import StaffAdmin
+from core.sms_outbox_utils import admin_phone_numbers, enqueue_sms
+from core.sms_util import format_emergency_alert, format_assistance_notification, follow_up_request
+import logging
 import sweetify
 
+logger = logging.getLogger(__name__)
+
 
 # Emergency Assistance View
 def file_emergency_assistance(request):
@@ -26,7 +30,7 @@ def file_emergency_assistance(request):
         latitude = request.POST.get('latitude', '').strip()
         longitude = request.POST.get('longitude', '').strip()
         user_id = request.session.get('resident_id')
-        user = User.objects.filter(id=user_id).first()
+        user = request.principal.resident
         
         # Validate required fields
         if not all([title, description, address, latitude, longitude]):
@@ -41,34 +45,35 @@ def file_emergency_assistance(request):
             sweetify.error(request, 'Invalid coordinates. Please pin a location on the map.', persistent=True, timer=3000)
             return render(request, 'emergency_assistance.html')
 
-        # Create the emergency assistance request
-        assistance = AssistanceRequest.objects.create(
-            user=user,
-            title=title,
-            description=description,
-            type=type_,
-            urgency=urgency,
-            address=address,
-            latitude=lat_float,
-            longitude=lng_float
-        )
-
-        emergency_formatted_message = format_emergency_alert(
-            f"Emergency Message Received:\n\n"
-            f"Emergency Assistance Request #{assistance.id} filed by {user.get_full_name()}\n"
-            f"Subject: {assistance.title}\n"
-            f"Description: {assistance.description}\n"
-            f"Location: {assistance.address}\n"
-            f"Priority: URGENT"
-        )
-
-
-        if user.phone is not None or user.phone != '':
-            send_sms(user.phone, emergency_formatted_message)
+        # Create the emergency assistance request and queue the SMS alerts in the same
+        # transaction; the run_sms_worker command delivers them, so the submit never waits on Semaphore
+        with transaction.atomic():
+            assistance = AssistanceRequest.objects.create(
+                user=user,
+                title=title,
+                description=description,
+                type=type_,
+                urgency=urgency,
+                address=address,
+                latitude=lat_float,
+                longitude=lng_float
+            )
 
-        admins = StaffAdmin.objects.filter(is_active=True, role="admin")
+            emergency_formatted_message = format_emergency_alert(
+                f"Emergency Message Received:\n\n"
+                f"Emergency Assistance Request #{assistance.id} filed by {user.get_full_name()}\n"
+                f"Subject: {assistance.title}\n"
+                f"Description: {assistance.description}\n"
+                f"Location: {assistance.address}\n"
+                f"Priority: URGENT"
+            )
+            try:
+                with transaction.atomic():
+                    enqueue_sms(user.phone, emergency_formatted_message, rate_limit=False)
+            except Exception:
+                # Only the savepoint rolls back; the assistance request is still filed without its SMS
+                logger.exception(f"Could not queue SMS for assistance request #{assistance.id}")
 
-        for admin in admins:
             admin_message = format_emergency_alert(
                 f"New Emergency Assistance Request #{assistance.id} filed by {user.get_full_name()}\n"
                 f"Subject: {assistance.title}\n"
@@ -76,12 +81,15 @@ def file_emergency_assistance(request):
                 f"Location: {assistance.address}\n"
                 f"Priority: URGENT"
             )
-            
-            if admin.phone_number is not None or admin.phone_number != '':
-                send_sms(admin.phone_number, admin_message)
+            try:
+                with transaction.atomic():
+                    enqueue_sms(admin_phone_numbers(), admin_message, rate_limit=False)
+            except Exception:
+                # Only the savepoint rolls back; the assistance request is still filed without its SMS
+                logger.exception(f"Could not queue SMS for assistance request #{assistance.id}")
 
         try:
-            notify_new_case_filed(assistance)  # Notifies all active admins
+            notify_new_case_filed(assistance)  # Notifies admins and the staff routed to this category
         except Exception as e:
             # Log the error but do not interrupt the user flow
             pass
@@ -122,7 +130,7 @@ def file_assistance(request):
         latitude = request.POST.get('latitude', '').strip()
         longitude = request.POST.get('longitude', '').strip()
         user_id = request.session.get('resident_id')
-        user = User.objects.filter(id=user_id).first()
+        user = request.principal.resident
         
         # Validate required fields
         if not all([title, description, type_]):
@@ -155,32 +163,33 @@ def file_assistance(request):
         details = prompt_details(assistance_details)
         priority = generate_priority(details).lower()
 
-        assistance = AssistanceRequest.objects.create(
-            user=user,
-            title=title,
-            description=description,
-            type=final_type,
-            urgency=priority,
-            address=address,
-            latitude=lat_float,
-            longitude=lng_float
-        )
-
-        assistance_details = format_assistance_notification(
-            assistance_id=assistance.id,
-            title=assistance.title,
-            status=assistance.status.replace('_', ' ')
-        )
-
-        if user.phone is not None or user.phone != '':
-            send_sms(user.phone, assistance_details)
+        # The SMS alerts are queued with the request and sent by the run_sms_worker command
+        with transaction.atomic():
+            assistance = AssistanceRequest.objects.create(
+                user=user,
+                title=title,
+                description=description,
+                type=final_type,
+                urgency=priority,
+                address=address,
+                latitude=lat_float,
+                longitude=lng_float
+            )
 
-        for admin in StaffAdmin.objects.filter(is_active=True, role="admin"):
-            if admin.phone_number is not None or admin.phone_number != '':
-                send_sms(admin.phone_number, assistance_details)
+            assistance_details = format_assistance_notification(
+                assistance_id=assistance.id,
+                title=assistance.title,
+                status=assistance.status.replace('_', ' ')
+            )
+            try:
+                with transaction.atomic():
+                    enqueue_sms([user.phone] + admin_phone_numbers(), assistance_details)
+            except Exception:
+                # Only the savepoint rolls back; the assistance request is still filed without its SMS
+                logger.exception(f"Could not queue SMS for assistance request #{assistance.id}")
 
         try:
-            notify_new_case_filed(assistance)  # Notifies all active admins
+            notify_new_case_filed(assistance)  # Notifies admins and the staff routed to this category
         except Exception as e:
             sweetify.error(request, 'There was an error notifying admins. Please try again later.', persistent=True, timer=3000)
 
@@ -210,7 +219,7 @@ def my_assistance(request):
         return redirect('homepage')
     
     user_id = request.session.get('resident_id')
-    user = User.objects.filter(id=user_id).first()
+    user = request.principal.resident
     
     # Get all assistance requests for the user
     assistance_list = AssistanceRequest.objects.filter(user=user).order_by('-created_at')
@@ -268,7 +277,7 @@ def assistance_detail(request, pk):
         sweetify.error(request, 'Action not allowed.', persistent="Okay", timer=3000)
         return redirect('homepage')
     
-    user = User.objects.filter(id=user_id).first()
+    user = request.principal.resident
     assistance = get_object_or_404(AssistanceRequest, pk=pk, user=user)
     attachments = AssistanceAttachment.objects.filter(assistance=assistance)
     
@@ -354,7 +363,7 @@ def update_assistance(request, pk):
             assistance.save()
 
             # Log activity
-            user = User.objects.filter(id=user_id).first()
+            user = request.principal.resident
             log_case_activity(
                 user=user,
                 case=assistance,
@@ -370,7 +379,7 @@ def update_assistance(request, pk):
 
 
         except Exception as e:
-            user = User.objects.filter(id=user_id).first()
+            user = request.principal.resident
             if user:
                 log_activity(
                     user=user,
@@ -423,7 +432,7 @@ def delete_assistance(request, pk):
         return redirect('homepage')
     
     assistance = get_object_or_404(AssistanceRequest, pk=pk, user_id=user_id)
-    user = User.objects.filter(id=user_id).first()
+    user = request.principal.resident
     
     # Store info before deletion
     assistance_title = assistance.title
@@ -454,7 +463,7 @@ def follow_up_assistance(request, assistance_id):
         return redirect('homepage')
     
     user_id = request.session.get('resident_id')
-    user = User.objects.filter(id=user_id).first()
+    user = request.principal.resident
     assistance = get_object_or_404(AssistanceRequest, id=assistance_id, user=user)
     
     if request.method == 'POST':
@@ -480,31 +489,36 @@ def follow_up_assistance(request, assistance_id):
         
         try:
             
-            # Use the unified notification system to notify all admins
-            notifications = Notification.notify_admins(
-                sender=user,
-                title=f'Follow-up on Assistance Request #{assistance.id}: {assistance.title}',
-                message=f'Resident {user.get_full_name()} has sent a follow-up message:\n\n{message}\n\nAssistance Request Details:\n- Title: {assistance.title}\n- Type: {assistance.type}\n- Status: {assistance.status.replace("_", " ").title()}\n- Urgency: {assistance.urgency.title()}\n- Filed: {assistance.created_at.strftime("%B %d, %Y at %I:%M %p")}',
-                notification_type='new_assistance',
-                action_type='commented',
-                priority=priority,
-                related_assistance=assistance
-            )
+            # The notifications, the new urgency and the admins' SMS are saved together;
+            # a failed enqueue only rolls back its savepoint, so the follow-up still counts
+            with transaction.atomic():
+                # Use the unified notification system to notify all admins
+                notifications = Notification.notify_admins(
+                    sender=user,
+                    title=f'Follow-up on Assistance Request #{assistance.id}: {assistance.title}',
+                    message=f'Resident {user.get_full_name()} has sent a follow-up message:\n\n{message}\n\nAssistance Request Details:\n- Title: {assistance.title}\n- Type: {assistance.type}\n- Status: {assistance.status.replace("_", " ").title()}\n- Urgency: {assistance.urgency.title()}\n- Filed: {assistance.created_at.strftime("%B %d, %Y at %I:%M %p")}',
+                    notification_type='new_assistance',
+                    action_type='commented',
+                    priority=priority,
+                    related_assistance=assistance
+                )
 
-            notifications_created = len(notifications)
+                notifications_created = len(notifications)
 
-            assistance.urgency = priority
-            assistance.save()    
+                assistance.urgency = priority
+                assistance.save()
 
-            message_format = follow_up_request(
-                case_id=assistance.id,
-                subject=assistance.title,
-                status=assistance.status.replace('_', ' ').title()
-            )
+                message_format = follow_up_request(
+                    case_id=assistance.id,
+                    subject=assistance.title,
+                    status=assistance.status.replace('_', ' ').title()
+                )
+                try:
+                    with transaction.atomic():
+                        enqueue_sms(admin_phone_numbers(), message_format)
+                except Exception:
+                    logger.exception(f"Could not queue follow-up SMS for assistance request #{assistance.id}")
 
-            for admin in StaffAdmin.objects.filter(is_active=True, role="admin"):
-                if admin.phone_number is not None or admin.phone_number != '':
-                    send_sms(admin.phone_number, message_format)
             # Log activity
             log_case_activity(
                 user=user,
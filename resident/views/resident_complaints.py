@@ -1,13 +1,18 @@
-from core.models import User, StaffAdmin
+from core.models import User
+from django.db import transaction
 from django.http import JsonResponse
 from admins.models import Complaint, ComplaintAttachment, Notification
 from admins.notification_utils import notify_new_case_filed
 from django.shortcuts import redirect, get_object_or_404, render
 from resident.automate_priority import generate_priority, prompt_details
-from core.sms_util import send_sms, format_complaint_notification, format_emergency_alert, follow_up_request
+from core.sms_outbox_utils import admin_phone_numbers, enqueue_sms
+from core.sms_util import format_complaint_notification, format_emergency_alert, follow_up_request
 from admins.user_activity_utils import log_case_activity, log_activity
+import logging
 import os, sweetify
 
+logger = logging.getLogger(__name__)
+
 # Emergency Complaint View
 def file_emergency_complaint(request):
     if not request.session.get('resident_id'):
@@ -24,7 +29,7 @@ def file_emergency_complaint(request):
         latitude = request.POST.get('latitude', '').strip()
         longitude = request.POST.get('longitude', '').strip()
         user_id = request.session.get('resident_id')
-        user = User.objects.filter(id=user_id).first()
+        user = request.principal.resident
         
         # Validate required fields
         if not all([title, description, location_description, address, latitude, longitude]):
@@ -39,27 +44,21 @@ def file_emergency_complaint(request):
             sweetify.error(request, 'Invalid coordinates. Please pin a location on the map.', persistent=True, timer=3000)
             return render(request, 'emergency_complaint.html')
 
-        # Create the emergency complaint
-        complaint = Complaint.objects.create(
-            user=user,
-            title=title,
-            description=description,
-            category=category,
-            priority=priority,
-            location_description=location_description,
-            address=address,
-            latitude=lat_float,
-            longitude=lng_float
-        )
+        # Create the emergency complaint and queue the SMS alerts in the same transaction;
+        # the run_sms_worker command delivers them, so the submit never waits on Semaphore
+        with transaction.atomic():
+            complaint = Complaint.objects.create(
+                user=user,
+                title=title,
+                description=description,
+                category=category,
+                priority=priority,
+                location_description=location_description,
+                address=address,
+                latitude=lat_float,
+                longitude=lng_float
+            )
 
-        try:
-            notify_new_case_filed(complaint)  # Notifies all active admins
-        except Exception as e:
-            # Log the error but do not interrupt the user flow
-            pass
-        # Send SMS to admins
-        try:
-            
             formatted_message = format_emergency_alert(
                 f"Emergency Message Received:\n"
                 f"Emergency Complaint #{complaint.id} filed by {user.get_full_name()}\n"
@@ -68,17 +67,17 @@ def file_emergency_complaint(request):
                 f"Location: {complaint.address}\n"
                 f"Priority: {complaint.priority.upper()}"
             )
+            try:
+                with transaction.atomic():
+                    enqueue_sms([user.phone] + admin_phone_numbers(), formatted_message, rate_limit=False)
+            except Exception:
+                # Only the savepoint rolls back; the complaint is still filed without its SMS
+                logger.exception(f"Could not queue SMS for complaint #{complaint.id}")
 
-            if user.phone is not None or user.phone != '':
-                send_sms(user.phone, formatted_message)
-
-            admins = StaffAdmin.objects.filter(is_active=True, role="admin")
-
-            for admin in admins:
-                if admin.phone_number is not None or admin.phone_number != '':
-                    send_sms(admin.phone_number, formatted_message)
-
+        try:
+            notify_new_case_filed(complaint)  # Notifies admins and the staff routed to this category
         except Exception as e:
+            # Log the error but do not interrupt the user flow
             pass
 
         # Handle multiple file uploads
@@ -119,7 +118,7 @@ def file_complaint(request):
         latitude = request.POST.get('latitude', '').strip()
         longitude = request.POST.get('longitude', '').strip()
         user_id = request.session.get('resident_id')
-        user = User.objects.filter(id=user_id).first()
+        user = request.principal.resident
         
         # Validate required fields
         if not all([title, description, category, location_description, address]):
@@ -155,34 +154,32 @@ def file_complaint(request):
 
         priority = generate_priority(details).lower()
         
-        complaint = Complaint.objects.create(
-            user=user,
-            title=title,
-            description=description,
-            category=final_category,
-            priority=priority,
-            location_description=location_description,
-            address=address,
-            latitude=lat_float,
-            longitude=lng_float
-        )
+        # The SMS alerts are queued with the complaint and sent by the run_sms_worker command
+        with transaction.atomic():
+            complaint = Complaint.objects.create(
+                user=user,
+                title=title,
+                description=description,
+                category=final_category,
+                priority=priority,
+                location_description=location_description,
+                address=address,
+                latitude=lat_float,
+                longitude=lng_float
+            )
 
-        try: 
             complaint_details = format_complaint_notification(
                 complaint.id, complaint.title, complaint.status.replace('_', ' ')
             )
-
-            if user.phone is not None or user.phone != '':
-                send_sms(user.phone, complaint_details)
-
-            for admin in StaffAdmin.objects.filter(is_active=True, role="admin"):
-                if admin.phone_number is not None or admin.phone_number != '':
-                    send_sms(admin.phone_number, complaint_details)
-        except Exception as e:
-            pass
+            try:
+                with transaction.atomic():
+                    enqueue_sms([user.phone] + admin_phone_numbers(), complaint_details)
+            except Exception:
+                # Only the savepoint rolls back; the complaint is still filed without its SMS
+                logger.exception(f"Could not queue SMS for complaint #{complaint.id}")
 
         try:
-            notify_new_case_filed(complaint)  # Notifies all active admins
+            notify_new_case_filed(complaint)  # Notifies admins and the staff routed to this category
         
         except Exception as e:
             # Log the error but do not interrupt the user flow
@@ -216,7 +213,7 @@ def my_complaints(request):
         return redirect('homepage')
     
     user_id = request.session.get('resident_id')
-    user = User.objects.filter(id=user_id).first()
+    user = request.principal.resident
     
     # Get all complaints for the user
     complaints = Complaint.objects.filter(user=user).order_by('-created_at')
@@ -275,7 +272,7 @@ def complaint_details(request, pk):
         sweetify.error(request, 'You must be logged in to view complaint details.', persistent=True, timer=3000)
         return redirect('homepage')
 
-    user = User.objects.filter(id=user_id).first()
+    user = request.principal.resident
     complaint = get_object_or_404(Complaint, pk=pk, user=user)
     attachments = ComplaintAttachment.objects.filter(complaint=complaint)
 
@@ -307,7 +304,7 @@ def delete_complaint(request, pk):
 
     try:
         complaint = get_object_or_404(Complaint, pk=pk, user_id=user_id)
-        user = User.objects.filter(id=user_id).first()
+        user = request.principal.resident
         
         # Store info before deletion
         complaint_title = complaint.title
@@ -330,7 +327,7 @@ def delete_complaint(request, pk):
         sweetify.success(request, 'Complaint deleted.', persistent=True, timer=2000)
 
     except Exception as e:
-        user = User.objects.filter(id=user_id).first()
+        user = request.principal.resident
         if user:
             log_activity(
                 user=user,
@@ -415,7 +412,7 @@ def update_complaint(request, pk):
                 ComplaintAttachment.objects.create(complaint=complaint, file=file)
             
             # Log activity
-            user = User.objects.filter(id=user_id).first()
+            user = request.principal.resident
             log_case_activity(
                 user=user,
                 case=complaint,
@@ -431,7 +428,7 @@ def update_complaint(request, pk):
 
         
         except Exception as e:
-            user = User.objects.filter(id=user_id).first()
+            user = request.principal.resident
             if user:
                 log_activity(
                     user=user,
@@ -485,7 +482,7 @@ def follow_up_complaint(request, complaint_id):
         return redirect('homepage')
     
     user_id = request.session.get('resident_id')
-    user = User.objects.filter(id=user_id).first()
+    user = request.principal.resident
     complaint = get_object_or_404(Complaint, id=complaint_id, user=user)
     
     if request.method == 'POST':
@@ -513,37 +510,35 @@ def follow_up_complaint(request, complaint_id):
         
         try:
 
-            # Use the unified notification system to notify all admins
-            notifications = Notification.notify_admins(
-                sender=user,
-                title=f'Follow-up on Complaint #{complaint.id}: {complaint.title}',
-                message=f'Resident {user.get_full_name()} has sent a follow-up message:\n\n{message}\n\nComplaint Details:\n- Title: {complaint.title}\n- Category: {complaint.category}\n- Status: {complaint.status.replace("_", " ").title()}\n- Priority: {complaint.priority.title()}\n- Filed: {complaint.created_at.strftime("%B %d, %Y at %I:%M %p")}',
-                notification_type='status_update',
-                action_type='commented',
-                priority=priority,
-                related_complaint=complaint
-            )
+            # The notifications, the new priority and the SMS are saved together; a failed
+            # enqueue only rolls back its savepoint, so the follow-up still counts
+            with transaction.atomic():
+                # Use the unified notification system to notify all admins
+                notifications = Notification.notify_admins(
+                    sender=user,
+                    title=f'Follow-up on Complaint #{complaint.id}: {complaint.title}',
+                    message=f'Resident {user.get_full_name()} has sent a follow-up message:\n\n{message}\n\nComplaint Details:\n- Title: {complaint.title}\n- Category: {complaint.category}\n- Status: {complaint.status.replace("_", " ").title()}\n- Priority: {complaint.priority.title()}\n- Filed: {complaint.created_at.strftime("%B %d, %Y at %I:%M %p")}',
+                    notification_type='status_update',
+                    action_type='commented',
+                    priority=priority,
+                    related_complaint=complaint
+                )
 
-            notifications_created = len(notifications)
+                notifications_created = len(notifications)
+
+                complaint.priority = priority
+                complaint.save()
 
-            complaint.priority = priority
-            complaint.save()
-            
-            try:
                 follow_up_message = follow_up_request(
                     complaint.id,
                     complaint.title,
                     complaint.status.replace('_', ' ')
                 )
-
-                if user.phone is not None or user.phone != '':
-                    send_sms(user.phone, follow_up_message)
-
-                for admin in StaffAdmin.objects.filter(is_active=True, role="admin"):
-                    if admin.phone_number is not None or admin.phone_number != '':
-                        send_sms(admin.phone_number, follow_up_message)
-            except Exception as e:
-                pass
+                try:
+                    with transaction.atomic():
+                        enqueue_sms([user.phone] + admin_phone_numbers(), follow_up_message)
+                except Exception:
+                    logger.exception(f"Could not queue follow-up SMS for complaint #{complaint.id}")
 
             # Log activity
             log_case_activity(
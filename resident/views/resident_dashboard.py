@@ -12,7 +12,7 @@ def resident_dashboard(request):
         sweetify.error(request, 'You must be logged in to access the dashboard.', timer=3000)
         return redirect('homepage')
     user_id = request.session.get('resident_id')
-    user = User.objects.filter(id=user_id).first()
+    user = request.principal.resident
 
     # Complaints stats
     total_complaints = Complaint.objects.filter(user=user).count()
@@ -67,7 +67,7 @@ def resident_logout(request):
     # Log logout
     if user_id:
         try:
-            user = User.objects.filter(id=user_id).first()
+            user = request.principal.resident
             if user:
                 log_logout(
                     user=user,
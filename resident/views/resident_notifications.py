@@ -1,35 +1,31 @@
 from core.models import User
 from django.contrib.contenttypes.models import ContentType
-from django.core.paginator import Paginator
+from django.http import JsonResponse
 from django.shortcuts import redirect, get_object_or_404, render
-from django.core.paginator import Paginator
-from admins.models import Notification
+from django.template.loader import render_to_string
+from django.views.decorators.http import require_GET
+from admins.models import ArchivedNotification, Notification
+from admins.notification_list_utils import load_notification_rows
+from admins.pagination_utils import keyset_page
 import sweetify
 from admins.user_activity_utils import log_activity
 
 
-# Notifications View
-def notifications(request):
-    """Display resident notifications."""
-    
-    user_id = request.session.get('resident_id')
-    user = User.objects.filter(id=user_id).first()
-
-    if not request.session.get('resident_id'):
-        sweetify.error(request, 'You must be logged in to view notifications.', timer=3000)
-        return redirect('homepage')
- 
-    notif_type = request.GET.get('type', '')
-    notif_status = request.GET.get('status', '')
-    page_number = request.GET.get('page', 1)
+NOTIFICATIONS_PER_PAGE = 5
 
 
+def filtered_resident_notifications(user, notif_type='', notif_status=''):
+    """
+    A resident's notifications, narrowed by the inbox filters (archived hidden by default).
+    The 'history' status reads the cold-storage table instead of the live one.
+    """
     user_content_type = ContentType.objects.get_for_model(user)
+    model = ArchivedNotification if notif_status == 'history' else Notification
 
-    notifications  = Notification.objects.filter(
+    notifications = model.objects.filter(
         recipient_content_type=user_content_type,
         recipient_object_id=user.id,
-    ).order_by('-created_at')
+    )
 
     if notif_status == '':
         notifications = notifications.filter(is_archived=False)
@@ -46,8 +42,31 @@ def notifications(request):
         elif notif_status == 'archived':
             notifications = notifications.filter(is_archived=True)
 
-    paginator = Paginator(notifications, 5)  # 5 notifications per page
-    page_object = paginator.get_page(page_number)
+    return notifications
+
+
+# Notifications View
+def notifications(request):
+    """Display resident notifications."""
+    
+    user_id = request.session.get('resident_id')
+    user = request.principal.resident
+
+    if not request.session.get('resident_id'):
+        sweetify.error(request, 'You must be logged in to view notifications.', timer=3000)
+        return redirect('homepage')
+ 
+    notif_type = request.GET.get('type', '')
+    notif_status = request.GET.get('status', '')
+
+    notifications = filtered_resident_notifications(user, notif_type, notif_status)
+
+    # Keyset pagination on (created_at, id) instead of OFFSET
+    try:
+        page = keyset_page(notifications, request.GET.get('cursor'), NOTIFICATIONS_PER_PAGE)
+    except ValueError:
+        page = keyset_page(notifications, None, NOTIFICATIONS_PER_PAGE)
+    page['items'] = load_notification_rows(page['items'])
 
     notification_types = [types[0] for types in Notification.NOTIFICATION_TYPES]
 
@@ -70,20 +89,47 @@ def notifications(request):
     )
 
     context = {
-        'notifications': page_object,
+        'notifications': page['items'],
+        'next_cursor': page['next_cursor'],
         'notification_types': notification_types,
         'current_type': notif_type,
         'current_status': notif_status,
-        'page_obj': page_object,
     }
 
     return render(request, 'resident_notifications.html', context)
 
 
+@require_GET
+def resident_notifications_more(request):
+    """
+    JSON "load more" for the resident inbox: the rendered rows after ``cursor`` and the
+    cursor for the page after them.
+    """
+    user = request.principal.resident
+
+    if not user:
+        return JsonResponse({'success': False, 'error': 'Not authenticated'}, status=403)
+
+    notifications = filtered_resident_notifications(
+        user, request.GET.get('type', ''), request.GET.get('status', ''),
+    )
+    try:
+        page = keyset_page(notifications, request.GET.get('cursor'), NOTIFICATIONS_PER_PAGE)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid cursor'}, status=400)
+    page['items'] = load_notification_rows(page['items'])
+
+    return JsonResponse({
+        'success': True,
+        'html': render_to_string('resident_notification_rows.html', {'notifications': page['items']}, request=request),
+        'next_cursor': page['next_cursor'],
+    })
+
+
 def resident_notification_details(request, notification_id):
     """Display details of a specific notification."""
     user_id = request.session.get('resident_id')
-    user = User.objects.filter(id=user_id).first()
+    user = request.principal.resident
 
     if not request.session.get('resident_id'):
         sweetify.error(request, 'You must be logged in to view notifications.', timer=3000)
@@ -122,7 +168,7 @@ def resident_notification_details(request, notification_id):
 def resident_mark_notification_read(request, notification_id):
     """Mark a notification as read."""
     user_id = request.session.get('resident_id')
-    user = User.objects.filter(id=user_id).first()
+    user = request.principal.resident
 
     if not request.session.get('resident_id'):
         sweetify.error(request, 'You must be logged in to manage notifications.', timer=3000)
@@ -156,7 +202,7 @@ def resident_mark_notification_read(request, notification_id):
 def resident_archive_notification(request, notification_id):
     """Archive a notification."""
     user_id = request.session.get('resident_id')
-    user = User.objects.filter(id=user_id).first()
+    user = request.principal.resident
 
     if not request.session.get('resident_id'):
         sweetify.error(request, 'You must be logged in to manage notifications.', timer=3000, persistent=True)
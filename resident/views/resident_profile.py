@@ -13,7 +13,7 @@ def profile(request):
     Resident profile page: view info, upload profile picture, update password.
     """
     user_id = request.session.get('resident_id')
-    user = User.objects.filter(id=user_id).first()
+    user = request.principal.resident
     
     if not user:
         sweetify.error(request, 'You must be logged in to view your profile.', persistent="Okay", timer=3000)
@@ -103,7 +103,7 @@ def resident_change_password(request):
         return redirect('homepage')
     
     if request.method == 'POST':
-        user = User.objects.filter(id=user_id).first()
+        user = request.principal.resident
 
         current_password = request.POST.get('current_password', '').strip()
         new_password = request.POST.get('new_password', '').strip()
@@ -2,16 +2,13 @@ from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth.models import User
 from core.models import Admin
 from admins.models import Notification
+from admins.notification_utils import digest_window
 
 def create_status_update_notification(case, case_type, old_status, new_status, remarks, staff):
     """
     Create a notification for the complainant when case status is updated.
     """
     try:
-        # Get content types
-        user_content_type = ContentType.objects.get_for_model(User)
-        admin_content_type = ContentType.objects.get_for_model(Admin)
-        
         # Create status update message
         status_display = new_status.replace('_', ' ').title()
         old_status_display = old_status.replace('_', ' ').title()
@@ -62,12 +59,11 @@ def create_status_update_notification(case, case_type, old_status, new_status, r
                 notification_type = 'status_update'
                 priority = 'normal'
         
-        # Create the notification
-        notification = Notification.objects.create(
-            recipient_content_type=user_content_type,
-            recipient_object_id=case.user.id,
-            sender_content_type=admin_content_type,
-            sender_object_id=staff.id,
+        # Create the notification, folding repeated updates of this case into one digest
+        notification = Notification.create_or_coalesce(
+            case.user,
+            digest_window(),
+            sender=staff,
             title=title,
             message=message,
             notification_type=notification_type,
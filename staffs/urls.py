@@ -7,6 +7,7 @@ from staffs.views import (
     staff_notifications,
     staff_profile
 )
+from admins.views import notification_stream
 
 urlpatterns = [
     path('', staff_auth.staff_login, name='staff_login'),
@@ -24,6 +25,8 @@ urlpatterns = [
     
     # Notification views
     path('notifications/', staff_notifications.staff_notifications, name='staff_notifications'),
+    path('notifications/more/', staff_notifications.staff_notifications_more, name='staff_notifications_more'),
+    path('notifications/stream/', notification_stream.notification_stream, {'kind': 'staff'}, name='staff_notification_stream'),
     path('notifications/<int:notification_id>/details/', staff_notifications.staff_notification_details, name='staff_notification_details'),
     path('notifications/mark-read/', staff_notifications.staff_mark_notification_read, name='staff_mark_notification_read'),
     path('notifications/mark-all-read/', staff_notifications.staff_mark_all_notifications_read, name='staff_mark_all_notifications_read'),
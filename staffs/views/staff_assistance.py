@@ -16,7 +16,7 @@ def staff_assistance(request):
         return redirect('staff_login')
     
     try:
-        current_staff = Admin.objects.get(id=staff_id)
+        current_staff = request.principal.get('staff')
         
         # Get all assistance requests assigned to current staff member
         assistance_requests = AssistanceRequest.objects.filter(
@@ -72,7 +72,7 @@ def staff_logout(request):
     # Log logout before flushing session
     if staff_id:
         try:
-            staff_member = Admin.objects.get(id=staff_id)
+            staff_member = request.principal.get('staff')
             log_logout(
                 user=staff_member,
                 ip_address=request.META.get('REMOTE_ADDR'),
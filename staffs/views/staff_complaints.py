@@ -1,12 +1,18 @@
+import logging
+
+from django.db import transaction
 from django.shortcuts import render, redirect, get_object_or_404
 from django.utils import timezone
 from admins.models import Complaint, AssistanceRequest
 from core.models import Admin
 from staffs.notification_views import create_notes_notification, create_status_update_notification
-from core.sms_util import send_sms, format_resolved_case
+from core.sms_outbox_utils import enqueue_sms
+from core.sms_util import format_resolved_case
 import sweetify
 from admins.user_activity_utils import log_activity, log_case_activity
 
+logger = logging.getLogger(__name__)
+
 # Staff Complaints
 def staff_complaints(request):
     staff_id = request.session.get('staff_id')
@@ -15,7 +21,7 @@ def staff_complaints(request):
         return redirect('staff_login')
     
     try:
-        current_staff = Admin.objects.get(id=staff_id)
+        current_staff = request.principal.get('staff')
         
         # Get all complaints assigned to current staff member
         complaints = Complaint.objects.filter(
@@ -77,7 +83,7 @@ def staff_view_case(request, case_type, case_id):
         return redirect('staff_login')
     
     try:
-        current_staff = Admin.objects.get(id=staff_id)
+        current_staff = request.principal.get('staff')
         
         # Get the case based on type
         if case_type == 'complaint':
@@ -137,7 +143,7 @@ def staff_update_case_status(request, case_type, case_id):
             return redirect('staff_login')
         
         try:
-            current_staff = Admin.objects.get(id=staff_id)
+            current_staff = request.principal.get('staff')
             new_status = request.POST.get('status', '').strip()
             remarks = request.POST.get('remarks', '').strip()
             
@@ -146,6 +152,7 @@ def staff_update_case_status(request, case_type, case_id):
                 return redirect('staff_view_case', case_type=case_type, case_id=case_id)
             
             # Get the case and store old status for comparison
+            sms_message = None
             if case_type == 'complaint':
                 case = get_object_or_404(Complaint, id=case_id, assigned_to=current_staff)
                 valid_statuses = ['pending', 'in_progress', 'resolved', 'closed']
@@ -160,10 +167,7 @@ def staff_update_case_status(request, case_type, case_id):
                 # Set resolved_at timestamp if status is resolved
                 if new_status == 'resolved':
                     case.resolved_at = timezone.now()
-
-                    message = format_resolved_case(case.id, case.title)
-                    if case.user.phone:
-                        send_sms(case.user.phone, message)
+                    sms_message = format_resolved_case(case.id, case.title)
                 
             elif case_type == 'assistance':
                 case = get_object_or_404(AssistanceRequest, id=case_id, assigned_to=current_staff)
@@ -179,10 +183,7 @@ def staff_update_case_status(request, case_type, case_id):
                 # Set completed_at timestamp if status is completed
                 if new_status == 'completed':
                     case.completed_at = timezone.now()
-
-                    message = format_resolved_case(case.id, case.title)
-                    if case.user.phone:
-                        send_sms(case.user.phone, message)
+                    sms_message = format_resolved_case(case.id, case.title)
                         
             timestamp = timezone.now().strftime('%Y-%m-%d %H:%M:%S')
             new_remark = f"[{timestamp}] {current_staff.first_name}: {remarks}"
@@ -190,7 +191,18 @@ def staff_update_case_status(request, case_type, case_id):
                 case.admin_remarks += f"\n\n{new_remark}"
             else:
                 case.admin_remarks = new_remark
-            case.save()
+
+            # The resident's SMS is queued after the save in the same transaction, so it
+            # is only sent if the status change commits; a failed enqueue only rolls back
+            # its savepoint
+            with transaction.atomic():
+                case.save()
+                if sms_message:
+                    try:
+                        with transaction.atomic():
+                            enqueue_sms(case.user.phone, sms_message)
+                    except Exception:
+                        logger.exception(f"Could not queue SMS for {case_type} #{case.id}")
             
             # Create notification for the complainant if status changed
             if old_status != new_status:
@@ -223,7 +235,7 @@ def staff_update_case_status(request, case_type, case_id):
             # Log failed attempt
             if staff_id:
                 try:
-                    staff = Admin.objects.get(id=staff_id)
+                    staff = request.principal.get('staff')
                     log_activity(
                         user=staff,
                         activity_type=f"{case_type}_status_changed",
@@ -257,7 +269,7 @@ def staff_add_notes(request, case_type, case_id):
         return redirect('staff_login')
     
     try:
-        current_staff = Admin.objects.get(id=staff_id)
+        current_staff = request.principal.get('staff')
         notes = request.POST.get('notes', '').strip()
         
         if not notes:
@@ -303,7 +315,7 @@ def staff_add_notes(request, case_type, case_id):
         # Log failed attempt
         if staff_id:
             try:
-                staff = Admin.objects.get(id=staff_id)
+                staff = request.principal.get('staff')
                 log_activity(
                     user=staff,
                     activity_type=f"{case_type}_updated",
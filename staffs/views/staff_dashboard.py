@@ -4,8 +4,119 @@ from core.models import Admin
 from admins.user_activity_utils import log_activity
 import json
 from django.utils import timezone
-from datetime import timedelta
-from django.db.models import Count, Q
+from django.db.models import Sum
+from admins.analytics_utils import summarize_cases
+from admins.case_stats_utils import case_stats
+from admins.staff_performance_utils import staff_performance_for
+from admins.cache_utils import cached_context
+from admins.timeseries_utils import time_series, series_values
+
+
+def build_staff_dashboard_metrics(current_staff):
+    """
+    Compute the cacheable (JSON-serializable) metrics for one staff member's dashboard.
+    """
+    assigned_complaints = Complaint.objects.filter(assigned_to=current_staff)
+
+    # Case counts for this staff member come from the daily rollup
+    complaint_stats = case_stats('complaint', assigned_to=current_staff)
+    assistance_stats = case_stats('assistance', assigned_to=current_staff)
+    complaint_summary = summarize_cases(complaint_stats)
+    assistance_summary = summarize_cases(assistance_stats)
+
+    # Calculate metrics for assigned complaints
+    total_complaints = complaint_summary['total']
+    pending_complaints = complaint_summary['pending']
+    in_progress_complaints = complaint_summary['in_progress'] + complaint_summary['assigned']
+    resolved_complaints = complaint_summary['resolved']
+
+    # Calculate metrics for assigned assistance requests
+    total_assistance = assistance_summary['total']
+    pending_assistance = assistance_summary['pending']
+    in_progress_assistance = assistance_summary['in_progress'] + assistance_summary['assigned']
+    resolved_assistance = assistance_summary['resolved']
+
+    # Calculate Resolution Rates
+    resolution_rate = round((resolved_complaints / total_complaints) * 100, 1) if total_complaints > 0 else 0
+    assistance_completion_rate = round((resolved_assistance / total_assistance) * 100, 1) if total_assistance > 0 else 0
+
+    # Workload and resolution times for this staff member (grouped queries shared with the leaderboard)
+    performance = staff_performance_for(current_staff)
+    avg_resolution_days = performance['complaint_mean_days'] or 0
+
+    # Get category distribution for assigned complaints (top 5)
+    category_counts = complaint_stats.values('category').annotate(count=Sum('count')).order_by('-count')[:5]
+    category_labels = [item['category'] for item in category_counts]
+    category_data = [item['count'] for item in category_counts]
+
+    # Get monthly trend data for assigned cases (last 6 months), one grouped query per source
+    monthly = time_series(
+        case_stats(assigned_to=current_staff), 'date', 'month', periods=6,
+        group_by='case_kind', aggregate=Sum('count'), label_format='%b',
+    )
+    monthly_resolved = time_series(assigned_complaints, 'resolved_at', 'month', periods=6, label_format='%b')
+
+    monthly_labels = monthly['labels']
+    monthly_complaint_counts = series_values(monthly, 'complaint')
+    monthly_assistance_counts = series_values(monthly, 'assistance')
+    monthly_resolved_counts = monthly_resolved['values']
+
+    # This month vs last month comparison (last two buckets of the monthly trend)
+    complaints_last_month, complaints_this_month = monthly_complaint_counts[-2:]
+
+    if complaints_last_month > 0:
+        complaint_change_pct = round(((complaints_this_month - complaints_last_month) / complaints_last_month) * 100, 1)
+    else:
+        complaint_change_pct = 0 if complaints_this_month == 0 else 100.0
+
+    # Assistance comparison
+    assistance_last_month, assistance_this_month = monthly_assistance_counts[-2:]
+
+    if assistance_last_month > 0:
+        assistance_change_pct = round(((assistance_this_month - assistance_last_month) / assistance_last_month) * 100, 1)
+    else:
+        assistance_change_pct = 0 if assistance_this_month == 0 else 100.0
+
+    # Resolved this month
+    this_month_start = timezone.localtime().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    resolved_this_month = assigned_complaints.filter(
+        resolved_at__gte=this_month_start,
+        status='resolved'
+    ).count()
+
+    return {
+        # Complaint metrics
+        'total_complaints': total_complaints,
+        'pending_complaints': pending_complaints,
+        'in_progress_complaints': in_progress_complaints,
+        'resolved_complaints': resolved_complaints,
+        'resolution_rate': resolution_rate,
+        'avg_resolution_days': avg_resolution_days,
+        'complaints_this_month': complaints_this_month,
+        'complaint_change_pct': complaint_change_pct,
+        'resolved_this_month': resolved_this_month,
+        'median_resolution_days': performance['complaint_median_days'],
+        'open_cases': performance['open'],
+        'overdue_cases': performance['overdue'],
+        
+        # Assistance metrics
+        'assistance_requests': total_assistance,
+        'total_assistance': total_assistance,
+        'pending_assistance': pending_assistance,
+        'in_progress_assistance': in_progress_assistance,
+        'resolved_assistance': resolved_assistance,
+        'assistance_completion_rate': assistance_completion_rate,
+        'assistance_this_month': assistance_this_month,
+        'assistance_change_pct': assistance_change_pct,
+        
+        # Chart data
+        'category_labels': json.dumps(category_labels),
+        'category_data': json.dumps(category_data),
+        'monthly_labels': json.dumps(monthly_labels),
+        'monthly_complaint_counts': json.dumps(monthly_complaint_counts),
+        'monthly_assistance_counts': json.dumps(monthly_assistance_counts),
+        'monthly_resolved_counts': json.dumps(monthly_resolved_counts),
+    }
 
 
 # Staff Dashboard
@@ -21,7 +132,7 @@ def staff_dashboard(request):
         return redirect('staff_login')
     
     try:
-        current_staff = Admin.objects.get(id=staff_id)
+        current_staff = request.principal.get('staff')
         
         # Get all complaints assigned to current staff member
         assigned_complaints = Complaint.objects.filter(
@@ -33,88 +144,12 @@ def staff_dashboard(request):
             assigned_to=current_staff
         ).select_related('user').order_by('-created_at')
         
-        # Calculate metrics for assigned complaints
-        total_complaints = assigned_complaints.count()
-        pending_complaints = assigned_complaints.filter(status='pending').count()
-        in_progress_complaints = assigned_complaints.filter(Q(status='in_progress') | Q(status='assigned')).count()
-        resolved_complaints = assigned_complaints.filter(status='resolved').count()
-        
-        # Calculate metrics for assigned assistance requests
-        total_assistance = assigned_assistance.count()
-        pending_assistance = assigned_assistance.filter(status='pending').count()
-        in_progress_assistance = assigned_assistance.filter(Q(status='in_progress') | Q(status='assigned')).count()
-        resolved_assistance = assigned_assistance.filter(status='resolved').count()
-        
-        # Calculate Resolution Rates
-        resolution_rate = round((resolved_complaints / total_complaints) * 100, 1) if total_complaints > 0 else 0
-        assistance_completion_rate = round((resolved_assistance / total_assistance) * 100, 1) if total_assistance > 0 else 0
-        
-        # Average Resolution Time (in days) for assigned complaints
-        resolved_with_time = assigned_complaints.filter(status='resolved', resolved_at__isnull=False)
-        if resolved_with_time.exists():
-            total_time = sum([(c.resolved_at - c.created_at).total_seconds() for c in resolved_with_time if c.resolved_at and c.created_at])
-            avg_resolution_days = round(total_time / (resolved_with_time.count() * 86400), 1)
-        else:
-            avg_resolution_days = 0
-        
-        # Get category distribution for assigned complaints (top 5)
-        category_counts = assigned_complaints.values('category').annotate(count=Count('id')).order_by('-count')[:5]
-        category_labels = [item['category'] for item in category_counts]
-        category_data = [item['count'] for item in category_counts]
-        
-        # Get monthly trend data for assigned cases (last 6 months)
-        monthly_labels = []
-        monthly_complaint_counts = []
-        monthly_assistance_counts = []
-        monthly_resolved_counts = []
-        
-        for i in range(5, -1, -1):
-            month_date = timezone.now() - timedelta(days=30*i)
-            month_start = month_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(seconds=1)
-            
-            # Assigned complaints in this month
-            month_complaints = assigned_complaints.filter(created_at__gte=month_start, created_at__lte=month_end).count()
-            month_assistance = assigned_assistance.filter(created_at__gte=month_start, created_at__lte=month_end).count()
-            month_resolved = assigned_complaints.filter(resolved_at__gte=month_start, resolved_at__lte=month_end).count()
-            
-            monthly_labels.append(month_start.strftime('%b'))
-            monthly_complaint_counts.append(month_complaints)
-            monthly_assistance_counts.append(month_assistance)
-            monthly_resolved_counts.append(month_resolved)
-        
-        # This month vs last month comparison
-        this_month_start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        last_month_start = (this_month_start - timedelta(days=1)).replace(day=1)
-        
-        complaints_this_month = assigned_complaints.filter(created_at__gte=this_month_start).count()
-        complaints_last_month = assigned_complaints.filter(
-            created_at__gte=last_month_start,
-            created_at__lt=this_month_start
-        ).count()
-        
-        if complaints_last_month > 0:
-            complaint_change_pct = round(((complaints_this_month - complaints_last_month) / complaints_last_month) * 100, 1)
-        else:
-            complaint_change_pct = 0 if complaints_this_month == 0 else 100.0
-        
-        # Assistance comparison
-        assistance_this_month = assigned_assistance.filter(created_at__gte=this_month_start).count()
-        assistance_last_month = assigned_assistance.filter(
-            created_at__gte=last_month_start,
-            created_at__lt=this_month_start
-        ).count()
-        
-        if assistance_last_month > 0:
-            assistance_change_pct = round(((assistance_this_month - assistance_last_month) / assistance_last_month) * 100, 1)
-        else:
-            assistance_change_pct = 0 if assistance_this_month == 0 else 100.0
-        
-        # Resolved this month
-        resolved_this_month = assigned_complaints.filter(
-            resolved_at__gte=this_month_start,
-            status='resolved'
-        ).count()
+        # Metrics are cached per staff member until case data changes
+        metrics = cached_context(
+            'staff_dashboard',
+            lambda: build_staff_dashboard_metrics(current_staff),
+            current_staff.id,
+        )
         
         # Get recent assigned complaints (limit to 10 for dashboard display)
         recent_complaints = assigned_complaints[:10]
@@ -136,44 +171,17 @@ def staff_dashboard(request):
             ip_address=request.META.get('REMOTE_ADDR'),
             user_agent=request.META.get('HTTP_USER_AGENT'),
             metadata={
-                'total_assigned_complaints': total_complaints,
-                'total_assigned_assistance': total_assistance,
-                'pending_complaints': pending_complaints,
-                'pending_assistance': pending_assistance
+                'total_assigned_complaints': metrics['total_complaints'],
+                'total_assigned_assistance': metrics['total_assistance'],
+                'pending_complaints': metrics['pending_complaints'],
+                'pending_assistance': metrics['pending_assistance']
             }
         )
         
         context = {
             'current_staff': current_staff,
             
-            # Complaint metrics
-            'total_complaints': total_complaints,
-            'pending_complaints': pending_complaints,
-            'in_progress_complaints': in_progress_complaints,
-            'resolved_complaints': resolved_complaints,
-            'resolution_rate': resolution_rate,
-            'avg_resolution_days': avg_resolution_days,
-            'complaints_this_month': complaints_this_month,
-            'complaint_change_pct': complaint_change_pct,
-            'resolved_this_month': resolved_this_month,
-            
-            # Assistance metrics
-            'assistance_requests': total_assistance,
-            'total_assistance': total_assistance,
-            'pending_assistance': pending_assistance,
-            'in_progress_assistance': in_progress_assistance,
-            'resolved_assistance': resolved_assistance,
-            'assistance_completion_rate': assistance_completion_rate,
-            'assistance_this_month': assistance_this_month,
-            'assistance_change_pct': assistance_change_pct,
-            
-            # Chart data
-            'category_labels': json.dumps(category_labels),
-            'category_data': json.dumps(category_data),
-            'monthly_labels': json.dumps(monthly_labels),
-            'monthly_complaint_counts': json.dumps(monthly_complaint_counts),
-            'monthly_assistance_counts': json.dumps(monthly_assistance_counts),
-            'monthly_resolved_counts': json.dumps(monthly_resolved_counts),
+            **metrics,
             
             # Data for tables/lists
             'recent_complaints': recent_complaints,
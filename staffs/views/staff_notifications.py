@@ -1,14 +1,53 @@
 from django.shortcuts import render, redirect
 from django.http import JsonResponse
 from django.contrib.contenttypes.models import ContentType
-from django.core.paginator import Paginator
-from django.views.decorators.http import require_POST
-from admins.models import Notification
+from django.template.loader import render_to_string
+from django.views.decorators.http import require_GET, require_POST
+from admins.models import ArchivedNotification, Notification
+from admins.notification_counter_utils import update_notifications
+from admins.notification_list_utils import load_notification_rows
+from admins.pagination_utils import keyset_page
 from core.models import Admin
 import sweetify, json
 from admins.user_activity_utils import log_activity
 
 
+NOTIFICATIONS_PER_PAGE = 10
+
+
+def filtered_staff_notifications(staff_id, current_type='', current_status=''):
+    """
+    A staff member's notifications, narrowed by the inbox filters (archived hidden by default).
+    The 'history' status reads the cold-storage table instead of the live one.
+    """
+    staff_content_type = ContentType.objects.get_for_model(Admin)
+    model = ArchivedNotification if current_status == 'history' else Notification
+
+    notifications = model.objects.filter(
+        recipient_content_type=staff_content_type,
+        recipient_object_id=staff_id
+    ).select_related(
+        'sender_content_type',
+        'related_complaint',
+        'related_assistance'
+    )
+
+    if current_type:
+        notifications = notifications.filter(notification_type=current_type)
+
+    if current_status == 'read':
+        notifications = notifications.filter(is_read=True)
+    elif current_status == 'unread':
+        notifications = notifications.filter(is_read=False)
+    elif current_status == 'archived':
+        notifications = notifications.filter(is_archived=True)
+    elif current_status != 'history':
+        # By default, don't show archived notifications
+        notifications = notifications.filter(is_archived=False)
+
+    return notifications
+
+
 # Staff Notification Management
 def staff_notifications(request):
     """
@@ -20,46 +59,26 @@ def staff_notifications(request):
         return redirect('staff_login')
     
     try:
-        current_staff = Admin.objects.get(id=staff_id)
+        current_staff = request.principal.get('staff')
         
         # Get content type for staff
         staff_content_type = ContentType.objects.get_for_model(Admin)
         
-        # Get all notifications for this staff member
-        notifications = Notification.objects.filter(
-            recipient_content_type=staff_content_type,
-            recipient_object_id=current_staff.id
-        ).select_related(
-            'sender_content_type',
-            'related_complaint',
-            'related_assistance'
-        ).order_by('-created_at')
-        
         # Get filter parameters
         current_type = request.GET.get('type', '')
         current_status = request.GET.get('status', '')
         
-        # Apply filters
-        if current_type:
-            notifications = notifications.filter(notification_type=current_type)
-        
-        if current_status == 'read':
-            notifications = notifications.filter(is_read=True)
-        elif current_status == 'unread':
-            notifications = notifications.filter(is_read=False)
-        elif current_status == 'archived':
-            notifications = notifications.filter(is_archived=True)
-        else:
-            # By default, don't show archived notifications
-            notifications = notifications.filter(is_archived=False)
+        notifications = filtered_staff_notifications(current_staff.id, current_type, current_status)
         
         # Get unique notification types for filter dropdown
         notification_types = notifications.values_list('notification_type', flat=True).distinct()
         
-        # Pagination
-        paginator = Paginator(notifications, 10)
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        # Keyset pagination on (created_at, id) instead of OFFSET
+        try:
+            page = keyset_page(notifications, request.GET.get('cursor'), NOTIFICATIONS_PER_PAGE)
+        except ValueError:
+            page = keyset_page(notifications, None, NOTIFICATIONS_PER_PAGE)
+        page['items'] = load_notification_rows(page['items'])
         
         # Calculate stats
         total_notifications = Notification.objects.filter(
@@ -109,8 +128,8 @@ def staff_notifications(request):
         
         context = {
             'current_staff': current_staff,
-            'notifications': page_obj,
-            'page_obj': page_obj,
+            'notifications': page['items'],
+            'next_cursor': page['next_cursor'],
             'notification_types': notification_types,
             'current_type': current_type,
             'current_status': current_status,
@@ -131,6 +150,33 @@ def staff_notifications(request):
         return redirect('staff_dashboard')
 
 
+@require_GET
+def staff_notifications_more(request):
+    """
+    JSON "load more" for the staff inbox: the rendered rows after ``cursor`` and the
+    cursor for the page after them.
+    """
+    staff_id = request.session.get('staff_id')
+
+    if not staff_id:
+        return JsonResponse({'success': False, 'error': 'Not authenticated'}, status=403)
+
+    notifications = filtered_staff_notifications(
+        staff_id, request.GET.get('type', ''), request.GET.get('status', ''),
+    )
+    try:
+        page = keyset_page(notifications, request.GET.get('cursor'), NOTIFICATIONS_PER_PAGE)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid cursor'}, status=400)
+    page['items'] = load_notification_rows(page['items'])
+
+    return JsonResponse({
+        'success': True,
+        'html': render_to_string('staff_notification_rows.html', {'notifications': page['items']}, request=request),
+        'next_cursor': page['next_cursor'],
+    })
+
+
 @require_POST
 def staff_mark_notification_read(request):
     """
@@ -142,7 +188,7 @@ def staff_mark_notification_read(request):
         return JsonResponse({'success': False, 'error': 'Not authenticated'})
     
     try:
-        current_staff = Admin.objects.get(id=staff_id)
+        current_staff = request.principal.get('staff')
         data = json.loads(request.body)
         notification_id = data.get('notification_id')
         
@@ -190,23 +236,17 @@ def staff_mark_all_notifications_read(request):
         return JsonResponse({'success': False, 'error': 'Not authenticated'})
     
     try:
-        current_staff = Admin.objects.get(id=staff_id)
+        current_staff = request.principal.get('staff')
         
         # Get content type for staff
         staff_content_type = ContentType.objects.get_for_model(Admin)
         
         # Mark all unread notifications for this staff member as read
-        unread_count = Notification.objects.filter(
-            recipient_content_type=staff_content_type,
-            recipient_object_id=current_staff.id,
-            is_read=False
-        ).count()
-        
-        Notification.objects.filter(
+        unread_count = update_notifications(Notification.objects.filter(
             recipient_content_type=staff_content_type,
             recipient_object_id=current_staff.id,
             is_read=False
-        ).update(is_read=True)
+        ), is_read=True)
         
         # Log activity
         log_activity(
@@ -238,7 +278,7 @@ def staff_archive_notification(request):
         return JsonResponse({'success': False, 'error': 'Not authenticated'})
     
     try:
-        current_staff = Admin.objects.get(id=staff_id)
+        current_staff = request.principal.get('staff')
         data = json.loads(request.body)
         notification_id = data.get('notification_id')
         
@@ -285,7 +325,7 @@ def staff_notification_details(request, notification_id):
         return redirect('staff_login')
     
     try:
-        current_staff = Admin.objects.get(id=staff_id)
+        current_staff = request.principal.get('staff')
         
         # Get content type for staff
         staff_content_type = ContentType.objects.get_for_model(Admin)
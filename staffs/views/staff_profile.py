@@ -16,7 +16,7 @@ def staff_profile(request):
         return redirect('staff_login')
     
     try:
-        current_staff = Admin.objects.get(id=staff_id)
+        current_staff = request.principal.get('staff')
         
         # Log activity
         log_activity(
@@ -54,7 +54,7 @@ def staff_update_profile(request):
         return redirect('staff_login')
     
     try:
-        current_staff = Admin.objects.get(id=staff_id)
+        current_staff = request.principal.get('staff')
         
         # Get form data
         first_name = request.POST.get('first_name', '').strip()
@@ -137,7 +137,7 @@ def staff_change_password(request):
         return redirect('staff_login')
     
     try:
-        current_staff = Admin.objects.get(id=staff_id)
+        current_staff = request.principal.get('staff')
         
         # Get form data
         current_password = request.POST.get('current_password', '')
@@ -241,7 +241,7 @@ def staff_update_username(request):
         return redirect('staff_login')
     
     try:
-        current_staff = Admin.objects.get(id=staff_id)
+        current_staff = request.principal.get('staff')
         
         # Get form data
         new_username = request.POST.get('username', '').strip()